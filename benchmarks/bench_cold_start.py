@@ -0,0 +1,108 @@
+# benchmarks/bench_cold_start.py
+"""
+Cold-start budget of the one-shot cron entry point (run_once.py).
+
+Runs run_once.py against an empty dropbox folder in fresh interpreters and reports the
+median wall-clock time next to a bare `python -c pass`, plus a `-X importtime` breakdown
+of what was imported. The exit status is 1 if the median exceeds the budget or a heavy
+module (pandas, numpy, pyarrow, mysql.connector, watchdog) was imported, so this can
+gate CI. The import time of the full processor is reported for reference.
+
+Usage (from the project root):
+    python -m benchmarks.bench_cold_start --runs 20 --budget-ms 100
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from v3.src.config.settings import BASE_DIR
+
+# Modules an empty cron tick must not import
+HEAVY_MODULES = ('pandas', 'numpy', 'pyarrow', 'mysql', 'watchdog')
+
+DEFAULT_BUDGET_MS = 100.0
+
+def median_wall_ms(command, env, runs):
+    """Median wall-clock time of running command in a fresh interpreter, in milliseconds."""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=BASE_DIR, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - started)
+    return round(statistics.median(timings) * 1000, 1)
+
+def import_times(command, env):
+    """
+    Runs command under -X importtime.
+
+    Returns:
+        dict: Cumulative import time in microseconds of every imported module, by name.
+    """
+    completed = subprocess.run(
+        [command[0], '-X', 'importtime'] + command[1:], cwd=BASE_DIR, env=env,
+        capture_output=True, text=True, check=True
+    )
+    modules = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+def measure_cold_start(runs=10, top=10):
+    """
+    Measures run_once.py on an empty dropbox.
+
+    Returns:
+        dict: 'median_ms', 'python_median_ms' (bare interpreter), 'top_imports_ms',
+              'heavy_modules_imported' and 'processor_import_ms'.
+    """
+    with tempfile.TemporaryDirectory(prefix='etl-cold-start-') as empty_dropbox:
+        env = dict(os.environ, ETL_DROPBOX_FOLDER=empty_dropbox)
+        run_once = [sys.executable, os.path.join(BASE_DIR, 'run_once.py')]
+        modules = import_times(run_once, env)
+        processor = import_times([sys.executable, '-c', 'import v3.src.business_layer.processor_service'], env)
+        result = {
+            'runs': runs,
+            'median_ms': median_wall_ms(run_once, env, runs),
+            'python_median_ms': median_wall_ms([sys.executable, '-c', 'pass'], env, runs),
+            'top_imports_ms': {
+                name: round(micros / 1000, 1)
+                for name, micros in sorted(modules.items(), key=lambda item: item[1], reverse=True)[:top]
+            },
+            'heavy_modules_imported': sorted(
+                name for name in modules if name.split('.')[0] in HEAVY_MODULES and '.' not in name
+            ),
+            'processor_import_ms': round(processor.get('v3.src.business_layer.processor_service', 0) / 1000, 1)
+        }
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10, help="Interpreter starts per measurement (default: 10)")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Allowed median wall-clock time of an empty run (default: {DEFAULT_BUDGET_MS:g})")
+    args = parser.parse_args()
+
+    result = measure_cold_start(args.runs)
+    result['budget_ms'] = args.budget_ms
+    print(json.dumps(result, indent=2))
+
+    failures = []
+    if result['median_ms'] > args.budget_ms:
+        failures.append(f"median {result['median_ms']} ms exceeds the {args.budget_ms:g} ms budget")
+    if result['heavy_modules_imported']:
+        failures.append(f"an empty run imported {', '.join(result['heavy_modules_imported'])}")
+    for failure in failures:
+        print(f"Cold start over budget: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
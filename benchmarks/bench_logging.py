@@ -0,0 +1,119 @@
+# benchmarks/bench_logging.py
+"""
+Logging overhead per ingested file.
+
+Ingests the same small synthetic CSV many times into the stand-in sink, once per logging
+setup, each in a fresh interpreter:
+
+    none  - the log calls run, but a NullHandler discards the records (the baseline)
+    sync  - the log file and console handlers write on the ingest thread
+    queue - setup_logging's default: records are queued for a background writer
+
+and reports the time the ingesting threads spent inside logging calls per file (handing
+the records to the handlers, including any writes made on the calling thread), next to
+the mean time per file. The console is redirected to a file, so a terminal (or a slow
+pipe) would only widen the gap between 'sync' and 'queue'. Small files are used because
+their fixed per-file log lines weigh the most.
+
+Usage (from the project root):
+    python -m benchmarks.bench_logging --files 300 --rows 200
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.run_benchmarks import DEFAULT_DATA_DIR, dataset_path
+from v3.src.config.settings import BASE_DIR
+
+MODES = ('none', 'sync', 'queue')
+
+def run_mode(mode, csv_path, files, log_dir, log_format):
+    """Ingests csv_path files times under one logging setup and times the logging calls."""
+    from benchmarks.stand_in_sink import install_stand_in_sink
+    install_stand_in_sink()
+    from v3.src.config.settings import INGEST_CONFIG, LOGGING_CONFIG, MYSQL_CONFIG, STUDENTS_TABLE, TABLE_INGEST_CONFIG
+    from v3.src.data_layer import csv_processor
+    from v3.src.utils.logger import setup_logging, shutdown_logging
+
+    if mode == 'none':
+        logging.getLogger().addHandler(logging.NullHandler())
+        logging.getLogger().setLevel(logging.INFO)
+    else:
+        setup_logging(
+            os.path.join(log_dir, f"{mode}.log"), 'INFO', log_format=log_format,
+            max_bytes=LOGGING_CONFIG['max_bytes'], backup_count=LOGGING_CONFIG['backup_count'],
+            use_queue=(mode == 'queue')
+        )
+
+    ingest_config = {**INGEST_CONFIG, **TABLE_INGEST_CONFIG.get(STUDENTS_TABLE, {})}
+    csv_processor.process_csv_and_insert_into_mysql(csv_path, MYSQL_CONFIG, STUDENTS_TABLE, ingest_config) # Warm up
+
+    # Time spent by the logging calls themselves (the writer thread of 'queue' calls the
+    # handlers directly, so its writes are not counted)
+    handle = logging.Logger.handle
+    log_call_seconds = [0.0, 0]
+    def timed_handle(logger, record):
+        started = time.perf_counter()
+        try:
+            return handle(logger, record)
+        finally:
+            log_call_seconds[0] += time.perf_counter() - started
+            log_call_seconds[1] += 1
+    logging.Logger.handle = timed_handle
+
+    timings = []
+    for _ in range(files):
+        started = time.perf_counter()
+        csv_processor.process_csv_and_insert_into_mysql(csv_path, MYSQL_CONFIG, STUDENTS_TABLE, ingest_config)
+        timings.append(time.perf_counter() - started)
+    drain_started = time.perf_counter()
+    shutdown_logging() # Writes what is still queued
+    return {
+        'mode': mode,
+        'files': files,
+        'mean_ms_per_file': round(statistics.mean(timings) * 1000, 3),
+        'median_ms_per_file': round(statistics.median(timings) * 1000, 3),
+        'records_per_file': round(log_call_seconds[1] / files, 1),
+        'log_call_us_per_file': round(log_call_seconds[0] / files * 1e6, 1),
+        'drain_ms': round((time.perf_counter() - drain_started) * 1000, 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=300, help="Files ingested per setup (default: 300)")
+    parser.add_argument('--rows', type=int, default=200, help="Rows per file (default: 200)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--format', choices=('text', 'json'), default='text', help="Log format (default: text)")
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS) # Runs one setup in this process
+    parser.add_argument('--log-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    csv_path = dataset_path(DEFAULT_DATA_DIR, args.rows, args.seed)
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, csv_path, args.files, args.log_dir, args.format)))
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='etl-bench-logging-') as log_dir:
+        for mode in MODES:
+            with open(os.path.join(log_dir, f"{mode}.console"), 'w') as console:
+                completed = subprocess.run(
+                    [sys.executable, '-m', 'benchmarks.bench_logging', '--mode', mode, '--files', str(args.files),
+                     '--rows', str(args.rows), '--seed', str(args.seed), '--format', args.format, '--log-dir', log_dir],
+                    cwd=BASE_DIR, stdout=subprocess.PIPE, stderr=console, text=True, check=True
+                )
+            results[mode] = json.loads(completed.stdout.strip().splitlines()[-1])
+    baseline = results['none']['mean_ms_per_file']
+    for mode in ('sync', 'queue'):
+        results[mode]['overhead_ms_per_file'] = round(results[mode]['mean_ms_per_file'] - baseline, 3)
+    print(json.dumps({'rows_per_file': args.rows, 'format': args.format, 'results': results}, indent=2))
+
+if __name__ == '__main__':
+    main()
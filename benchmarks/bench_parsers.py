@@ -0,0 +1,96 @@
+# benchmarks/bench_parsers.py
+"""
+Benchmark of the v3 parser backends: pandas' C engine vs Arrow's multithreaded reader.
+
+Parses (and converts to row tuples) a synthetic students_performance CSV chunk by chunk
+exactly as the ingest path does, with the schema-driven column types, and reports
+rows/sec per stage. Parquet input is measured too. No database is involved: the table
+schema comes from the stand-in sink. Arrow's advantage grows with the number of cores,
+which is recorded in the output.
+
+Usage (from the project root):
+    python -m benchmarks.bench_parsers --rows 1000000
+"""
+
+import argparse
+import json
+import os
+import platform
+import time
+
+from benchmarks.run_benchmarks import DEFAULT_DATA_DIR, dataset_path
+from benchmarks.stand_in_sink import install_stand_in_sink
+from v3.src.config.settings import INGEST_CONFIG, MYSQL_CONFIG, STUDENTS_TABLE, TABLE_INGEST_CONFIG
+from v3.src.data_layer import csv_processor
+from v3.src.data_layer.arrow_reader import arrow_unavailable
+from v3.src.data_layer.table_schema import build_read_csv_options, get_table_schema
+
+def measure(name, chunks):
+    """Drains (chunk, end_offset) pairs, converting each chunk, and times both stages."""
+    stats = csv_processor.new_ingest_stats()
+    started = time.perf_counter()
+    rows = 0
+    for item in csv_processor.timed_iter(chunks, stats, 'parse_seconds'):
+        rows += len(csv_processor.convert_chunk(item, stats)[1])
+    elapsed = time.perf_counter() - started
+    return {
+        'case': name,
+        'rows': rows,
+        'seconds': round(elapsed, 3),
+        'parse_seconds': round(stats['parse_seconds'], 3),
+        'convert_seconds': round(stats['convert_seconds'], 3),
+        'rows_per_second': round(rows / elapsed) if elapsed else None,
+        'parse_rows_per_second': round(rows / stats['parse_seconds']) if stats['parse_seconds'] else None
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Dataset size in rows (default: 1,000,000)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=INGEST_CONFIG['chunk_size'])
+    parser.add_argument('--output', help="Optional path of a JSON file to write the results to")
+    args = parser.parse_args()
+
+    unavailable = arrow_unavailable()
+    if unavailable:
+        parser.error(unavailable)
+    import pyarrow
+    import pyarrow.csv
+    import pyarrow.parquet as pq
+
+    install_stand_in_sink()
+    csv_path = dataset_path(DEFAULT_DATA_DIR, args.rows, args.seed)
+    schema = get_table_schema(MYSQL_CONFIG, STUDENTS_TABLE)
+    header = list(csv_processor.pd.read_csv(csv_path, nrows=0).columns)
+    categorical_columns = TABLE_INGEST_CONFIG.get(STUDENTS_TABLE, {}).get('categorical_columns', ())
+    read_csv_options = build_read_csv_options(schema, header, categorical_columns)
+
+    parquet_path = os.path.splitext(csv_path)[0] + '.parquet'
+    if not os.path.exists(parquet_path):
+        pq.write_table(pyarrow.csv.read_csv(csv_path), parquet_path)
+
+    results = [
+        measure('pandas_csv', csv_processor.iter_chunks(csv_path, args.chunk_size, read_csv_options, None, csv_processor.PARSER_PANDAS)),
+        measure('arrow_csv', csv_processor.iter_chunks(csv_path, args.chunk_size, read_csv_options, None, csv_processor.PARSER_ARROW)),
+        measure('arrow_parquet', csv_processor.iter_columnar_chunks(parquet_path, args.chunk_size, read_csv_options))
+    ]
+    by_case = {result['case']: result for result in results}
+    summary = {
+        'rows': args.rows,
+        'chunk_size': args.chunk_size,
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'pandas_version': csv_processor.pd.__version__,
+        'pyarrow_version': pyarrow.__version__,
+        'results': results,
+        'arrow_csv_speedup': round(by_case['pandas_csv']['seconds'] / by_case['arrow_csv']['seconds'], 2),
+        'arrow_csv_parse_speedup': round(by_case['pandas_csv']['parse_seconds'] / by_case['arrow_csv']['parse_seconds'], 2)
+    }
+
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(summary, output_file, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+# benchmarks/bench_row_conversion.py
+"""
+Micro-benchmark of the DataFrame-to-row conversion used by the ingest engines.
+
+Compares the original `[tuple(row) for row in df[columns].values]` conversion with the
+column-wise v3 dataframe_to_rows on dropbox/data.csv scaled up to the requested row count.
+
+Usage (from the project root):
+    python -m benchmarks.bench_row_conversion --rows 10000000
+"""
+
+import argparse
+import gc
+import json
+import os
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from v3.src.config.settings import BASE_DIR
+from v3.src.data_layer.row_converter import dataframe_to_rows
+
+SAMPLE_CSV = os.path.join(BASE_DIR, 'dropbox', 'data.csv')
+
+def load_scaled_frame(rows):
+    """Reads the sample CSV and repeats it until the frame has the requested number of rows."""
+    sample = pd.read_csv(SAMPLE_CSV)
+    repeats = -(-rows // len(sample)) # Ceiling division
+    return pd.concat([sample] * repeats, ignore_index=True).iloc[:rows]
+
+def legacy_conversion(df, columns):
+    """The original conversion: one object ndarray, then a tuple per row."""
+    return [tuple(row) for row in df[columns].values]
+
+def measure(name, convert, df, columns):
+    """
+    Runs one conversion twice: once for wall time, once under tracemalloc for memory.
+
+    'peak_mib' is the peak memory allocated during the conversion, 'retained_mib' the
+    size of the returned rows; the difference is the intermediate garbage.
+    """
+    gc.collect()
+    started = time.perf_counter()
+    rows = convert(df, columns)
+    elapsed = time.perf_counter() - started
+    value_types = sorted({type(value).__name__ for value in rows[0]}) if rows else []
+    row_count = len(rows)
+    del rows
+
+    gc.collect()
+    tracemalloc.start()
+    rows = convert(df, columns)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+
+    return {
+        'method': name,
+        'rows': row_count,
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(row_count / elapsed) if elapsed else None,
+        'peak_mib': round(peak / (1024 * 1024), 1),
+        'retained_mib': round(retained / (1024 * 1024), 1),
+        'intermediate_mib': round((peak - retained) / (1024 * 1024), 1),
+        'value_types': value_types
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000_000, help="Number of rows to convert (default: 10,000,000)")
+    parser.add_argument('--output', help="Optional path of a JSON file to write the results to")
+    args = parser.parse_args()
+
+    df = load_scaled_frame(args.rows)
+    columns = [col for col in df.columns if col != 'id']
+
+    results = [
+        measure('legacy_object_matrix', legacy_conversion, df, columns),
+        measure('columnwise', dataframe_to_rows, df, columns)
+    ]
+    legacy, columnwise = results
+    summary = {
+        'rows': args.rows,
+        'numpy_version': np.__version__,
+        'pandas_version': pd.__version__,
+        'results': results,
+        'speedup': round(legacy['seconds'] / columnwise['seconds'], 2) if columnwise['seconds'] else None,
+        'intermediate_memory_saved_mib': round(legacy['intermediate_mib'] - columnwise['intermediate_mib'], 1)
+    }
+
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(summary, output_file, indent=2)
+
+if __name__ == '__main__':
+    main()
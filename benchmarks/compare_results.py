@@ -0,0 +1,78 @@
+# benchmarks/compare_results.py
+"""
+Compares two benchmark result files and flags throughput regressions.
+
+Cases are matched on dataset size, version, engine, parser and target; the cold-start
+time of run_once.py is compared too. The exit status is 1 if any case (or the cold
+start) got slower than the threshold, so this can gate CI.
+
+Usage (from the project root):
+    python -m benchmarks.compare_results benchmarks/results/before.json benchmarks/results/after.json --threshold 10
+"""
+
+import argparse
+import json
+import sys
+
+def case_key(case):
+    # Results from before the parser option were all parsed by pandas (or the legacy path)
+    default_parser = 'pandas' if case.get('version') == 'v3' else 'legacy'
+    return (case.get('dataset_rows'), case.get('version'), case.get('engine'), case.get('parser', default_parser), case.get('target'))
+
+def load_report(path):
+    with open(path) as result_file:
+        return json.load(result_file)
+
+def load_cases(report):
+    return {case_key(case): case for case in report['cases']}
+
+def compare_cold_start(baseline, candidate, threshold_percent):
+    """Returns the comparison line of the cold-start medians (None if a file lacks one), and whether it regressed."""
+    before = (baseline.get('cold_start') or {}).get('median_ms')
+    after = (candidate.get('cold_start') or {}).get('median_ms')
+    if not before or not after:
+        return None, False
+    change = (after - before) / before * 100
+    regressed = change > threshold_percent
+    flag = '  <-- REGRESSION' if regressed else ''
+    return f"{'cold start (run_once.py, empty dropbox)':<41}: {before:>7} -> {after:>7} ms ({change:+.1f}%){flag}", regressed
+
+def compare(baseline, candidate, threshold_percent):
+    """
+    Returns one comparison line per case present in both files, and whether any regressed.
+    """
+    lines = []
+    regressed = False
+    for key in sorted(set(baseline) & set(candidate), key=str):
+        before = baseline[key].get('rows_per_second')
+        after = candidate[key].get('rows_per_second')
+        rows, version, engine, csv_parser, target = key
+        label = f"{version:<3} {str(engine):<12} {str(csv_parser):<6} {target:<5} {rows:>10} rows"
+        if not before or not after:
+            lines.append(f"{label}: missing throughput (before={before}, after={after})")
+            continue
+        change = (after - before) / before * 100
+        flag = ''
+        if change < -threshold_percent:
+            flag = '  <-- REGRESSION'
+            regressed = True
+        lines.append(f"{label}: {before:>10} -> {after:>10} rows/s ({change:+.1f}%){flag}")
+    return lines, regressed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline', help="Earlier result file")
+    parser.add_argument('candidate', help="Newer result file")
+    parser.add_argument('--threshold', type=float, default=10.0, help="Allowed throughput drop (or cold-start increase) in percent (default: 10)")
+    args = parser.parse_args()
+
+    baseline, candidate = load_report(args.baseline), load_report(args.candidate)
+    lines, regressed = compare(load_cases(baseline), load_cases(candidate), args.threshold)
+    cold_start_line, cold_start_regressed = compare_cold_start(baseline, candidate, args.threshold)
+    if cold_start_line:
+        lines.append(cold_start_line)
+    print('\n'.join(lines) or "No matching cases.")
+    sys.exit(1 if regressed or cold_start_regressed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/data_generator.py
+"""
+Synthetic students_performance CSV generator.
+
+Categorical columns are sampled with the value frequencies of dropbox/data.csv and the
+three scores are resampled together from its rows, so generated files look like the
+real drops at any size, from the 1,000-row sample up to tens of millions of rows.
+
+Usage (from the project root):
+    python -m benchmarks.data_generator --rows 10000000 --output /tmp/students_10m.csv
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from v3.src.config.settings import BASE_DIR
+
+SAMPLE_CSV = os.path.join(BASE_DIR, 'dropbox', 'data.csv')
+CATEGORICAL_COLUMNS = ['gender', 'race_ethnicity', 'parental_level_of_education', 'lunch', 'test_preparation_course']
+SCORE_COLUMNS = ['math_score', 'reading_score', 'writing_score']
+
+# Rows generated and written per block, keeps memory flat for very large files
+BLOCK_ROWS = 500_000
+
+def generate_students_csv(output_path, rows, seed=42, sample_csv=SAMPLE_CSV):
+    """
+    Writes a synthetic students_performance CSV with the same header as dropbox/data.csv.
+
+    Args:
+        output_path (str): Where to write the CSV file.
+        rows (int): Number of data rows to generate.
+        seed (int): Random seed, the same seed always produces the same file.
+        sample_csv (str): The CSV whose distributions are reproduced.
+
+    Returns:
+        str: output_path.
+    """
+    sample = pd.read_csv(sample_csv)
+    rng = np.random.default_rng(seed)
+    frequencies = {
+        column: sample[column].value_counts(normalize=True)
+        for column in CATEGORICAL_COLUMNS
+    }
+    scores = sample[SCORE_COLUMNS].to_numpy()
+
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    written = 0
+    with open(output_path, 'w', newline='', encoding='utf-8') as output_file:
+        while written < rows:
+            block_size = min(BLOCK_ROWS, rows - written)
+            block = pd.DataFrame({
+                column: rng.choice(freq.index.to_numpy(), size=block_size, p=freq.to_numpy())
+                for column, freq in frequencies.items()
+            })
+            block[SCORE_COLUMNS] = scores[rng.integers(0, len(scores), size=block_size)]
+            block.to_csv(output_file, header=(written == 0), index=False, lineterminator='\n')
+            written += block_size
+    return output_path
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, required=True, help="Number of data rows to generate")
+    parser.add_argument('--output', required=True, help="Path of the CSV file to write")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed (default: 42)")
+    args = parser.parse_args()
+    generate_students_csv(args.output, args.rows, args.seed)
+    print(f"Wrote {args.rows} rows to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/ingest_case.py
+"""
+Runs one ingest benchmark case and prints its result as a JSON line.
+
+Each case runs in its own process (started by benchmarks.run_benchmarks) so that the
+peak RSS it reports belongs to that case alone.
+
+Usage (from the project root):
+    python -m benchmarks.ingest_case --version v3 --csv /tmp/students_1m.csv --target sink
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError: # Not available on Windows
+    resource = None
+
+def peak_rss_mib():
+    """Peak resident set size of this process in MiB, or None where it cannot be read."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 1)
+
+def run_case(version, csv_path, target, engine=None, parser=None):
+    """
+    Ingests csv_path with the given version's data layer and measures it.
+
+    Args:
+        version (str): 'v1', 'v2' or 'v3'.
+        csv_path (str): The CSV file to ingest (it is not moved or archived).
+        target (str): 'sink' for the local stand-in, 'mysql' for the configured server.
+        engine (str, optional): v3 ingest engine override ('executemany', 'load_data').
+        parser (str, optional): v3 CSV parser override ('pandas', 'arrow').
+
+    Returns:
+        dict: The case parameters and its measurements.
+    """
+    if target == 'sink':
+        from benchmarks.stand_in_sink import install_stand_in_sink
+        install_stand_in_sink()
+
+    settings = importlib.import_module(f"{version}.src.config.settings")
+    csv_processor = importlib.import_module(f"{version}.src.data_layer.csv_processor")
+    table_name = settings.STUDENTS_TABLE
+
+    kwargs = {}
+    stats = None
+    if version == 'v3':
+        ingest_config = {**settings.INGEST_CONFIG, **settings.TABLE_INGEST_CONFIG.get(table_name, {})}
+        if engine:
+            ingest_config['engine'] = engine
+        if parser:
+            ingest_config['parser'] = parser
+        stats = csv_processor.new_ingest_stats()
+        kwargs = {'ingest_config': ingest_config, 'stats': stats}
+
+    started = time.perf_counter()
+    succeeded = csv_processor.process_csv_and_insert_into_mysql(csv_path, settings.MYSQL_CONFIG, table_name, **kwargs)
+    elapsed = time.perf_counter() - started
+
+    rows = stats['rows'] if stats else None
+    if target == 'sink':
+        from benchmarks.stand_in_sink import sink_totals
+        totals = sink_totals()
+        rows = totals['rows_received']
+    result = {
+        'version': version,
+        'engine': engine or ('executemany' if version == 'v3' else 'legacy'),
+        'parser': parser or ('pandas' if version == 'v3' else 'legacy'),
+        'target': target,
+        'csv': os.path.basename(csv_path),
+        'csv_bytes': os.path.getsize(csv_path),
+        'succeeded': bool(succeeded),
+        'rows': rows,
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(rows / elapsed) if rows and elapsed else None,
+        'peak_rss_mib': peak_rss_mib(),
+        'stages': {key: round(value, 3) for key, value in stats.items() if key.endswith('_seconds')} if stats else None,
+        'pipeline': {
+            name: {key: round(value, 3) for key, value in stage.items()}
+            for name, stage in stats['pipeline'].items()
+        } if stats and 'pipeline' in stats else None
+    }
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--version', choices=['v1', 'v2', 'v3'], default='v3')
+    parser.add_argument('--csv', required=True, help="CSV file to ingest")
+    parser.add_argument('--target', choices=['sink', 'mysql'], default='sink')
+    parser.add_argument('--engine', help="v3 ingest engine override")
+    parser.add_argument('--parser', help="v3 CSV parser override")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+    print(json.dumps(run_case(args.version, args.csv, args.target, args.engine, args.parser)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+# benchmarks/run_benchmarks.py
+"""
+Reproducible end-to-end ingest benchmark.
+
+Generates synthetic students_performance CSVs (cached per size and seed), ingests each
+one with every requested version/engine in a separate process, and saves rows/sec, peak
+RSS and per-stage times as JSON under benchmarks/results/, together with the cold-start
+time of the one-shot cron entry point (see benchmarks.bench_cold_start). Compare two
+result files with benchmarks.compare_results to catch regressions.
+
+Usage (from the project root):
+    python -m benchmarks.run_benchmarks --rows 1000 100000 1000000 --versions v1 v2 v3
+    python -m benchmarks.run_benchmarks --rows 1000000 --engines executemany load_data --target mysql
+    python -m benchmarks.run_benchmarks --rows 1000000 --parsers pandas arrow
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+from benchmarks.bench_cold_start import measure_cold_start
+from benchmarks.data_generator import generate_students_csv
+from v3.src.config.settings import BASE_DIR
+
+BENCHMARK_DIR = os.path.join(BASE_DIR, 'benchmarks')
+DEFAULT_DATA_DIR = os.path.join(BENCHMARK_DIR, 'data')
+DEFAULT_RESULTS_DIR = os.path.join(BENCHMARK_DIR, 'results')
+
+def git_revision():
+    """The current git commit of the project, or None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def dataset_path(data_dir, rows, seed):
+    """Returns the cached synthetic CSV for rows/seed, generating it on first use."""
+    path = os.path.join(data_dir, f"students_{rows}_seed{seed}.csv")
+    if not os.path.exists(path):
+        print(f"Generating {rows} rows -> {path}", file=sys.stderr)
+        generate_students_csv(path, rows, seed)
+    return path
+
+def run_case_in_subprocess(version, csv_path, target, engine, parser=None):
+    """Runs benchmarks.ingest_case in a fresh interpreter and returns its JSON result."""
+    command = [sys.executable, '-m', 'benchmarks.ingest_case', '--version', version, '--csv', csv_path, '--target', target]
+    if engine:
+        command += ['--engine', engine]
+    if parser:
+        command += ['--parser', parser]
+    completed = subprocess.run(command, cwd=BASE_DIR, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {'version': version, 'engine': engine, 'parser': parser, 'target': target, 'csv': os.path.basename(csv_path),
+                'succeeded': False, 'error': completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 100_000, 1_000_000], help="Dataset sizes in rows")
+    parser.add_argument('--versions', nargs='+', choices=['v1', 'v2', 'v3'], default=['v3'])
+    parser.add_argument('--engines', nargs='+', default=[None], help="v3 ingest engines to compare (default: configured engine)")
+    parser.add_argument('--parsers', nargs='+', default=[None], help="v3 CSV parsers to compare (default: configured parser)")
+    parser.add_argument('--target', choices=['sink', 'mysql'], default='sink', help="Local stand-in sink or the configured MySQL server")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    parser.add_argument('--output', help="Result file (default: benchmarks/results/<timestamp>.json)")
+    args = parser.parse_args()
+
+    started_at = datetime.datetime.now()
+    cases = []
+    for rows in args.rows:
+        csv_path = dataset_path(args.data_dir, rows, args.seed)
+        for version in args.versions:
+            # Engines and parsers only apply to v3; older versions have a single ingest path
+            for engine in (args.engines if version == 'v3' else [None]):
+                for csv_parser in (args.parsers if version == 'v3' else [None]):
+                    result = run_case_in_subprocess(version, csv_path, args.target, engine, csv_parser)
+                    result['dataset_rows'] = rows
+                    cases.append(result)
+                    print(json.dumps(result), file=sys.stderr)
+
+    report = {
+        'started_at': started_at.isoformat(timespec='seconds'),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'target': args.target,
+        'seed': args.seed,
+        'cold_start': measure_cold_start(),
+        'cases': cases
+    }
+    output_path = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"{started_at:%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w') as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Saved results to {output_path}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+# benchmarks/stand_in_sink.py
+"""
+A local stand-in for MySQL so the ingest path can be benchmarked without a server.
+
+install_stand_in_sink() replaces mysql.connector.connect in the current (benchmark)
+process with a factory for SinkConnection. Every version's data layer connects through
+mysql.connector.connect, so v1, v2 and v3 all write into the sink unchanged. The sink
+answers the few metadata queries the ingest path issues, counts the rows it receives
+and renders every parameter to text, so client-side conversion work is not skipped.
+"""
+
+import re
+
+import mysql.connector
+
+# Mirrors the students_performance definition in sql.txt:
+# (COLUMN_NAME, DATA_TYPE, IS_NULLABLE, COLUMN_DEFAULT, EXTRA)
+STUDENTS_COLUMNS = [
+    ('id', 'int', 'NO', None, 'auto_increment'),
+    ('gender', 'varchar', 'NO', None, ''),
+    ('race_ethnicity', 'varchar', 'NO', None, ''),
+    ('parental_level_of_education', 'varchar', 'NO', None, ''),
+    ('lunch', 'varchar', 'NO', None, ''),
+    ('test_preparation_course', 'varchar', 'NO', None, ''),
+    ('math_score', 'int', 'NO', None, ''),
+    ('reading_score', 'int', 'NO', None, ''),
+    ('writing_score', 'int', 'NO', None, '')
+]
+
+# (INDEX_NAME, COLUMN_NAME) of the unique indexes
+STUDENTS_UNIQUE_KEYS = [
+    ('PRIMARY', 'id')
+]
+
+MAX_ALLOWED_PACKET = 64 * 1024 * 1024
+
+_COLUMN_LIST = re.compile(r'\(([^)]*)\)')
+_INFILE_PATH = re.compile(r"INFILE\s+'([^']*)'", re.IGNORECASE)
+
+class SinkCursor:
+    """Cursor of a SinkConnection."""
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = -1
+        self._result = []
+
+    def execute(self, operation, params=None):
+        statement = operation.lstrip()
+        upper = statement[:64].upper()
+        self._result = []
+        self.rowcount = 0
+        if upper.startswith('SELECT @@MAX_ALLOWED_PACKET'):
+            self._result = [(MAX_ALLOWED_PACKET,)]
+        elif 'INFORMATION_SCHEMA.COLUMNS' in statement.upper():
+            self._result = list(STUDENTS_COLUMNS)
+        elif 'INFORMATION_SCHEMA.STATISTICS' in statement.upper():
+            self._result = list(STUDENTS_UNIQUE_KEYS)
+        elif upper.startswith('SELECT COUNT(*)') or 'INFORMATION_SCHEMA.TABLES' in statement.upper():
+            self._result = [(self.connection.rows_received,)]
+        elif upper.startswith('INSERT'):
+            params = list(params or [])
+            column_count = len(_COLUMN_LIST.search(statement).group(1).split(','))
+            self.rowcount = len(params) // column_count if params else 1
+            self.connection.bytes_received += len(statement) + sum(len(str(value)) for value in params)
+        elif upper.startswith('LOAD DATA'):
+            with open(_INFILE_PATH.search(statement).group(1), 'rb') as data_file:
+                data = data_file.read()
+            self.rowcount = data.count(b'\n')
+            self.connection.bytes_received += len(data)
+        self.connection.rows_received += max(self.rowcount, 0)
+        self.connection.statements += 1
+
+    def executemany(self, operation, seq_params):
+        total = 0
+        for params in seq_params:
+            self.execute(operation, params)
+            total += self.rowcount
+        self.rowcount = total
+
+    def fetchone(self):
+        return self._result.pop(0) if self._result else None
+
+    def fetchmany(self, size=1):
+        batch, self._result = self._result[:size], self._result[size:]
+        return batch
+
+    def fetchall(self):
+        batch, self._result = self._result, []
+        return batch
+
+    def close(self):
+        pass
+
+class SinkConnection:
+    """A connection-shaped object that accepts and counts everything it is sent."""
+    def __init__(self, **kwargs):
+        self.rows_received = 0
+        self.bytes_received = 0
+        self.statements = 0
+        self.in_transaction = False
+        self._connected = True
+        _connections.append(self)
+
+    def cursor(self, *args, **kwargs):
+        return SinkCursor(self)
+
+    def is_connected(self):
+        return self._connected
+
+    def ping(self, *args, **kwargs):
+        pass
+
+    def get_server_info(self):
+        return 'stand-in sink'
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self._connected = False
+
+_connections = []
+
+def install_stand_in_sink():
+    """Routes every mysql.connector.connect() call in this process to a new SinkConnection."""
+    mysql.connector.connect = SinkConnection
+
+def sink_totals():
+    """Rows, bytes and statements received by all sink connections of this process."""
+    return {
+        'rows_received': sum(connection.rows_received for connection in _connections),
+        'bytes_received': sum(connection.bytes_received for connection in _connections),
+        'statements': sum(connection.statements for connection in _connections)
+    }
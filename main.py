@@ -1,11 +1,17 @@
 import time # Import the time module for sleep functionality
+import os
 
 ### Version 3.0.0 configurations
 # Import configurations
-from v3.src.config.settings import LOGGING_CONFIG, SCAN_INTERVAL_SECONDS, DROPBOX_FOLDER, STUDENTS_TABLE
+from v3.src.config.settings import LOGGING_CONFIG, SCAN_INTERVAL_SECONDS, DROPBOX_FOLDER, WATCHDOG_QUEUE_CONFIG, READINESS_CONFIG, WATCH_CONFIG, METRICS_CONFIG
 # Import logging setup from utilities
-from v3.src.data_layer.csv_handler import CSVHandler
+from v3.src.data_layer.csv_handler import CSVHandler, observer_reports_close_events
+from v3.src.data_layer.directory_poller import DirectoryIndex, DirectoryPoller
+from v3.src.business_layer.ingest_queue import IngestQueue
+from v3.src.business_layer.ingest_router import get_ingest_router
+from v3.src.data_layer.db_connection import close_all_pools
 from v3.src.utils.logger import setup_logging
+from v3.src.utils.metrics import start_metrics_exporter
 # Import functions from the business layer
 from v3.src.business_layer.processor_service import process_all_csv_files, display_current_database_records, ensure_directories_exist
 import time
@@ -14,32 +20,71 @@ from watchdog.observers import Observer
 def main():
     """
     Main function to run the MySQL data processing application.
-    Orchestrates the application flow using watchdog for real-time file monitoring.
+    Orchestrates the application flow using watchdog for real-time file monitoring,
+    or polling of the dropbox folder where file system events are not delivered.
     """
     # Setup logging for the entire application
     logger = setup_logging(
         log_file_path=LOGGING_CONFIG['log_file'],
-        log_level_str=LOGGING_CONFIG['log_level']
+        log_level_str=LOGGING_CONFIG['log_level'],
+        log_format=LOGGING_CONFIG['log_format'],
+        max_bytes=LOGGING_CONFIG['max_bytes'],
+        backup_count=LOGGING_CONFIG['backup_count'],
+        use_queue=LOGGING_CONFIG['use_queue']
     )
     logger.info("Starting MySQL Data Processor Application...")
 
+    # Export ingest metrics for Prometheus
+    metrics_exporter = start_metrics_exporter(METRICS_CONFIG)
+
     # Ensure directories exist at startup
     ensure_directories_exist()
 
+    # One process serves every table the routing table sends files to
+    router = get_ingest_router()
+
     # Perform an initial scan for any CSV files already present in the folder
-    logger.info("Performing initial scan for existing CSV files...")
-    process_all_csv_files(STUDENTS_TABLE)
+    # (when polling, the poller's first listing queues them instead)
+    polling = WATCH_CONFIG['mode'] == 'polling'
+    if not polling:
+        logger.info("Performing initial scan for existing CSV files...")
+        process_all_csv_files()
 
     # Display current records in the database after initial scan
-    display_current_database_records(STUDENTS_TABLE)
+    for table_name in router.tables():
+        display_current_database_records(table_name)
 
-    logger.info(f"Starting watchdog to monitor '{DROPBOX_FOLDER}' for new CSV files...")
+    if polling:
+        logger.info("Starting to poll '%s' for new CSV files every %ss...", DROPBOX_FOLDER, SCAN_INTERVAL_SECONDS)
+    else:
+        logger.info("Starting watchdog to monitor '%s' for new CSV files...", DROPBOX_FOLDER)
     logger.info("Press Ctrl+C to stop the application.")
 
-    # Setup watchdog observer
-    event_handler = CSVHandler(STUDENTS_TABLE)
-    observer = Observer()
-    observer.schedule(event_handler, DROPBOX_FOLDER, recursive=False) # Only watch the top-level folder
+    observer = None if polling else Observer()
+
+    # Start the ingest workers fed by the watchdog handler or the poller
+    ingest_queue = IngestQueue(
+        router,
+        max_size=WATCHDOG_QUEUE_CONFIG['max_size'],
+        num_workers=WATCHDOG_QUEUE_CONFIG['workers'],
+        readiness_config=READINESS_CONFIG,
+        # Wait for the writer to close each file where the observer reports it
+        close_events=not polling and READINESS_CONFIG['use_close_events'] and observer_reports_close_events(observer)
+    )
+    ingest_queue.start()
+
+    directory_index = None
+    if polling:
+        # Feeds the same queue from directory listings
+        directory_index = DirectoryIndex(DROPBOX_FOLDER, WATCH_CONFIG['index_path'])
+        observer = DirectoryPoller(
+            DROPBOX_FOLDER, ingest_queue, SCAN_INTERVAL_SECONDS, directory_index,
+            full_stat_every=WATCH_CONFIG['full_stat_every']
+        )
+    else:
+        # Setup watchdog observer
+        event_handler = CSVHandler(ingest_queue)
+        observer.schedule(event_handler, DROPBOX_FOLDER, recursive=False) # Only watch the top-level folder
 
     try:
         observer.start() # Start the observer thread
@@ -48,10 +93,19 @@ def main():
     except KeyboardInterrupt:
         logger.info("Application stopped by user (Ctrl+C).")
     except Exception as e:
-        logger.critical(f"An unexpected critical error occurred: {e}", exc_info=True)
+        logger.critical("An unexpected critical error occurred: %s", e, exc_info=True)
     finally:
         observer.stop() # Stop the observer thread
         observer.join() # Wait until the observer thread terminates
+        ingest_queue.stop() # Finish the queued files and stop the workers
+        if directory_index is not None:
+            # Files that failed, matched no route or were left half-written are queued
+            # again on the next start, as the initial scan does in events mode
+            directory_index.forget(os.path.basename(file_path) for file_path in ingest_queue.left_behind_files())
+            directory_index.close()
+        close_all_pools() # Close pooled MySQL connections
+        if metrics_exporter is not None:
+            metrics_exporter.stop()
         logger.info("Application finished.")
 
 if __name__ == "__main__":
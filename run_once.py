@@ -0,0 +1,69 @@
+"""
+One-shot batch run for cron / Task Scheduler: loads the files waiting in the dropbox
+folder, archives them and exits.
+
+The dropbox is checked before pandas, numpy, pyarrow or mysql.connector are imported,
+so a tick that finds no files exits after little more than the interpreter start-up.
+The exit status is 0 when every file was loaded (or there was none) and 1 otherwise.
+
+Example crontab entry, every 5 minutes:
+    */5 * * * * cd /path/to/project && venv/bin/python run_once.py
+"""
+
+import os
+import sys
+
+### Version 3.0.0 configurations
+# Only light modules are imported up front
+from v3.src.config.settings import DROPBOX_FOLDER, LOGGING_CONFIG, METRICS_CONFIG
+from v3.src.data_layer.arrow_reader import is_columnar_file
+from v3.src.data_layer.compressed_input import is_csv_file
+
+def dropbox_has_input_files(directory):
+    """True if the directory holds at least one file the processor can load."""
+    try:
+        with os.scandir(directory) as entries:
+            return any(entry.is_file() and (is_csv_file(entry.name) or is_columnar_file(entry.name)) for entry in entries)
+    except FileNotFoundError:
+        return False
+
+def main():
+    """
+    Processes the dropbox folder once.
+
+    Returns:
+        int: The process exit status.
+    """
+    if not dropbox_has_input_files(DROPBOX_FOLDER):
+        return 0
+
+    # Files are waiting: only now pay for pandas, the MySQL driver and the rest
+    from v3.src.business_layer.processor_service import process_all_csv_files
+    from v3.src.data_layer.db_connection import close_all_pools
+    from v3.src.utils.logger import setup_logging
+    from v3.src.utils.metrics import write_textfile
+
+    logger = setup_logging(
+        log_file_path=LOGGING_CONFIG['log_file'],
+        log_level_str=LOGGING_CONFIG['log_level'],
+        log_format=LOGGING_CONFIG['log_format'],
+        max_bytes=LOGGING_CONFIG['max_bytes'],
+        backup_count=LOGGING_CONFIG['backup_count'],
+        use_queue=LOGGING_CONFIG['use_queue']
+    )
+    logger.info("One-shot run: processing the files in '%s'...", DROPBOX_FOLDER)
+    summary = None
+    try:
+        summary = process_all_csv_files()
+    finally:
+        close_all_pools() # Close pooled MySQL connections
+        # There is no scrape endpoint between cron ticks; leave the metrics for node_exporter
+        if METRICS_CONFIG['enabled'] and METRICS_CONFIG.get('textfile_path'):
+            try:
+                write_textfile(METRICS_CONFIG['textfile_path'])
+            except OSError as e:
+                logger.warning("Could not write the metrics textfile: %s", e)
+    return 0 if summary is not None and not summary['files_failed'] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import csv
+import io
+import math
+
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+import pyarrow.ipc
+import pyarrow.parquet
+
+from v3.src.data_layer.arrow_reader import (
+    MIN_BLOCK_BYTES, arrow_to_rows, columnar_column_names, csv_convert_options, is_columnar_file, iter_columnar_batches,
+    parse_csv_bytes
+)
+from v3.src.data_layer.csv_processor import PARSER_ARROW, PARSER_PANDAS, convert_chunk, iter_chunks, new_ingest_stats
+
+READ_CSV_OPTIONS = {
+    'usecols': ['gender', 'lunch', 'math_score', 'average'],
+    'dtype': {'gender': str, 'lunch': 'category', 'average': 'float64'},
+    'parse_dates': []
+}
+
+def test_quoted_line_breaks_across_parser_blocks():
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(['number', 'comment'])
+    for number in range(60000):
+        writer.writerow([number, f'first line\nsecond line of {number}' if number % 3 == 0 else 'short'])
+    data = text.getvalue().encode('utf-8')
+    assert len(data) > 4 * MIN_BLOCK_BYTES # Parsed in several blocks
+
+    table = parse_csv_bytes(data, csv_convert_options({}))
+    assert table.num_rows == 60000
+    assert table.column('comment')[59997].as_py() == 'first line\nsecond line of 59997'
+
+def test_convert_options_follow_the_read_csv_options():
+    data = b"gender,lunch,math_score,average,ignored\nfemale,standard,72,72.5,x\nmale,free,,,y\n"
+    table = parse_csv_bytes(data, csv_convert_options(READ_CSV_OPTIONS))
+
+    assert table.schema.names == ['gender', 'lunch', 'math_score', 'average']
+    assert pa.types.is_dictionary(table.schema.field('lunch').type)
+    assert pa.types.is_float64(table.schema.field('average').type)
+    assert pa.types.is_integer(table.schema.field('math_score').type)
+    assert arrow_to_rows(table, ['gender', 'lunch', 'math_score', 'average']) == [
+        ('female', 'standard', 72, 72.5), ('male', 'free', None, None)
+    ]
+
+def test_nan_is_sent_as_null():
+    table = pa.table({'average': pa.array([1.5, math.nan, None])})
+    assert arrow_to_rows(table, ['average']) == [(1.5,), (None,), (None,)]
+
+def test_both_parsers_produce_the_same_rows(tmp_path):
+    path = tmp_path / 'scores.csv'
+    path.write_text("gender,lunch,math_score,average\n" + "female,standard,72,72.5\nmale,\"free\nor reduced\",61,\n" * 50)
+    rows = {}
+    for parser in (PARSER_PANDAS, PARSER_ARROW):
+        rows[parser] = []
+        for item in iter_chunks(str(path), 30, READ_CSV_OPTIONS, start_offset=0, parser=parser):
+            rows[parser].extend(convert_chunk(item, new_ingest_stats())[1])
+    assert len(rows[PARSER_ARROW]) == 100
+    assert rows[PARSER_ARROW] == rows[PARSER_PANDAS]
+
+@pytest.mark.parametrize('file_name', ['scores.parquet', 'scores.arrow', 'scores.feather'])
+def test_columnar_files_are_read_batch_by_batch(tmp_path, file_name):
+    path = str(tmp_path / file_name)
+    table = pa.table({'gender': ['female', 'male'] * 50, 'math_score': list(range(100)), 'note': ['x'] * 100})
+    if file_name.endswith('.parquet'):
+        pyarrow.parquet.write_table(table, path)
+    else:
+        with pyarrow.ipc.new_file(path, table.schema) as writer:
+            for batch in table.to_batches(max_chunksize=40):
+                writer.write_batch(batch)
+
+    assert is_columnar_file(path)
+    assert columnar_column_names(path) == ['gender', 'math_score', 'note']
+    batches = list(iter_columnar_batches(path, 40, ['gender', 'math_score']))
+    assert len(batches) == 3
+    rows = [row for batch in batches for row in arrow_to_rows(batch, ['gender', 'math_score'])]
+    assert rows == list(zip(table.column('gender').to_pylist(), table.column('math_score').to_pylist()))
@@ -0,0 +1,71 @@
+import csv
+
+import pytest
+from mysql.connector import Error
+
+from v3.src.data_layer.batch_inserter import BatchInserter
+from v3.src.data_layer.csv_processor import PARSER_ARROW, PARSER_PANDAS, convert_chunk, iter_chunks, new_ingest_stats
+from v3.src.data_layer.dead_letter import DeadLetterFile
+from v3.src.data_layer.table_schema import build_read_csv_options
+
+SCHEMA = [
+    {'name': 'id', 'data_type': 'int', 'nullable': False, 'has_default': False, 'auto_increment': True, 'generated': False},
+    {'name': 'gender', 'data_type': 'varchar', 'nullable': False, 'has_default': False, 'auto_increment': False, 'generated': False},
+    {'name': 'math_score', 'data_type': 'int', 'nullable': False, 'has_default': False, 'auto_increment': False, 'generated': False},
+]
+
+class StrictCursor:
+    """Accepts multi-row INSERTs like MySQL in strict mode does for a NOT NULL INT column."""
+    def __init__(self, column_count, score_index):
+        self.column_count = column_count
+        self.score_index = score_index
+        self.rows = []
+        self.rowcount = -1
+
+    def execute(self, statement, params):
+        rows = [tuple(params[start:start + self.column_count]) for start in range(0, len(params), self.column_count)]
+        for row in rows:
+            score = row[self.score_index]
+            if score is None:
+                raise Error(msg="Column 'math_score' cannot be null", errno=1048, sqlstate='23000')
+            if not isinstance(score, int) and not str(score).isdigit():
+                raise Error(msg=f"Incorrect integer value: '{score}'", errno=1366, sqlstate='HY000')
+        self.rows.extend(rows)
+        self.rowcount = len(rows)
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'scores.csv'
+    with open(path, 'w', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(['gender', 'math_score'])
+        for number in range(100):
+            writer.writerow(['female', 50 + number % 40])
+        writer.writerow(['male', 'abc']) # Malformed integer
+        writer.writerow(['male', ''])    # Blank in a NOT NULL column
+        writer.writerow(['female', 77])
+    return path
+
+@pytest.mark.parametrize('parser', [PARSER_PANDAS, PARSER_ARROW])
+def test_malformed_and_blank_integers_are_dead_lettered(tmp_path, csv_path, parser):
+    if parser == PARSER_ARROW:
+        pytest.importorskip('pyarrow')
+    read_csv_options = build_read_csv_options(SCHEMA, ['gender', 'math_score'])
+    dead_letter = DeadLetterFile(str(tmp_path / 'scores.csv.rejected.csv'), ['gender', 'math_score'])
+    cursor = StrictCursor(2, 1)
+    inserter = None
+    inserted = 0
+    for item in iter_chunks(str(csv_path), 50, read_csv_options, parser=parser):
+        columns, rows, _ = convert_chunk(item, new_ingest_stats())
+        if inserter is None:
+            inserter = BatchInserter(cursor, 'scores', columns, 1024 * 1024, reject_row=dead_letter.write)
+        inserted += inserter.insert(rows)
+    dead_letter.commit()
+
+    assert inserted == 101
+    assert len(cursor.rows) == 101
+    with open(dead_letter.path, newline='') as dead_letter_file:
+        rejected = list(csv.reader(dead_letter_file))
+    assert rejected[0] == ['gender', 'math_score', 'error']
+    assert [row[:2] for row in rejected[1:]] == [['male', 'abc'], ['male', '']]
+    assert rejected[1][2].startswith('1366') and rejected[2][2].startswith('1048')
@@ -0,0 +1,76 @@
+from datetime import datetime
+
+from mysql.connector.conversion import MySQLConverter
+
+from v3.src.data_layer.batch_inserter import BatchInserter
+
+def render_value(value):
+    """Renders a value as MySQL would receive it in the statement."""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, str):
+        return "'" + MySQLConverter.escape(value) + "'"
+    return str(value)
+
+class RecordingCursor:
+    def __init__(self, column_count):
+        self.column_count = column_count
+        self.statement_bytes = []
+        self.rows = []
+        self.rowcount = -1
+
+    def execute(self, statement, params):
+        rendered = statement % tuple(render_value(value) for value in params)
+        self.statement_bytes.append(len(rendered.encode('utf-8')))
+        rows = [tuple(params[start:start + self.column_count]) for start in range(0, len(params), self.column_count)]
+        self.rows.extend(rows)
+        self.rowcount = len(rows)
+
+def test_wide_and_multibyte_rows_late_in_chunk_stay_within_packet():
+    max_allowed_packet = 64 * 1024
+    narrow = [('a', number, None) for number in range(500)]
+    wide = [('é' * 3000, number, "it's") for number in range(40)] # 6000 bytes of text each
+    rows = narrow + wide + narrow
+    cursor = RecordingCursor(3)
+    inserter = BatchInserter(cursor, 'scores', ['name', 'score', 'note'], max_batch_bytes=max_allowed_packet // 2)
+
+    assert inserter.insert(rows) == len(rows)
+    assert cursor.rows == rows
+    assert max(cursor.statement_bytes) <= max_allowed_packet
+
+def test_small_chunk_goes_out_in_one_statement():
+    rows = [('a', number, None) for number in range(100)]
+    cursor = RecordingCursor(3)
+    BatchInserter(cursor, 'scores', ['name', 'score', 'note'], max_batch_bytes=1024 * 1024).insert(rows)
+    assert len(cursor.statement_bytes) == 1
+
+def test_batches_respect_max_batch_rows():
+    rows = [('a', number, None) for number in range(25)]
+    cursor = RecordingCursor(3)
+    BatchInserter(cursor, 'scores', ['name', 'score', 'note'], max_batch_bytes=1024 * 1024, max_batch_rows=10).insert(rows)
+    assert len(cursor.statement_bytes) == 3
+    assert cursor.rows == rows
+
+def test_rows_with_datetimes_are_measured_row_by_row():
+    rows = [(datetime(2024, 1, 1), 'é' * 3000) for _ in range(40)]
+    cursor = RecordingCursor(2)
+    BatchInserter(cursor, 'events', ['occurred_at', 'note'], max_batch_bytes=32 * 1024).insert(rows)
+    assert cursor.rows == rows
+    assert max(cursor.statement_bytes) <= 64 * 1024
+
+def test_escaped_text_stays_within_the_byte_budget():
+    # Every character of these values is sent backslash-escaped, doubling its size
+    max_batch_bytes = 64 * 1024
+    rows = [("'" * 2000, '\\' * 500 + '"\n\r\x1a' * 100, number) for number in range(200)]
+    cursor = RecordingCursor(3)
+    BatchInserter(cursor, 'notes', ['quote', 'text', 'number'], max_batch_bytes=max_batch_bytes).insert(rows)
+    assert cursor.rows == rows
+    assert max(cursor.statement_bytes) <= max_batch_bytes
+
+def test_escaped_text_with_datetimes_stays_within_the_byte_budget():
+    max_batch_bytes = 32 * 1024
+    rows = [(datetime(2024, 1, 1), "'" * 1500 + 'é' * 500) for _ in range(60)]
+    cursor = RecordingCursor(2)
+    BatchInserter(cursor, 'events', ['occurred_at', 'note'], max_batch_bytes=max_batch_bytes).insert(rows)
+    assert cursor.rows == rows
+    assert max(cursor.statement_bytes) <= max_batch_bytes
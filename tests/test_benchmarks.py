@@ -0,0 +1,53 @@
+import pandas as pd
+
+from benchmarks import data_generator
+from benchmarks.compare_results import compare, compare_cold_start, load_cases
+from benchmarks.data_generator import CATEGORICAL_COLUMNS, SAMPLE_CSV, SCORE_COLUMNS, generate_students_csv
+
+def test_the_same_seed_generates_the_same_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_generator, 'BLOCK_ROWS', 300) # Several blocks
+    first = generate_students_csv(str(tmp_path / 'first.csv'), 1000, seed=7)
+    second = generate_students_csv(str(tmp_path / 'second.csv'), 1000, seed=7)
+    other = generate_students_csv(str(tmp_path / 'other.csv'), 1000, seed=8)
+    with open(first, 'rb') as first_file, open(second, 'rb') as second_file, open(other, 'rb') as other_file:
+        content = first_file.read()
+        assert second_file.read() == content
+        assert other_file.read() != content
+
+def test_generated_rows_look_like_the_sample(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_generator, 'BLOCK_ROWS', 300)
+    generated = pd.read_csv(generate_students_csv(str(tmp_path / 'nested' / 'students.csv'), 1000))
+    sample = pd.read_csv(SAMPLE_CSV)
+    assert list(generated.columns) == list(sample.columns) # One header, even across blocks
+    assert len(generated) == 1000
+    for column in CATEGORICAL_COLUMNS:
+        assert set(generated[column]) <= set(sample[column])
+    sample_scores = set(sample[SCORE_COLUMNS].itertuples(index=False, name=None))
+    assert set(generated[SCORE_COLUMNS].itertuples(index=False, name=None)) <= sample_scores
+
+def case(rows_per_second, engine='executemany', parser='pandas'):
+    return {
+        'dataset_rows': 1000, 'version': 'v3', 'engine': engine, 'parser': parser,
+        'target': 'sink', 'rows_per_second': rows_per_second
+    }
+
+def test_throughput_drops_beyond_the_threshold_are_regressions():
+    baseline = load_cases({'cases': [case(1000), case(1000, engine='load_data')]})
+    candidate = load_cases({'cases': [case(950), case(850, engine='load_data')]})
+    lines, regressed = compare(baseline, candidate, 10)
+    assert regressed
+    assert [line.endswith('<-- REGRESSION') for line in lines] == [False, True]
+    _, regressed = compare(baseline, candidate, 20)
+    assert not regressed
+
+def test_cases_are_matched_on_the_parser_with_pandas_for_older_reports():
+    older = dict(case(1000))
+    del older['parser']
+    lines, _ = compare(load_cases({'cases': [older]}), load_cases({'cases': [case(500), case(2000, parser='arrow')]}), 10)
+    assert len(lines) == 1
+    assert '1000 ->        500' in lines[0]
+
+def test_a_slower_cold_start_is_a_regression():
+    line, regressed = compare_cold_start({'cold_start': {'median_ms': 100}}, {'cold_start': {'median_ms': 120}}, 10)
+    assert regressed and '+20.0%' in line
+    assert compare_cold_start({}, {'cold_start': {'median_ms': 120}}, 10) == (None, False)
@@ -0,0 +1,136 @@
+import contextlib
+import csv
+import io
+
+import pandas as pd
+import pytest
+from mysql.connector import Error
+
+from v3.src.data_layer import csv_processor
+from v3.src.data_layer.csv_processor import PARSER_ARROW, PARSER_PANDAS, iter_chunks, process_csv_and_insert_into_mysql
+
+FILE_KEY = 'f' * 64
+COLUMNS = ['name', 'comment', 'score']
+OPTIONS = {
+    'chunk_size': 7, 'commit_mode': 'chunk', 'engine': 'executemany', 'checkpoint': True,
+    'pipeline': False, 'isolate_bad_rows': False, 'use_table_schema': False
+}
+
+def comment(number):
+    if number % 3 == 0:
+        return f'line one of {number}\nline "two", with a comma\n\nand a last line'
+    return f'plain {number}'
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'scores.csv'
+    with open(path, 'w', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(COLUMNS)
+        for number in range(120):
+            writer.writerow([f'student {number}', comment(number), number])
+    return str(path)
+
+EXPECTED_ROWS = [(f'student {number}', comment(number), number) for number in range(120)]
+
+def parsers():
+    return [PARSER_PANDAS, pytest.param(PARSER_ARROW, marks=pytest.mark.skipif(
+        csv_processor.arrow_unavailable() is not None, reason="pyarrow is not installed"
+    ))]
+
+def parsed_rows(chunk):
+    frame = chunk if isinstance(chunk, pd.DataFrame) else chunk.to_pandas()
+    return [(name, text, int(score)) for name, text, score in frame[COLUMNS].itertuples(index=False)]
+
+@pytest.mark.parametrize('parser', parsers())
+def test_resuming_from_any_chunk_offset_reads_exactly_the_remaining_records(csv_path, parser):
+    offsets = [0]
+    chunk_rows = []
+    for chunk, end_offset in iter_chunks(csv_path, 7, {}, start_offset=0, parser=parser):
+        chunk_rows.append(parsed_rows(chunk))
+        offsets.append(end_offset)
+    assert [row for rows in chunk_rows for row in rows] == EXPECTED_ROWS
+    assert len(chunk_rows) > 5
+
+    for index, offset in enumerate(offsets):
+        resumed = [row for chunk, _ in iter_chunks(csv_path, 7, {}, start_offset=offset, parser=parser) for row in parsed_rows(chunk)]
+        assert resumed == [row for rows in chunk_rows[index:] for row in rows]
+
+class FakeDatabase:
+    """Committed target rows and checkpoints; the INSERT number fail_on_insert loses the connection."""
+    def __init__(self, fail_on_insert=None):
+        self.rows = []
+        self.checkpoints = {}
+        self.inserts = 0
+        self.fail_on_insert = fail_on_insert
+
+class FakeConnection:
+    def __init__(self, database):
+        self.database = database
+        self.pending_rows = []
+        self.pending_checkpoints = {}
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.database.rows.extend(self.pending_rows)
+        self.database.checkpoints.update(self.pending_checkpoints)
+        self.rollback()
+
+    def rollback(self):
+        self.pending_rows = []
+        self.pending_checkpoints = {}
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = -1
+        self._result = None
+
+    def execute(self, statement, params=None):
+        database = self.connection.database
+        if statement.startswith('SELECT @@max_allowed_packet'):
+            self._result = (64 * 1024 * 1024,)
+        elif statement.startswith('SELECT byte_offset'):
+            self._result = database.checkpoints.get(params[0])
+        elif statement.startswith('INSERT INTO etl_ingest_checkpoints'):
+            self.connection.pending_checkpoints[params[0]] = tuple(params[3:7])
+        elif statement.startswith('INSERT INTO scores'):
+            database.inserts += 1
+            if database.inserts == database.fail_on_insert:
+                raise Error(msg="Lost connection to MySQL server during query", errno=2013)
+            rows = [tuple(params[start:start + len(COLUMNS)]) for start in range(0, len(params), len(COLUMNS))]
+            self.connection.pending_rows.extend(rows)
+            self.rowcount = len(rows)
+
+    def fetchone(self):
+        return self._result
+
+    def close(self):
+        pass
+
+def load(monkeypatch, csv_path, database, parser):
+    @contextlib.contextmanager
+    def pooled_connection(mysql_config):
+        yield FakeConnection(database)
+    monkeypatch.setattr(csv_processor, 'pooled_connection', pooled_connection)
+    options = dict(OPTIONS, parser=parser)
+    return process_csv_and_insert_into_mysql(csv_path, {'database': 'etl'}, 'scores', options, file_key=FILE_KEY)
+
+@pytest.mark.parametrize('parser', parsers())
+def test_restart_after_a_crash_loads_every_record_once(monkeypatch, csv_path, parser):
+    database = FakeDatabase(fail_on_insert=4)
+    assert load(monkeypatch, csv_path, database, parser) is False
+    byte_offset, rows_committed, chunks_committed, completed = database.checkpoints[FILE_KEY]
+    assert (rows_committed, chunks_committed, completed) == (len(database.rows), 3, False)
+    assert 0 < len(database.rows) < len(EXPECTED_ROWS)
+
+    assert load(monkeypatch, csv_path, database, parser) is True
+    assert database.rows == EXPECTED_ROWS
+    assert database.checkpoints[FILE_KEY][1] == len(EXPECTED_ROWS)
+    assert database.checkpoints[FILE_KEY][3] is True
+
+    # A completed checkpoint makes a third run insert nothing
+    assert load(monkeypatch, csv_path, database, parser) is True
+    assert database.rows == EXPECTED_ROWS
@@ -0,0 +1,77 @@
+import bz2
+import csv
+import gzip
+import io
+import lzma
+import sys
+
+import pytest
+
+from v3.src.data_layer import compressed_input
+from v3.src.data_layer.compressed_input import compression_unavailable, csv_compression, is_csv_file, open_csv_stream
+from v3.src.data_layer.csv_processor import is_input_file, iter_chunks, process_csv_and_insert_into_mysql
+
+COLUMNS = ['name', 'comment', 'score']
+ROWS = [(f'student {number}', f'first line\nsecond, line {number}' if number % 4 == 0 else 'plain', number) for number in range(50)]
+
+def csv_bytes():
+    text = io.StringIO()
+    writer = csv.writer(text, lineterminator='\n')
+    writer.writerow(COLUMNS)
+    writer.writerows(ROWS)
+    return text.getvalue().encode('utf-8')
+
+def compress_zstd(data):
+    zstandard = pytest.importorskip('zstandard')
+    # Two frames, as written by parallel compressors
+    middle = len(data) // 2
+    compressor = zstandard.ZstdCompressor()
+    return compressor.compress(data[:middle]) + compressor.compress(data[middle:])
+
+COMPRESSORS = {
+    '.csv': lambda data: data,
+    '.csv.gz': gzip.compress,
+    '.csv.bz2': bz2.compress,
+    '.csv.xz': lzma.compress,
+    '.csv.zst': compress_zstd,
+}
+
+@pytest.fixture(params=list(COMPRESSORS))
+def csv_path(request, tmp_path):
+    path = tmp_path / f'scores{request.param}'
+    path.write_bytes(COMPRESSORS[request.param](csv_bytes()))
+    return str(path)
+
+def chunk_rows(chunks):
+    return [tuple(row) for chunk, _ in chunks for row in chunk[COLUMNS].itertuples(index=False)]
+
+def test_file_names_select_the_compression():
+    assert [csv_compression(f'a{suffix}') for suffix in COMPRESSORS] == [None, 'gzip', 'bz2', 'xz', 'zstd']
+    assert all(is_csv_file(f'a{suffix}') and is_input_file(f'a{suffix}') for suffix in COMPRESSORS)
+    assert not is_csv_file('a.csv.zip')
+    assert not is_csv_file('a.gz')
+
+def test_the_stream_is_the_uncompressed_file(csv_path):
+    with open_csv_stream(csv_path) as stream:
+        assert stream.read() == csv_bytes()
+
+@pytest.mark.parametrize('start_offset', [None, 0])
+def test_compressed_files_are_parsed_in_chunks(csv_path, start_offset):
+    assert chunk_rows(iter_chunks(csv_path, 8, {}, start_offset=start_offset)) == ROWS
+
+def test_a_compressed_file_resumes_from_an_uncompressed_offset(csv_path):
+    chunks = list(iter_chunks(csv_path, 8, {}, start_offset=0))
+    resume_offset = chunks[2][1]
+    assert resume_offset < len(csv_bytes())
+    assert chunk_rows(iter_chunks(csv_path, 8, {}, start_offset=resume_offset)) == chunk_rows(chunks[3:])
+
+def test_zstd_files_need_the_zstandard_package(tmp_path, monkeypatch):
+    monkeypatch.setattr(compressed_input, 'zstandard', None)
+    monkeypatch.setitem(sys.modules, 'zstandard', None) # Makes the import fail
+    path = str(tmp_path / 'scores.csv.zst')
+    assert 'zstandard' in compression_unavailable(path)
+    assert compression_unavailable(str(tmp_path / 'scores.csv.gz')) is None
+    with pytest.raises(ImportError):
+        open_csv_stream(path)
+    # Reported before any connection is opened
+    assert process_csv_and_insert_into_mysql(path, {'database': 'etl'}, 'scores', {'pipeline': False}) is False
@@ -0,0 +1,228 @@
+import contextlib
+import os
+import re
+
+import pandas as pd
+import pytest
+from mysql.connector import Error
+
+from v3.src.data_layer import csv_processor
+from v3.src.data_layer.csv_processor import (
+    format_load_data_value, iter_chunks, load_data_local_infile, new_ingest_stats, process_csv_and_insert_into_mysql
+)
+
+COLUMNS = ['name', 'score']
+OPTIONS = {'chunk_size': 10, 'engine': 'executemany', 'pipeline': False, 'use_table_schema': False}
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'scores.csv'
+    path.write_text('name,score\n' + ''.join(f'student {number},{number}\n' for number in range(45)))
+    return str(path)
+
+EXPECTED_ROWS = [(f'student {number}', number) for number in range(45)]
+
+class FakeConnection:
+    """
+    Keeps inserted rows pending until commit(); the INSERT number fail_on_insert fails,
+    and LOAD DATA fails with local_infile_errno if it is set.
+    """
+    def __init__(self, fail_on_insert=None, local_infile_errno=None):
+        self.committed_rows = []
+        self.pending_rows = []
+        self.commits = 0
+        self.inserts = 0
+        self.loads = 0
+        self.fail_on_insert = fail_on_insert
+        self.local_infile_errno = local_infile_errno
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+        self.committed_rows.extend(self.pending_rows)
+        self.pending_rows = []
+
+    def rollback(self):
+        self.pending_rows = []
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = -1
+        self._result = None
+
+    def execute(self, statement, params=None):
+        if statement.startswith('SELECT @@max_allowed_packet'):
+            self._result = (64 * 1024 * 1024,)
+        elif statement.startswith('INSERT INTO scores'):
+            self.connection.inserts += 1
+            if self.connection.inserts == self.connection.fail_on_insert:
+                raise Error(msg="Lost connection to MySQL server during query", errno=2013)
+            rows = [tuple(params[start:start + len(COLUMNS)]) for start in range(0, len(params), len(COLUMNS))]
+            self.connection.pending_rows.extend(rows)
+            self.rowcount = len(rows)
+        elif statement.startswith('LOAD DATA LOCAL INFILE'):
+            self.connection.loads += 1
+            if self.connection.local_infile_errno is not None:
+                raise Error(msg="Loading local data is disabled", errno=self.connection.local_infile_errno)
+            path = re.match(r"LOAD DATA LOCAL INFILE '([^']*)'", statement).group(1)
+            with open(path, encoding='utf-8') as data_file:
+                rows = [(name, int(score)) for name, score in (line.rstrip('\n').split('\t') for line in data_file)]
+            self.connection.pending_rows.extend(rows)
+            self.rowcount = len(rows)
+
+    def fetchone(self):
+        return self._result
+
+    def close(self):
+        pass
+
+def load(monkeypatch, csv_path, connection, mysql_config=None, **options):
+    @contextlib.contextmanager
+    def pooled_connection(mysql_config):
+        yield connection
+    monkeypatch.setattr(csv_processor, 'pooled_connection', pooled_connection)
+    stats = new_ingest_stats()
+    mysql_config = mysql_config or {'database': 'etl'}
+    succeeded = process_csv_and_insert_into_mysql(csv_path, mysql_config, 'scores', dict(OPTIONS, **options), stats)
+    return succeeded, stats
+
+def test_chunks_hold_at_most_chunk_size_rows(csv_path):
+    chunks = [chunk for chunk, _ in iter_chunks(csv_path, 10, {})]
+    assert [len(chunk) for chunk in chunks] == [10, 10, 10, 10, 5]
+
+def test_commit_per_file_commits_every_chunk_at_once(monkeypatch, csv_path):
+    connection = FakeConnection()
+    succeeded, stats = load(monkeypatch, csv_path, connection, commit_mode='file')
+    assert succeeded is True
+    assert connection.committed_rows == EXPECTED_ROWS
+    assert connection.commits == 1
+    assert (stats['rows'], stats['chunks']) == (45, 5)
+
+def test_commit_per_chunk_commits_each_chunk(monkeypatch, csv_path):
+    connection = FakeConnection()
+    succeeded, stats = load(monkeypatch, csv_path, connection, commit_mode='chunk')
+    assert succeeded is True
+    assert connection.committed_rows == EXPECTED_ROWS
+    assert connection.commits == 5 + 1 # One per chunk, then the final (empty) commit
+    assert (stats['rows'], stats['chunks']) == (45, 5)
+
+@pytest.mark.parametrize('commit_mode, committed', [('file', 0), ('chunk', 30)])
+def test_a_failed_chunk_keeps_only_what_was_committed(monkeypatch, csv_path, commit_mode, committed):
+    connection = FakeConnection(fail_on_insert=4)
+    succeeded, _ = load(monkeypatch, csv_path, connection, commit_mode=commit_mode)
+    assert succeeded is False
+    assert connection.committed_rows == EXPECTED_ROWS[:committed]
+    assert connection.pending_rows == []
+
+def test_unknown_commit_mode_is_rejected(monkeypatch, csv_path):
+    connection = FakeConnection()
+    succeeded, _ = load(monkeypatch, csv_path, connection, commit_mode='row')
+    assert succeeded is False
+    assert connection.inserts == 0
+
+def test_load_data_values_are_escaped_and_nulls_written_as_backslash_n():
+    assert format_load_data_value(None) == '\\N'
+    assert format_load_data_value(float('nan')) == '\\N'
+    assert format_load_data_value(True) == '1'
+    assert format_load_data_value(12.5) == '12.5'
+    assert format_load_data_value('a\tb\nc\\d\re\0') == 'a\\tb\\nc\\\\d\\re\\0'
+
+class StatementCursor:
+    def __init__(self):
+        self.statements = []
+        self.data = None
+        self.path = None
+        self.rowcount = -1
+
+    def execute(self, statement, params=None):
+        self.statements.append(statement)
+        path = re.match(r"LOAD DATA LOCAL INFILE '([^']*)'", statement).group(1)
+        with open(path, encoding='utf-8', newline='') as data_file:
+            self.data = data_file.read()
+        self.path = path
+        self.rowcount = self.data.count('\n')
+
+def test_load_data_local_infile_loads_a_temporary_file_and_removes_it():
+    cursor = StatementCursor()
+    loaded = load_data_local_infile(cursor, 'scores', COLUMNS, [('ann', 1), ('line\nbreak', None)])
+    assert loaded == 2
+    assert cursor.data == 'ann\t1\nline\\nbreak\t\\N\n'
+    assert cursor.statements[0].endswith("INTO TABLE scores CHARACTER SET utf8mb4 (name, score)")
+    assert not os.path.exists(cursor.path)
+
+LOCAL_INFILE_CONFIG = {'database': 'etl', 'allow_local_infile': True}
+
+def test_load_data_engine_loads_each_chunk(monkeypatch, csv_path):
+    connection = FakeConnection()
+    succeeded, _ = load(monkeypatch, csv_path, connection, LOCAL_INFILE_CONFIG, engine='load_data', commit_mode='chunk')
+    assert succeeded is True
+    assert connection.committed_rows == EXPECTED_ROWS
+    assert (connection.loads, connection.inserts) == (5, 0)
+
+@pytest.mark.parametrize('errno', csv_processor.LOCAL_INFILE_DISABLED_ERRNOS)
+def test_load_data_falls_back_to_inserts_when_local_infile_is_disabled(monkeypatch, csv_path, errno):
+    connection = FakeConnection(local_infile_errno=errno)
+    succeeded, _ = load(monkeypatch, csv_path, connection, LOCAL_INFILE_CONFIG, engine='load_data', commit_mode='file')
+    assert succeeded is True
+    assert connection.committed_rows == EXPECTED_ROWS
+    assert (connection.loads, connection.inserts) == (1, 5)
+
+def test_load_data_needs_allow_local_infile(monkeypatch, csv_path):
+    connection = FakeConnection()
+    succeeded, _ = load(monkeypatch, csv_path, connection, engine='load_data', commit_mode='file')
+    assert succeeded is True
+    assert connection.committed_rows == EXPECTED_ROWS
+    assert (connection.loads, connection.inserts) == (0, 5)
+
+@pytest.fixture
+def parsers_used(monkeypatch):
+    """The parser argument of every iter_chunks() call made by the processor."""
+    used = []
+    def recording_iter_chunks(file_path, chunk_size, read_csv_options, start_offset=None, parser=csv_processor.PARSER_PANDAS):
+        used.append(parser)
+        return iter_chunks(file_path, chunk_size, read_csv_options, start_offset, parser)
+    monkeypatch.setattr(csv_processor, 'iter_chunks', recording_iter_chunks)
+    return used
+
+def test_the_arrow_parser_loads_the_same_rows(monkeypatch, csv_path, parsers_used):
+    pytest.importorskip('pyarrow')
+    connection = FakeConnection()
+    succeeded, stats = load(monkeypatch, csv_path, connection, commit_mode='chunk', parser='arrow')
+    assert succeeded is True
+    assert parsers_used == ['arrow']
+    assert connection.committed_rows == EXPECTED_ROWS
+    assert stats['rows'] == 45
+
+def test_the_pandas_parser_is_used_when_pyarrow_is_missing(monkeypatch, csv_path, parsers_used):
+    monkeypatch.setattr(csv_processor, 'arrow_unavailable', lambda: "pyarrow is not installed")
+    connection = FakeConnection()
+    succeeded, _ = load(monkeypatch, csv_path, connection, commit_mode='file', parser='arrow')
+    assert succeeded is True
+    assert parsers_used == ['pandas']
+    assert connection.committed_rows == EXPECTED_ROWS
+
+def test_an_unknown_parser_is_rejected(monkeypatch, csv_path, parsers_used):
+    connection = FakeConnection()
+    succeeded, _ = load(monkeypatch, csv_path, connection, commit_mode='file', parser='polars')
+    assert succeeded is False
+    assert parsers_used == []
+    assert connection.inserts == 0
+
+def test_parquet_files_are_read_with_arrow_whatever_the_parser(monkeypatch, tmp_path):
+    pytest.importorskip('pyarrow')
+    path = str(tmp_path / 'scores.parquet')
+    pd.DataFrame(EXPECTED_ROWS, columns=COLUMNS).to_parquet(path, row_group_size=10)
+    connection = FakeConnection()
+    succeeded, stats = load(monkeypatch, path, connection, commit_mode='chunk', parser='pandas')
+    assert succeeded is True
+    assert connection.committed_rows == EXPECTED_ROWS
+    assert stats['chunks'] == 5 # One record batch per chunk_size rows
+
+    monkeypatch.setattr(csv_processor, 'arrow_unavailable', lambda: "pyarrow is not installed")
+    connection = FakeConnection()
+    succeeded, _ = load(monkeypatch, path, connection, commit_mode='file')
+    assert succeeded is False
+    assert connection.inserts == 0
@@ -0,0 +1,106 @@
+import contextlib
+
+import pytest
+from mysql.connector import Error
+
+from v3.src.data_layer import data_reader
+from v3.src.data_layer.data_reader import count_records, iter_records, read_records
+
+MYSQL_CONFIG = {'host': 'db', 'database': 'etl', 'user': 'loader', 'password': 'secret'}
+TABLE_ROWS = [(number, f'student {number}') for number in range(25)]
+
+class FakeConnection:
+    def __init__(self, rows=TABLE_ROWS, result=None, error=None):
+        self.rows = list(rows)
+        self.result = result
+        self.error = error
+        self.cursors = []
+        self.closed = False
+
+    def cursor(self, buffered=None):
+        self.cursors.append(FakeCursor(self, buffered))
+        return self.cursors[-1]
+
+    def close(self):
+        self.closed = True
+
+class FakeCursor:
+    def __init__(self, connection, buffered):
+        self.connection = connection
+        self.buffered = buffered
+        self.statements = []
+        self.fetch_sizes = []
+        self.closed = False
+        self._position = 0
+
+    def execute(self, statement, params=None):
+        if self.connection.error is not None:
+            raise self.connection.error
+        self.statements.append((statement, params))
+
+    def fetchmany(self, size):
+        self.fetch_sizes.append(size)
+        rows = self.connection.rows[self._position:self._position + size]
+        self._position += len(rows)
+        return rows
+
+    def fetchone(self):
+        return self.connection.result
+
+    def close(self):
+        self.closed = True
+
+def use_connection(monkeypatch, connection):
+    """Makes every pooled_connection() in data_reader yield connection."""
+    @contextlib.contextmanager
+    def pooled_connection(mysql_config):
+        yield connection
+    monkeypatch.setattr(data_reader, 'pooled_connection', pooled_connection)
+    return connection
+
+def test_rows_are_streamed_in_fetch_batches_through_an_unbuffered_cursor(monkeypatch):
+    connection = use_connection(monkeypatch, FakeConnection())
+    assert list(iter_records(MYSQL_CONFIG, 'students', batch_size=10)) == TABLE_ROWS
+    cursor = connection.cursors[0]
+    assert cursor.buffered is False
+    assert cursor.statements == [("SELECT * FROM students", None)]
+    assert cursor.fetch_sizes == [10, 10, 10, 10]
+    assert cursor.closed and not connection.closed
+
+def test_stopping_early_closes_the_connection_instead_of_reading_the_rest(monkeypatch):
+    connection = use_connection(monkeypatch, FakeConnection())
+    records = iter_records(MYSQL_CONFIG, 'students', batch_size=10)
+    assert [next(records) for _ in range(3)] == TABLE_ROWS[:3]
+    records.close()
+    cursor = connection.cursors[0]
+    assert cursor.fetch_sizes == [10]
+    assert connection.closed
+
+def test_read_records_returns_every_row(monkeypatch):
+    use_connection(monkeypatch, FakeConnection())
+    assert read_records(MYSQL_CONFIG, 'students') == TABLE_ROWS
+
+def test_a_failed_read_yields_nothing_and_drops_the_connection(monkeypatch):
+    connection = use_connection(monkeypatch, FakeConnection(error=Error(msg="Table 'etl.missing' doesn't exist", errno=1146)))
+    assert read_records(MYSQL_CONFIG, 'missing') == []
+    assert connection.closed
+
+def test_count_records_counts_on_the_server(monkeypatch):
+    connection = use_connection(monkeypatch, FakeConnection(result=(25,)))
+    assert count_records(MYSQL_CONFIG, 'students') == 25
+    cursor = connection.cursors[0]
+    assert cursor.statements == [("SELECT COUNT(*) FROM students", None)]
+    assert cursor.fetch_sizes == []
+    assert cursor.closed
+
+def test_count_records_estimate_reads_the_table_statistics(monkeypatch):
+    connection = use_connection(monkeypatch, FakeConnection(result=(24,)))
+    assert count_records(MYSQL_CONFIG, 'students', estimate=True) == 24
+    statement, params = connection.cursors[0].statements[0]
+    assert 'INFORMATION_SCHEMA.TABLES' in statement
+    assert params == ('etl', 'students')
+
+@pytest.mark.parametrize('result', [None, (None,)])
+def test_count_records_of_an_unknown_table_is_none(monkeypatch, result):
+    use_connection(monkeypatch, FakeConnection(result=result))
+    assert count_records(MYSQL_CONFIG, 'missing', estimate=True) is None
@@ -0,0 +1,112 @@
+import threading
+
+import pytest
+from mysql.connector import Error
+
+from v3.src.data_layer import db_connection
+from v3.src.data_layer.db_connection import MySQLConnectionPool, get_connection_pool, pooled_connection
+
+MYSQL_CONFIG = {'host': 'db', 'database': 'etl', 'user': 'loader', 'password': 'secret', 'pool_size': 2}
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.connected = True
+        self.in_transaction = False
+        self.healthy = True
+        self.rollbacks = 0
+        self.closed = False
+
+    def is_connected(self):
+        return self.connected
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        if not self.healthy:
+            raise Error(msg="MySQL server has gone away", errno=2006)
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+        self.connected = False
+
+@pytest.fixture
+def opened(monkeypatch):
+    """The connections opened through get_db_connection(), in order."""
+    connections = []
+    def get_db_connection(mysql_config):
+        connections.append(FakeConnection(len(connections)))
+        return connections[-1]
+    monkeypatch.setattr(db_connection, 'get_db_connection', get_db_connection)
+    monkeypatch.setattr(db_connection, '_pools', {})
+    return connections
+
+def test_released_connections_are_reused(opened):
+    with pooled_connection(MYSQL_CONFIG) as first:
+        pass
+    with pooled_connection(MYSQL_CONFIG) as second:
+        assert second is first
+    assert len(opened) == 1
+    assert get_connection_pool(MYSQL_CONFIG).stats() == {'size': 2, 'in_use': 0, 'idle': 1}
+
+def test_pools_are_shared_per_server_database_and_user(opened):
+    assert get_connection_pool(MYSQL_CONFIG) is get_connection_pool(dict(MYSQL_CONFIG, password='other'))
+    assert get_connection_pool(MYSQL_CONFIG) is not get_connection_pool(dict(MYSQL_CONFIG, database='reports'))
+
+def test_release_rolls_back_an_open_transaction(opened):
+    with pooled_connection(MYSQL_CONFIG) as connection:
+        connection.in_transaction = True
+    assert connection.rollbacks == 1
+    assert get_connection_pool(MYSQL_CONFIG).stats()['idle'] == 1
+
+def test_disconnected_connections_are_not_returned_to_the_pool(opened):
+    with pooled_connection(MYSQL_CONFIG) as connection:
+        connection.connected = False
+    assert get_connection_pool(MYSQL_CONFIG).stats()['idle'] == 0
+    with pooled_connection(MYSQL_CONFIG) as replacement:
+        assert replacement is not connection
+
+def test_unhealthy_idle_connections_are_replaced_on_borrow(opened):
+    with pooled_connection(MYSQL_CONFIG) as connection:
+        pass
+    connection.healthy = False
+    with pooled_connection(MYSQL_CONFIG) as replacement:
+        assert replacement is opened[1]
+    assert connection.closed
+
+def test_idle_connections_past_max_idle_seconds_are_closed(opened):
+    pool = MySQLConnectionPool(dict(MYSQL_CONFIG, pool_max_idle_seconds=-1))
+    connection = pool.acquire()
+    pool.release(connection)
+    assert connection.closed
+    assert pool.stats()['idle'] == 0
+
+def test_an_exhausted_pool_times_out(opened):
+    pool = MySQLConnectionPool(dict(MYSQL_CONFIG, pool_acquire_timeout_seconds=0.05))
+    borrowed = [pool.acquire(), pool.acquire()]
+    assert pool.acquire() is None
+    assert pool.stats()['in_use'] == 2
+    for connection in borrowed:
+        pool.release(connection)
+    assert pool.stats() == {'size': 2, 'in_use': 0, 'idle': 2}
+
+def test_a_waiting_borrower_gets_the_released_connection(opened):
+    pool = MySQLConnectionPool(dict(MYSQL_CONFIG, pool_size=1))
+    connection = pool.acquire()
+    received = []
+    waiter = threading.Thread(target=lambda: received.append(pool.acquire()))
+    waiter.start()
+    waiter.join(0.1)
+    assert waiter.is_alive() # Still waiting for the only connection
+    pool.release(connection)
+    waiter.join(5)
+    assert received == [connection]
+    assert len(opened) == 1
+
+def test_a_failed_connect_gives_the_slot_back(monkeypatch, opened):
+    monkeypatch.setattr(db_connection, 'get_db_connection', lambda mysql_config: None)
+    pool = MySQLConnectionPool(dict(MYSQL_CONFIG, pool_size=1))
+    assert pool.acquire() is None
+    assert pool.stats()['in_use'] == 0
@@ -0,0 +1,63 @@
+import os
+import time
+
+from v3.src.business_layer import ingest_queue as ingest_queue_module
+from v3.src.business_layer.ingest_queue import IngestQueue
+from v3.src.data_layer.directory_poller import DirectoryIndex, DirectoryPoller
+
+READINESS = {
+    'min_quiet_seconds': 0.05, 'initial_quiet_seconds': 0.01, 'max_quiet_seconds': 0.05,
+    'close_wait_seconds': 1, 'timeout_seconds': 10
+}
+
+class StubRouter:
+    """Routes 'scores_*' files to one table without limits; other files match no route."""
+    def route(self, file_path):
+        return 'scores' if os.path.basename(file_path).startswith('scores_') else None
+
+    def try_acquire(self, table_name):
+        return True
+
+    def release(self, table_name):
+        pass
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+def run_session(dropbox, index_path, monkeypatch, loaded):
+    """One main.py polling session: a listing, the ingest of what it queued, and the stop."""
+    def process_single_csv_file(file_path, table_name):
+        loaded.append(os.path.basename(file_path))
+        return False # The load fails, so the file stays in the dropbox
+    monkeypatch.setattr(ingest_queue_module, 'process_single_csv_file', process_single_csv_file)
+    ingest_queue = IngestQueue(StubRouter(), num_workers=1, readiness_config=READINESS)
+    ingest_queue.start()
+    index = DirectoryIndex(str(dropbox), index_path)
+    poller = DirectoryPoller(str(dropbox), ingest_queue, interval_seconds=60, index=index)
+    poller.poll()
+    assert wait_until(lambda: (lambda stats: stats['failed'] + stats['unrouted'] == 2)(ingest_queue.stats()))
+    ingest_queue.stop()
+    index.forget(os.path.basename(file_path) for file_path in ingest_queue.left_behind_files())
+    index.close()
+    return ingest_queue
+
+def test_failed_and_unrouted_files_are_queued_again_after_restart(tmp_path, monkeypatch):
+    dropbox = tmp_path / 'dropbox'
+    dropbox.mkdir()
+    (dropbox / 'scores_1.csv').write_text("a\n1\n")
+    (dropbox / 'other.csv').write_text("a\n1\n")
+    index_path = str(tmp_path / 'index.sqlite3')
+
+    loaded = []
+    first = run_session(dropbox, index_path, monkeypatch, loaded)
+    assert first.left_behind_files() == sorted([str(dropbox / 'other.csv'), str(dropbox / 'scores_1.csv')])
+    assert loaded == ['scores_1.csv']
+
+    second = run_session(dropbox, index_path, monkeypatch, loaded)
+    assert loaded == ['scores_1.csv', 'scores_1.csv']
+    assert second.stats()['unrouted'] == 1
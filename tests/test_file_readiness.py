@@ -0,0 +1,80 @@
+import threading
+import time
+
+from v3.src.data_layer.file_readiness import FileReadinessMonitor
+
+def start_monitor(**kwargs):
+    ready = {}
+    event = threading.Event()
+    def on_ready(file_path, since):
+        ready[file_path] = time.monotonic()
+        event.set()
+    monitor = FileReadinessMonitor(on_ready, lambda *args: None, **kwargs)
+    monitor.start()
+    return monitor, ready, event
+
+def test_polled_file_waits_for_min_quiet_period(tmp_path):
+    path = str(tmp_path / 'data.csv')
+    with open(path, 'w') as csv_file:
+        csv_file.write("a,b\n1,2\n")
+    monitor, ready, event = start_monitor(min_quiet_seconds=0.5, max_quiet_seconds=0.2)
+    try:
+        started = time.monotonic()
+        monitor.watch(path)
+        assert event.wait(3)
+        assert ready[path] - started >= 0.5
+    finally:
+        monitor.stop()
+
+def test_polled_file_is_not_ready_while_it_grows(tmp_path):
+    path = str(tmp_path / 'data.csv')
+    monitor, ready, event = start_monitor(min_quiet_seconds=0.3, max_quiet_seconds=0.1)
+    try:
+        with open(path, 'w') as csv_file:
+            monitor.watch(path)
+            for number in range(8):
+                last_write = time.monotonic()
+                csv_file.write(f"{number}\n")
+                csv_file.flush()
+                time.sleep(0.1)
+            assert not event.is_set()
+        assert event.wait(3)
+        # The quiet period starts at the first stat after the last write
+        assert ready[path] - last_write >= 0.3
+    finally:
+        monitor.stop()
+
+def test_closed_file_is_ready_without_quiet_period(tmp_path):
+    path = str(tmp_path / 'data.csv')
+    with open(path, 'w') as csv_file:
+        csv_file.write("a,b\n1,2\n")
+    monitor, ready, event = start_monitor(close_events=True, min_quiet_seconds=5)
+    try:
+        started = time.monotonic()
+        monitor.watch(path)
+        monitor.mark_closed(path)
+        assert event.wait(1)
+        assert ready[path] - started < 0.5
+    finally:
+        monitor.stop()
+
+def test_polled_file_pausing_mid_write_for_longer_than_min_quiet_is_not_ready(tmp_path):
+    path = str(tmp_path / 'data.csv')
+    monitor, ready, event = start_monitor(min_quiet_seconds=0.2, max_quiet_seconds=2)
+    try:
+        with open(path, 'w') as csv_file:
+            csv_file.write("a,b\n")
+            csv_file.flush()
+            monitor.watch(path)
+            for number in range(5):
+                time.sleep(0.1)
+                csv_file.write(f"{number},{number}\n")
+                csv_file.flush()
+            time.sleep(0.5) # A stalled copy, well over min_quiet_seconds
+            assert not event.is_set()
+            csv_file.write("5,5\n")
+        finished = time.monotonic()
+        assert event.wait(5)
+        assert ready[path] > finished
+    finally:
+        monitor.stop()
@@ -0,0 +1,52 @@
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from v3.src.data_layer.ingest_manifest import IngestManifest
+
+CONTENT_HASH = 'a' * 64
+
+@pytest.fixture
+def manifest_path(tmp_path):
+    return str(tmp_path / 'manifest.sqlite3')
+
+def test_a_hash_is_claimed_by_one_manifest_instance_at_a_time(manifest_path):
+    # Each worker process opens its own instance of the shared manifest
+    first = IngestManifest(manifest_path)
+    second = IngestManifest(manifest_path)
+    try:
+        assert first.claim(CONTENT_HASH) is True
+        assert second.claim(CONTENT_HASH) is False
+        assert first.claim(CONTENT_HASH) is False
+        first.release(CONTENT_HASH)
+        assert second.claim(CONTENT_HASH) is True
+    finally:
+        first.close()
+        second.close()
+
+def test_a_recorded_hash_cannot_be_claimed(manifest_path):
+    manifest = IngestManifest(manifest_path)
+    try:
+        identity = {'content_hash': CONTENT_HASH, 'file_name': 'scores.csv', 'size': 10, 'mtime_ns': 1}
+        manifest.record(identity, 'students')
+        assert manifest.claim(CONTENT_HASH) is False
+    finally:
+        manifest.close()
+
+def test_claims_of_a_stopped_process_are_cleared_on_open(manifest_path):
+    IngestManifest(manifest_path).close()
+    stopped = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'], capture_output=True, text=True, check=True)
+    with sqlite3.connect(manifest_path) as connection:
+        connection.execute(
+            "INSERT INTO in_flight_files (content_hash, owner_pid, claimed_at) VALUES (?, ?, '2026-01-01T00:00:00')",
+            (CONTENT_HASH, int(stopped.stdout))
+        )
+    connection.close()
+
+    manifest = IngestManifest(manifest_path)
+    try:
+        assert manifest.claim(CONTENT_HASH) is True
+    finally:
+        manifest.close()
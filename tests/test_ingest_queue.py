@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+
+from watchdog.events import (
+    DirCreatedEvent, FileClosedEvent, FileCreatedEvent, FileModifiedEvent, FileMovedEvent
+)
+
+from v3.src.business_layer import ingest_queue as ingest_queue_module
+from v3.src.business_layer.ingest_queue import IngestQueue
+from v3.src.data_layer.csv_handler import CSVHandler
+
+READINESS = {
+    'min_quiet_seconds': 0.05, 'initial_quiet_seconds': 0.01, 'max_quiet_seconds': 0.05,
+    'close_wait_seconds': 1, 'timeout_seconds': 10
+}
+
+class StubRouter:
+    """Routes every file to one table without limits."""
+    def route(self, file_path):
+        return 'scores'
+
+    def try_acquire(self, table_name):
+        return True
+
+    def release(self, table_name):
+        pass
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+def write_csv(directory, name):
+    path = directory / name
+    path.write_text("a\n1\n")
+    return str(path)
+
+def test_repeated_events_for_a_file_ingest_it_once(tmp_path, monkeypatch):
+    loaded = []
+    release = threading.Event()
+    def process_single_csv_file(file_path, table_name):
+        loaded.append((os.path.basename(file_path), table_name))
+        release.wait(5)
+        return True
+    monkeypatch.setattr(ingest_queue_module, 'process_single_csv_file', process_single_csv_file)
+    ingest_queue = IngestQueue(StubRouter(), num_workers=2, readiness_config=READINESS)
+    ingest_queue.start()
+    try:
+        path = write_csv(tmp_path, 'scores_1.csv')
+        assert ingest_queue.submit(path) is True
+        assert ingest_queue.submit(path, written=True) is False
+        assert ingest_queue.submit(path, closed=True) is False
+        assert wait_until(lambda: loaded)
+        assert ingest_queue.submit(path, written=True) is False # Still being processed
+        release.set()
+        assert wait_until(lambda: ingest_queue.stats()['processed'] == 1)
+        assert loaded == [('scores_1.csv', 'scores')]
+        assert ingest_queue.stats()['deduplicated'] == 3
+
+        # A finished file is queued again by its next event
+        assert ingest_queue.submit(path, closed=True) is True
+        assert wait_until(lambda: ingest_queue.stats()['processed'] == 2)
+    finally:
+        release.set()
+        ingest_queue.stop(5)
+    assert len(loaded) == 2
+
+def test_a_full_queue_holds_back_ready_files_until_a_worker_frees_a_slot(tmp_path, monkeypatch):
+    loaded = []
+    release = threading.Event()
+    def process_single_csv_file(file_path, table_name):
+        loaded.append(os.path.basename(file_path))
+        release.wait(5)
+        return True
+    monkeypatch.setattr(ingest_queue_module, 'process_single_csv_file', process_single_csv_file)
+    ingest_queue = IngestQueue(StubRouter(), max_size=1, num_workers=1, readiness_config=READINESS)
+    ingest_queue.start()
+    try:
+        names = ['scores_1.csv', 'scores_2.csv', 'scores_3.csv']
+        ingest_queue.submit(write_csv(tmp_path, names[0]), closed=True)
+        assert wait_until(lambda: loaded) # The only worker is busy with the first file
+        for name in names[1:]:
+            ingest_queue.submit(write_csv(tmp_path, name), closed=True)
+        # The second file fills the queue, so queueing the third one has to wait
+        assert wait_until(lambda: ingest_queue.stats()['enqueued'] == 2 and ingest_queue.stats()['depth'] == 1)
+        assert not wait_until(lambda: ingest_queue.stats()['enqueued'] == 3, timeout=0.3)
+        release.set()
+        assert wait_until(lambda: ingest_queue.stats()['processed'] == 3)
+    finally:
+        release.set()
+        ingest_queue.stop(5)
+    stats = ingest_queue.stats()
+    assert loaded == names
+    assert stats['blocked_submits'] == 1
+    assert stats['blocked_seconds'] > 0.2
+    assert stats['max_depth'] == 1
+
+class RecordingQueue:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, file_path, closed=False, written=False):
+        self.submitted.append((file_path, closed, written))
+        return True
+
+def test_handler_submits_input_files_with_what_the_event_says_about_them():
+    recording_queue = RecordingQueue()
+    handler = CSVHandler(recording_queue)
+    handler.dispatch(FileCreatedEvent('/dropbox/a.csv'))
+    handler.dispatch(FileModifiedEvent('/dropbox/a.csv'))
+    handler.dispatch(FileClosedEvent('/dropbox/a.csv'))
+    handler.dispatch(FileMovedEvent('/dropbox/b.csv.part', '/dropbox/b.csv.gz'))
+    handler.dispatch(FileCreatedEvent('/dropbox/notes.txt'))
+    handler.dispatch(FileMovedEvent('/dropbox/c.csv', '/dropbox/c.csv.done'))
+    handler.dispatch(DirCreatedEvent('/dropbox/new.csv'))
+    assert recording_queue.submitted == [
+        ('/dropbox/a.csv', False, False),
+        ('/dropbox/a.csv', False, True),
+        ('/dropbox/a.csv', True, False),
+        ('/dropbox/b.csv.gz', True, False)
+    ]
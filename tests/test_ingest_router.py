@@ -0,0 +1,60 @@
+import pytest
+
+from v3.src.business_layer.ingest_router import IngestRoute, IngestRouter, build_ingest_router, single_table_router
+
+ROUTING_CONFIG = {
+    'routes': [
+        {'table': 'scores_archive', 'pattern': 'scores_20??_*.csv'},
+        {'table': 'scores', 'pattern': 'scores_*.csv*', 'max_concurrency': 2},
+        {'table': 'attendance', 'regex': r'^att(endance)?[-_]'},
+        {'table': 'students', 'header': ['gender', 'math_score']},
+        {'table': 'scores', 'header': ['score'], 'max_concurrency': 1},
+    ],
+    'default_table': None
+}
+
+@pytest.fixture
+def router():
+    return build_ingest_router(ROUTING_CONFIG)
+
+def write_csv(tmp_path, name, header):
+    path = tmp_path / name
+    path.write_text(','.join(header) + '\n1,2\n')
+    return str(path)
+
+def test_first_matching_name_route_wins(router, tmp_path):
+    assert router.route(str(tmp_path / 'scores_2024_05.csv')) == 'scores_archive'
+    assert router.route(str(tmp_path / 'scores_may.csv.gz')) == 'scores'
+    assert router.route(str(tmp_path / 'att-monday.csv')) == 'attendance'
+
+def test_name_routes_before_a_header_route_do_not_read_the_file(router, tmp_path):
+    # The file does not exist: a name route matches before any header would be read
+    assert router.route(str(tmp_path / 'attendance_monday.csv')) == 'attendance'
+
+def test_files_without_a_name_match_are_routed_by_header(router, tmp_path):
+    assert router.route(write_csv(tmp_path, 'export.csv', ['math_score', 'extra', 'gender'])) == 'students'
+    assert router.route(write_csv(tmp_path, 'other.csv', ['score', 'gender'])) == 'scores'
+
+def test_unmatched_files_go_to_the_default_table(router, tmp_path):
+    path = write_csv(tmp_path, 'unknown.csv', ['colour'])
+    assert router.route(path) is None
+    assert IngestRouter(router.routes, default_table='inbox').route(path) == 'inbox'
+    assert single_table_router('students').route(path) == 'students'
+
+def test_unreadable_header_is_not_routed(router, tmp_path):
+    assert router.route(str(tmp_path / 'missing.csv')) is None
+
+def test_concurrency_cap_is_shared_by_the_routes_of_a_table(router):
+    assert router.max_concurrency == {'scores': 1}
+    assert router.try_acquire('scores') is True
+    assert router.try_acquire('scores') is False
+    assert router.try_acquire('students') is True # Other tables are not held up
+    router.release('scores')
+    assert router.try_acquire('scores') is True
+    assert router.active() == {'scores_archive': 0, 'scores': 1, 'attendance': 0, 'students': 1}
+
+def test_a_route_needs_exactly_one_matcher():
+    with pytest.raises(ValueError):
+        IngestRoute('scores', pattern='*.csv', regex='csv')
+    with pytest.raises(ValueError):
+        build_ingest_router({'routes': [{'table': 'scores', 'pattern': '*', 'max_concurrency': 0}]})
@@ -0,0 +1,69 @@
+import contextlib
+import json
+import logging
+import os
+import subprocess
+import sys
+
+from v3.src.utils import logger as logger_module
+from v3.src.utils.logger import setup_logging, shutdown_logging
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@contextlib.contextmanager
+def bare_root_logger():
+    """Takes pytest's handlers off the root logger, so setup_logging() configures it."""
+    root_logger = logging.getLogger()
+    handlers, level = list(root_logger.handlers), root_logger.level
+    for handler in handlers:
+        root_logger.removeHandler(handler)
+    try:
+        yield root_logger
+    finally:
+        shutdown_logging()
+        for handler in list(root_logger.handlers):
+            root_logger.removeHandler(handler)
+            handler.close()
+        for handler in handlers:
+            root_logger.addHandler(handler)
+        root_logger.setLevel(level)
+
+def test_queued_records_reach_the_log_file(tmp_path):
+    log_path = tmp_path / 'app.log'
+    with bare_root_logger() as root_logger:
+        setup_logging(str(log_path), 'INFO', log_format='json', use_queue=True)
+        writer = logger_module._listener
+        assert writer is not None
+        values = [1]
+        logging.getLogger('tests.logger').info("Loaded %s rows.", values)
+        values.append(2) # Changed after the call; the record keeps the message as logged
+        try:
+            raise ValueError("bad chunk")
+        except ValueError:
+            logging.getLogger('tests.logger').error("Chunk failed.", exc_info=True)
+        logging.getLogger('tests.logger').debug("Below the level.")
+
+        shutdown_logging()
+        assert logger_module._listener is None
+        assert writer._thread is None # stop() joined the writer thread
+        assert root_logger.handlers == []
+    entries = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert [entry['message'] for entry in entries] == ["Loaded [1] rows.", "Chunk failed."]
+    assert entries[0]['logger'] == 'tests.logger'
+    assert 'ValueError: bad chunk' in entries[1]['exception']
+
+def test_records_still_queued_at_exit_are_written(tmp_path):
+    log_path = tmp_path / 'app.log'
+    script = (
+        "import logging\n"
+        "from v3.src.utils.logger import setup_logging\n"
+        f"setup_logging({str(log_path)!r}, 'INFO', use_queue=True)\n"
+        "for number in range(2000):\n"
+        "    logging.getLogger('tests.exit').info('record %s', number)\n"
+    )
+    result = subprocess.run([sys.executable, '-c', script], cwd=REPO_ROOT,
+                            capture_output=True, text=True, timeout=30)
+    assert result.returncode == 0, result.stderr
+    lines = log_path.read_text().splitlines()
+    assert len(lines) == 2000
+    assert lines[-1].endswith('record 1999')
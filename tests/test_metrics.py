@@ -0,0 +1,43 @@
+from v3.src.utils.metrics import MetricsRegistry, write_textfile
+
+def test_render_prometheus_text_format():
+    registry = MetricsRegistry()
+    files = registry.counter('etl_files_total', 'Files processed.', ['table'])
+    depth = registry.gauge('etl_queue_depth', 'Files waiting.')
+    duration = registry.histogram('etl_duration_seconds', 'Time per file.', ['table'], buckets=(0.1, 1.0))
+    files.inc(table='scores')
+    files.inc(2, table='odd "name"\\with\nbreak')
+    depth.set(3)
+    duration.observe(0.05, table='scores')
+    duration.observe(0.5, table='scores')
+    duration.observe(5, table='scores')
+
+    assert registry.render() == (
+        '# HELP etl_files_total Files processed.\n'
+        '# TYPE etl_files_total counter\n'
+        'etl_files_total{table="scores"} 1\n'
+        'etl_files_total{table="odd \\"name\\"\\\\with\\nbreak"} 2\n'
+        '# HELP etl_queue_depth Files waiting.\n'
+        '# TYPE etl_queue_depth gauge\n'
+        'etl_queue_depth 3\n'
+        '# HELP etl_duration_seconds Time per file.\n'
+        '# TYPE etl_duration_seconds histogram\n'
+        'etl_duration_seconds_bucket{table="scores",le="0.1"} 1\n'
+        'etl_duration_seconds_bucket{table="scores",le="1"} 2\n'
+        'etl_duration_seconds_bucket{table="scores",le="+Inf"} 3\n'
+        'etl_duration_seconds_sum{table="scores"} 5.55\n'
+        'etl_duration_seconds_count{table="scores"} 3\n'
+    )
+
+def test_gauge_function_is_read_at_render_time():
+    registry = MetricsRegistry()
+    registry.gauge('etl_pool_connections', 'Connections by state.', ['state']).set_function(lambda: {('idle',): 4, ('in_use',): 1})
+    assert 'etl_pool_connections{state="idle"} 4\netl_pool_connections{state="in_use"} 1' in registry.render()
+
+def test_write_textfile_replaces_the_file(tmp_path):
+    registry = MetricsRegistry()
+    registry.counter('etl_files_total', 'Files processed.').inc()
+    path = tmp_path / 'etl.prom'
+    write_textfile(str(path), registry)
+    assert path.read_text() == registry.render()
+    assert [entry.name for entry in tmp_path.iterdir()] == ['etl.prom']
@@ -0,0 +1,39 @@
+import logging
+import multiprocessing
+import os
+
+import pytest
+
+from v3.src.business_layer import processor_service
+from v3.src.business_layer.ingest_router import single_table_router
+
+def fake_process_single_csv_file(file_path, table_name):
+    """Stands in for a load: logs, counts the file and fails files named 'bad_*'."""
+    succeeded = not os.path.basename(file_path).startswith('bad_')
+    logging.getLogger('tests.worker').info("Loaded %s in process %s.", os.path.basename(file_path), os.getpid())
+    processor_service.FILES_PROCESSED.inc(table=table_name)
+    return succeeded
+
+def processed_count(table_name):
+    return processor_service.FILES_PROCESSED.drain().get((table_name,), 0)
+
+@pytest.mark.parametrize('executor_kind', [
+    'thread',
+    pytest.param('process', marks=pytest.mark.skipif(
+        multiprocessing.get_start_method() != 'fork', reason="the fake load reaches the workers by fork"
+    ))
+])
+def test_both_executors_report_results_logs_and_metrics(monkeypatch, caplog, executor_kind):
+    monkeypatch.setattr(processor_service, 'process_single_csv_file', fake_process_single_csv_file)
+    caplog.set_level(logging.INFO)
+    processor_service.FILES_PROCESSED.drain()
+    routed_files = [(f'/dropbox/scores_{number}.csv', 'scores') for number in range(4)] + [('/dropbox/bad_1.csv', 'scores')]
+
+    results = processor_service._process_files_in_parallel(routed_files, single_table_router('scores'), 2, executor_kind)
+
+    assert results == {file_path: not file_path.endswith('bad_1.csv') for file_path, _ in routed_files}
+    assert processed_count('scores') == 5 # Counted by the workers, exported by this process
+    worker_messages = [record.getMessage() for record in caplog.records if record.name == 'tests.worker']
+    assert len(worker_messages) == 5
+    worker_pids = {int(message.rsplit(' ', 1)[1].rstrip('.')) for message in worker_messages}
+    assert (os.getpid() not in worker_pids) == (executor_kind == 'process')
@@ -0,0 +1,33 @@
+import threading
+import time
+
+import pytest
+
+from v3.src.data_layer.pipeline import Pipeline
+
+def slow_source(count, delay):
+    for number in range(count):
+        time.sleep(delay)
+        yield number
+
+def test_pipeline_yields_every_item_in_order():
+    with Pipeline(range(20), [('parse', None, 2), ('convert', lambda item: item * 2, 2)]) as pipeline:
+        assert list(pipeline) == [number * 2 for number in range(20)]
+
+def test_stage_exception_is_raised_in_consumer():
+    def fail(item):
+        raise ValueError("bad chunk")
+    with pytest.raises(ValueError, match="bad chunk"):
+        with Pipeline(range(5), [('parse', None, 2), ('convert', fail, 2)]) as pipeline:
+            list(pipeline)
+
+def test_close_joins_stage_threads_when_consumer_raises():
+    pipeline = Pipeline(slow_source(1000, 0.01), [('parse', None, 2), ('convert', lambda item: item, 2)])
+    started = time.perf_counter()
+    with pytest.raises(RuntimeError):
+        with pipeline:
+            for _ in pipeline:
+                raise RuntimeError("insert failed")
+    assert time.perf_counter() - started < 2.0
+    alive = [thread.name for thread in threading.enumerate() if thread.name.startswith('pipeline-')]
+    assert alive == []
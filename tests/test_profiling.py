@@ -0,0 +1,80 @@
+import os
+import pstats
+import threading
+
+import pytest
+
+from v3.src.utils import profiling
+from v3.src.utils.profiling import profile_calls, propagate_to_thread, record_allocations
+
+def build_rows(count):
+    rows = [(number, f'student {number}') for number in range(count)]
+    record_allocations()
+    return rows
+
+def load_in_thread(results):
+    results.append(len(build_rows(1000)))
+
+def ingest(file_path, rows=1000):
+    """Stands in for process_single_csv_file: converts rows, partly on a helper thread."""
+    results = []
+    helper = threading.Thread(target=propagate_to_thread(lambda: load_in_thread(results)))
+    helper.start()
+    helper.join()
+    return len(build_rows(rows)) + results[0]
+
+def reports(output_dir):
+    return sorted(os.listdir(output_dir)) if os.path.isdir(output_dir) else []
+
+def profiled(config):
+    return profile_calls(config)(ingest)
+
+def test_disabled_profiling_writes_nothing(tmp_path):
+    config = {'enabled': False, 'sample_rate': 1.0, 'output_dir': str(tmp_path / 'profiles')}
+    assert profiled(config)('/dropbox/scores.csv') == 2000
+    assert reports(config['output_dir']) == []
+
+def test_a_profiled_call_writes_the_cprofile_dump_and_a_report(tmp_path):
+    config = {'enabled': True, 'sample_rate': 1.0, 'output_dir': str(tmp_path / 'profiles'), 'top_functions': 50}
+    assert profiled(config)('/dropbox/scores 2024.csv') == 2000
+    names = reports(config['output_dir'])
+    assert [os.path.splitext(name)[1] for name in names] == ['.prof', '.txt']
+    assert all(name.endswith('-scores_2024.csv' + extension) for name, extension in zip(names, ['.prof', '.txt']))
+
+    dump = pstats.Stats(os.path.join(config['output_dir'], names[0]))
+    profiled_functions = {function_name for _, _, function_name in dump.stats}
+    assert {'ingest', 'build_rows', 'load_in_thread'} <= profiled_functions # The helper thread too
+    with open(os.path.join(config['output_dir'], names[1])) as report_file:
+        report = report_file.read()
+    assert report.startswith("Profile of ingest('scores 2024.csv')")
+    assert 'functions by cumulative time' in report
+    assert 'allocation sites at the highest traced memory' in report
+
+def test_the_sample_rate_picks_the_profiled_calls(tmp_path, monkeypatch):
+    config = {'enabled': True, 'sample_rate': 0.5, 'output_dir': str(tmp_path / 'profiles')}
+    draws = iter([0.7, 0.3, 0.5])
+    monkeypatch.setattr(profiling.random, 'random', lambda: next(draws))
+    for _ in range(3):
+        profiled(config)('/dropbox/scores.csv')
+    assert len(reports(config['output_dir'])) == 2 # Only the draw below the rate
+
+def test_the_config_is_read_at_call_time(tmp_path):
+    config = {'enabled': False, 'sample_rate': 1.0, 'output_dir': str(tmp_path / 'profiles')}
+    function = profiled(config)
+    function('/dropbox/scores.csv')
+    config['enabled'] = True
+    function('/dropbox/scores.csv')
+    assert len(reports(config['output_dir'])) == 2
+
+def test_calls_made_during_a_profiled_call_run_unprofiled(tmp_path):
+    config = {'enabled': True, 'sample_rate': 1.0, 'output_dir': str(tmp_path / 'profiles')}
+    inner = profiled(config)
+    outer = profile_calls(config)(lambda file_path: inner('/dropbox/inner.csv'))
+    assert outer('/dropbox/outer.csv') == 2000
+    assert [name.split('-')[-1] for name in reports(config['output_dir'])] == ['outer.csv.prof', 'outer.csv.txt']
+
+def test_a_failing_call_is_still_reported(tmp_path):
+    config = {'enabled': True, 'sample_rate': 1.0, 'output_dir': str(tmp_path / 'profiles')}
+    with pytest.raises(TypeError):
+        profiled(config)('/dropbox/scores.csv', rows='many')
+    assert len(reports(config['output_dir'])) == 2
@@ -0,0 +1,48 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from v3.src.data_layer.row_converter import column_to_list, dataframe_to_rows
+
+def value_types(values):
+    return [type(value) for value in values]
+
+@pytest.mark.parametrize('series, expected', [
+    (pd.Series([1, 2, 3], dtype='int64'), [1, 2, 3]),
+    (pd.Series([True, False]), [True, False]),
+    (pd.Series([1.5, np.nan, 3.0]), [1.5, None, 3.0]),
+    (pd.Series([1, None, 3], dtype='Int64'), [1, None, 3]),
+    (pd.Series([1, 2], dtype='Int64'), [1, 2]),
+    (pd.Series([True, None], dtype='boolean'), [True, None]),
+    (pd.Series(['a', None], dtype='string'), ['a', None]),
+    (pd.Series(['a', None, 'a'], dtype='category'), ['a', None, 'a']),
+    (pd.Series(['a', None, np.nan], dtype=object), ['a', None, None]),
+    (pd.Series(pd.to_datetime(['2024-01-02 03:04:05', None])), [datetime.datetime(2024, 1, 2, 3, 4, 5), None]),
+])
+def test_columns_become_native_python_values_with_missing_values_as_none(series, expected):
+    values = column_to_list(series)
+    assert values == expected
+    assert value_types(values) == value_types(expected) # No numpy scalars or pandas Timestamps
+
+def test_rows_follow_the_given_column_order_and_skip_other_columns():
+    frame = pd.DataFrame({'id': [1, 2], 'name': ['ann', 'bob'], 'score': [1.5, np.nan]})
+    assert dataframe_to_rows(frame, ['score', 'name']) == [(1.5, 'ann'), (None, 'bob')]
+
+def test_block_size_does_not_change_the_rows():
+    frame = pd.DataFrame({
+        'name': [f'student {number}' for number in range(7)],
+        'score': pd.array([number if number % 3 else None for number in range(7)], dtype='Int64')
+    })
+    rows = dataframe_to_rows(frame, ['name', 'score'])
+    assert dataframe_to_rows(frame, ['name', 'score'], block_rows=2) == rows
+    assert rows[:2] == [('student 0', None), ('student 1', 1)]
+    assert len(rows) == 7
+
+def test_a_chunk_not_starting_at_row_zero_is_converted_by_position():
+    frame = pd.DataFrame({'score': [1.0, np.nan, 3.0]}, index=[50, 51, 52])
+    assert dataframe_to_rows(frame, ['score'], block_rows=2) == [(1.0,), (None,), (3.0,)]
+
+def test_an_empty_chunk_has_no_rows():
+    assert dataframe_to_rows(pd.DataFrame({'name': []}), ['name']) == []
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+
+import run_once
+from benchmarks.bench_cold_start import HEAVY_MODULES
+from v3.src.business_layer import processor_service
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_an_empty_dropbox_exits_without_importing_the_processor(tmp_path):
+    script = (
+        "import sys\n"
+        "import run_once\n"
+        "status = run_once.main()\n"
+        f"heavy = sorted(name for name in sys.modules if name.split('.')[0] in {HEAVY_MODULES!r})\n"
+        "print(status, heavy)\n"
+    )
+    environment = dict(os.environ, ETL_DROPBOX_FOLDER=str(tmp_path))
+    (tmp_path / 'notes.txt').write_text("not an input file")
+    (tmp_path / 'folder.csv').mkdir()
+    result = subprocess.run(
+        [sys.executable, '-c', script], cwd=REPO_ROOT, env=environment, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == '0 []'
+
+def test_input_files_are_recognised_by_name(tmp_path):
+    assert not run_once.dropbox_has_input_files(str(tmp_path / 'missing'))
+    assert not run_once.dropbox_has_input_files(str(tmp_path))
+    for name in ['scores.csv.gz', 'scores.parquet', 'scores.csv']:
+        folder = tmp_path / name.replace('.', '_')
+        folder.mkdir()
+        (folder / name).write_text("")
+        assert run_once.dropbox_has_input_files(str(folder))
+
+def test_the_exit_status_reports_failed_files(tmp_path, monkeypatch):
+    (tmp_path / 'scores.csv').write_text("a\n1\n")
+    monkeypatch.setattr(run_once, 'DROPBOX_FOLDER', str(tmp_path))
+    summaries = iter([{'files_failed': 0}, {'files_failed': 2}, None])
+    monkeypatch.setattr(processor_service, 'process_all_csv_files', lambda: next(summaries))
+    assert [run_once.main() for _ in range(3)] == [0, 1, 1]
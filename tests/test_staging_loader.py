@@ -0,0 +1,55 @@
+from v3.src.data_layer.staging_loader import (
+    MAX_IDENTIFIER_LENGTH, STAGING_CLEANUP_TRUNCATE, cleanup_staging_table, create_staging_table, merge_staging_table,
+    staging_table_name
+)
+
+class RecordingCursor:
+    def __init__(self, statements):
+        self.statements = statements
+        self.rowcount = 0
+
+    def execute(self, statement, params=None):
+        self.statements.append(statement)
+
+    def close(self):
+        pass
+
+class RecordingConnection:
+    def __init__(self):
+        self.statements = []
+
+    def cursor(self):
+        return RecordingCursor(self.statements)
+
+def load(connection, table_name, columns):
+    """The staging statements of one file loaded over a pooled connection kept between files."""
+    staging_table = staging_table_name(table_name, columns)
+    cursor = connection.cursor()
+    create_staging_table(cursor, table_name, staging_table, columns)
+    merge_staging_table(cursor, staging_table, table_name, columns)
+    cleanup_staging_table(connection, staging_table, STAGING_CLEANUP_TRUNCATE)
+    return staging_table
+
+def test_files_with_different_headers_use_their_own_staging_tables():
+    connection = RecordingConnection()
+    first = load(connection, 'students', ['gender', 'math_score'])
+    second = load(connection, 'students', ['gender', 'math_score', 'reading_score'])
+
+    assert first != second
+    assert connection.statements == [
+        f"CREATE TEMPORARY TABLE IF NOT EXISTS {first} AS SELECT gender, math_score FROM students LIMIT 0",
+        f"INSERT INTO students (gender, math_score) SELECT gender, math_score FROM {first}",
+        f"TRUNCATE TABLE {first}",
+        f"CREATE TEMPORARY TABLE IF NOT EXISTS {second} AS SELECT gender, math_score, reading_score FROM students LIMIT 0",
+        f"INSERT INTO students (gender, math_score, reading_score) SELECT gender, math_score, reading_score FROM {second}",
+        f"TRUNCATE TABLE {second}",
+    ]
+
+def test_staging_table_name_depends_on_the_column_set_only():
+    assert staging_table_name('students', ['gender', 'math_score']) == staging_table_name('students', ['math_score', 'gender'])
+    assert staging_table_name('students', ['gender']) != staging_table_name('teachers', ['gender'])
+
+def test_staging_table_name_fits_mysql_identifiers():
+    long_name = 't' * MAX_IDENTIFIER_LENGTH
+    assert len(staging_table_name(long_name, ['gender'])) == MAX_IDENTIFIER_LENGTH
+    assert staging_table_name(long_name, ['gender']) != staging_table_name(long_name, ['math_score'])
@@ -0,0 +1,43 @@
+import io
+
+import pandas as pd
+
+from v3.src.data_layer.table_schema import build_read_csv_options
+
+def column(name, data_type, auto_increment=False, generated=False):
+    return {
+        'name': name, 'data_type': data_type, 'nullable': True, 'has_default': False,
+        'auto_increment': auto_increment, 'generated': generated
+    }
+
+SCHEMA = [
+    column('id', 'int', auto_increment=True),
+    column('gender', 'varchar'),
+    column('lunch', 'varchar'),
+    column('math_score', 'int'),
+    column('average', 'decimal'),
+    column('tested_on', 'date'),
+    column('score_band', 'varchar', generated=True),
+]
+
+def test_options_follow_the_table_schema():
+    header = ['id', 'tested_on', 'gender', 'lunch', 'math_score', 'average', 'score_band']
+    options = build_read_csv_options(SCHEMA, header, categorical_columns=['lunch'])
+
+    # Columns the table fills itself are not read; the header order is kept
+    assert options['usecols'] == ['tested_on', 'gender', 'lunch', 'math_score', 'average']
+    assert options['dtype'] == {'gender': str, 'lunch': 'category', 'average': 'float64'}
+    assert options['parse_dates'] == ['tested_on']
+    assert options['dtype_backend'] == 'numpy_nullable'
+
+def test_read_csv_parses_the_columns_as_mapped():
+    data = "id,gender,lunch,math_score,average,tested_on\n1,female,standard,72,72.5,2024-05-01\n2,male,free,,68.25,2024-05-02\n"
+    options = build_read_csv_options(SCHEMA, ['id', 'gender', 'lunch', 'math_score', 'average', 'tested_on'], ['lunch'])
+    frame = pd.read_csv(io.StringIO(data), **options)
+
+    assert list(frame.columns) == ['gender', 'lunch', 'math_score', 'average', 'tested_on']
+    assert str(frame['math_score'].dtype) == 'Int64' # A blank integer is missing, not a parse error
+    assert frame['math_score'].isna().tolist() == [False, True]
+    assert isinstance(frame['lunch'].dtype, pd.CategoricalDtype)
+    assert frame['average'].tolist() == [72.5, 68.25]
+    assert pd.api.types.is_datetime64_any_dtype(frame['tested_on'])
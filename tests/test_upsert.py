@@ -0,0 +1,38 @@
+from v3.src.data_layer import csv_processor
+from v3.src.data_layer.batch_inserter import BatchInserter, on_duplicate_key_update, upsert_update_columns
+from v3.src.data_layer.csv_processor import WRITE_UPSERT, check_natural_key, upsert_clause
+
+MYSQL_CONFIG = {'database': 'etl'}
+HEADER = ['student_ref', 'gender', 'math_score']
+
+def test_on_duplicate_key_update_overwrites_the_update_columns():
+    assert on_duplicate_key_update(['gender', 'math_score'], ['student_ref']) == (
+        " ON DUPLICATE KEY UPDATE gender = VALUES(gender), math_score = VALUES(math_score)"
+    )
+
+def test_on_duplicate_key_update_without_update_columns_keeps_the_record():
+    assert on_duplicate_key_update([], ['student_ref']) == " ON DUPLICATE KEY UPDATE student_ref = student_ref"
+
+def test_update_columns_default_to_the_loaded_columns_outside_the_key():
+    assert upsert_update_columns(HEADER, ['student_ref']) == ['gender', 'math_score']
+    assert upsert_update_columns(HEADER, ['student_ref'], ['math_score', 'reading_score', 'student_ref']) == ['math_score']
+
+def test_upsert_clause_is_appended_to_every_insert():
+    options = {'write_mode': WRITE_UPSERT, 'natural_key': ['student_ref'], 'update_columns': None}
+    clause = upsert_clause(HEADER, options)
+    inserter = BatchInserter(None, 'students', HEADER, max_batch_bytes=1024, update_clause=clause)
+    assert inserter.statement_for(2) == (
+        "INSERT INTO students (student_ref, gender, math_score) VALUES (%s, %s, %s), (%s, %s, %s)"
+        " ON DUPLICATE KEY UPDATE gender = VALUES(gender), math_score = VALUES(math_score)"
+    )
+    assert upsert_clause(HEADER, {'write_mode': 'insert'}) is None
+
+def test_check_natural_key_refuses_a_file_without_the_key_columns(monkeypatch):
+    monkeypatch.setattr(csv_processor, 'get_unique_keys', lambda *args: {'PRIMARY': ['id'], 'uq_ref': ['student_ref']})
+    options = {'natural_key': ['student_ref']}
+    assert check_natural_key('scores.csv', MYSQL_CONFIG, 'students', ['gender', 'math_score'], options) is False
+    assert check_natural_key('scores.csv', MYSQL_CONFIG, 'students', HEADER, options) is True
+
+def test_check_natural_key_refuses_a_table_without_a_unique_index_on_the_key(monkeypatch):
+    monkeypatch.setattr(csv_processor, 'get_unique_keys', lambda *args: {'PRIMARY': ['id'], 'uq_ref_gender': ['student_ref', 'gender']})
+    assert check_natural_key('scores.csv', MYSQL_CONFIG, 'students', HEADER, {'natural_key': ['student_ref']}) is False
@@ -0,0 +1,292 @@
+# business_layer/ingest_queue.py
+
+import collections
+import logging
+import os
+import queue
+import threading
+import time
+
+from v3.src.business_layer.ingest_router import get_ingest_router
+from v3.src.business_layer.processor_service import process_single_csv_file
+from v3.src.config.settings import READINESS_CONFIG
+from v3.src.data_layer.file_readiness import ABANDONED_GONE, FileReadinessMonitor
+from v3.src.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+QUEUE_DEPTH = metrics.gauge('etl_ingest_queue_depth', 'Files waiting in the watchdog ingest queue.')
+QUEUE_NOT_READY = metrics.gauge('etl_ingest_queue_not_ready', 'Files waiting to be completely written before they are queued.')
+QUEUE_DEFERRED = metrics.gauge('etl_ingest_queue_deferred', "Files waiting for a free slot of their table's concurrency limit.", ['table'])
+QUEUE_WAIT = metrics.histogram('etl_ingest_queue_wait_seconds', 'Time files waited between their file event and ingestion.', ['table'])
+QUEUE_BLOCKED_SECONDS = metrics.counter(
+    'etl_ingest_queue_blocked_seconds_total', 'Time ready files were held back by a full ingest queue.'
+)
+
+# Sentinel telling a worker thread to exit
+_STOP = object()
+
+class IngestQueue:
+    """
+    Bounded, deduplicating work queue between file system events and the ingest workers.
+
+    Event handlers call submit(), which only records the path and returns immediately.
+    A FileReadinessMonitor waits until the file has been completely written (closed by
+    its writer, or unchanged for a quiet period) and then queues it, and a fixed set of
+    worker threads drains the queue and runs process_single_csv_file. A path is queued at
+    most once until a worker has finished with it, so the created, modified and closed
+    events fired for the same file result in a single ingest. When the queue is full, the
+    monitor blocks until a worker frees a slot (backpressure) and the time spent blocked
+    is recorded in stats().
+
+    Workers route each file to its table with an IngestRouter. A file whose table is at
+    its concurrency limit is set aside, so the worker moves on to other tables' files;
+    the worker that finishes a file of that table loads the set-aside file next.
+    """
+    def __init__(self, router=None, max_size=1000, num_workers=2, readiness_config=None, close_events=False):
+        """
+        Args:
+            router (IngestRouter, optional): Maps files to tables; defaults to the router
+                                             built from ROUTING_CONFIG.
+            max_size (int): Files that can be queued before the readiness monitor blocks.
+            num_workers (int): Worker threads draining the queue.
+            readiness_config (dict, optional): READINESS_CONFIG-style settings of the
+                                               readiness monitor; defaults to READINESS_CONFIG.
+            close_events (bool): submit() is told about every close after writing, so files
+                                 seen being written wait for their close rather than a
+                                 quiet period.
+        """
+        self.router = router or get_ingest_router()
+        self.num_workers = num_workers
+        readiness_config = readiness_config or READINESS_CONFIG
+        self.readiness = FileReadinessMonitor(
+            self._enqueue, self._abandon,
+            close_events=close_events,
+            initial_quiet_seconds=readiness_config['initial_quiet_seconds'],
+            max_quiet_seconds=readiness_config['max_quiet_seconds'],
+            close_wait_seconds=readiness_config['close_wait_seconds'],
+            timeout_seconds=readiness_config['timeout_seconds'],
+            min_quiet_seconds=readiness_config['min_quiet_seconds']
+        )
+        self._queue = queue.Queue(maxsize=max_size)
+        self._pending = set() # Paths queued or being processed
+        self._left_behind = set() # Paths that failed, matched no route or were not completely written
+        self._lock = threading.Lock()
+        self._workers = []
+        self._deferred = collections.defaultdict(collections.deque) # Files waiting for their table's slot, by table
+        self._stats = {
+            'enqueued': 0,
+            'deduplicated': 0,
+            'processed': 0,
+            'failed': 0,
+            'unrouted': 0,
+            'abandoned': 0,
+            'deferred': 0,
+            'blocked_submits': 0,
+            'blocked_seconds': 0.0,
+            'max_depth': 0,
+            'total_wait_seconds': 0.0
+        }
+
+    def start(self):
+        """Starts the readiness monitor and the worker threads."""
+        self.readiness.start()
+        for index in range(self.num_workers):
+            worker = threading.Thread(target=self._run_worker, name=f"ingest-worker-{index + 1}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        logger.info("Started %s ingest workers (queue size %s).", self.num_workers, self._queue.maxsize)
+
+    def stop(self, timeout=None):
+        """
+        Stops the workers once the files already queued have been processed. Files that
+        were not completely written yet are left in the dropbox for the next scan.
+
+        Args:
+            timeout (float, optional): Seconds to wait for each worker to finish.
+        """
+        self.readiness.stop(timeout)
+        for _ in self._workers:
+            self._queue.put(_STOP)
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+        logger.info("Ingest workers stopped. Queue stats: %s", self.stats())
+
+    def submit(self, file_path, closed=False, written=False):
+        """
+        Queues a file for ingestion, once it is completely written, unless it is already
+        waiting, queued or being processed.
+
+        Args:
+            file_path (str): The full path to the CSV file.
+            closed (bool): The event reported the writer closing the file or the file
+                           being renamed into place.
+            written (bool): The event reported the file being written to.
+
+        Returns:
+            bool: True if the path was accepted, False if it was a duplicate.
+        """
+        with self._lock:
+            duplicate = file_path in self._pending
+            if duplicate:
+                self._stats['deduplicated'] += 1
+            else:
+                self._pending.add(file_path)
+                self._left_behind.discard(file_path)
+        if not duplicate:
+            self.readiness.watch(file_path)
+        if written:
+            self.readiness.mark_written(file_path)
+        if closed:
+            # Lets a file still waiting for readiness go right away
+            self.readiness.mark_closed(file_path)
+        QUEUE_NOT_READY.set(self.readiness.watching())
+        return not duplicate
+
+    def _enqueue(self, file_path, since):
+        """Readiness monitor callback: queues a completely written file for the workers."""
+        QUEUE_NOT_READY.set(self.readiness.watching())
+        item = (file_path, since)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            logger.warning("Ingest queue is full (%s files). Waiting for a free slot to queue '%s'.", self._queue.maxsize, file_path)
+            blocked_since = time.monotonic()
+            self._queue.put(item)
+            blocked_seconds = time.monotonic() - blocked_since
+            QUEUE_BLOCKED_SECONDS.inc(blocked_seconds)
+            with self._lock:
+                self._stats['blocked_submits'] += 1
+                self._stats['blocked_seconds'] += blocked_seconds
+
+        depth = self._queue.qsize()
+        QUEUE_DEPTH.set(depth)
+        with self._lock:
+            self._stats['enqueued'] += 1
+            self._stats['max_depth'] = max(self._stats['max_depth'], depth)
+
+    def _abandon(self, file_path, since, reason):
+        """Readiness monitor callback: forgets a file that will not be queued."""
+        QUEUE_NOT_READY.set(self.readiness.watching())
+        if reason == ABANDONED_GONE:
+            logger.debug("Skipping '%s', it no longer exists.", file_path)
+            self._finish(file_path, 'processed', time.monotonic() - since)
+        else:
+            logger.info("'%s' was not completely written (%s). It will remain in the dropbox folder.", file_path, reason)
+            self._finish(file_path, 'abandoned', time.monotonic() - since)
+
+    def left_behind_files(self):
+        """
+        Paths left in the dropbox folder since their last submit(): their ingest failed,
+        no route matched them, or they were given up before they were completely written
+        (e.g. at stop()).
+        """
+        with self._lock:
+            return sorted(self._left_behind)
+
+    def stats(self):
+        """
+        Returns a snapshot of the queue and backpressure metrics.
+
+        Returns:
+            dict: Counters plus the current 'depth', the files waiting to be completely
+                  written ('not_ready'), the files waiting for a slot of their table
+                  ('waiting_for_slot') and the average seconds files waited between
+                  their first event and ingestion ('avg_wait_seconds').
+        """
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['waiting_for_slot'] = sum(len(files) for files in self._deferred.values())
+        snapshot['depth'] = self._queue.qsize()
+        snapshot['not_ready'] = self.readiness.watching()
+        finished = snapshot['processed'] + snapshot['failed'] + snapshot['unrouted'] + snapshot['abandoned']
+        snapshot['avg_wait_seconds'] = round(snapshot['total_wait_seconds'] / finished, 3) if finished else 0.0
+        return snapshot
+
+    def _run_worker(self):
+        """Worker loop: takes paths off the queue and ingests them until stopped."""
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                break
+            QUEUE_DEPTH.set(self._queue.qsize())
+            try:
+                job = self._take(item)
+                # Then load the files of the same table that were set aside meanwhile
+                while job is not None:
+                    job = self._ingest(*job)
+            except Exception as e:
+                logger.critical("Ingest worker failed on '%s': %s", item[0], e, exc_info=True)
+                self._finish(item[0], 'failed', time.monotonic() - item[1])
+            finally:
+                self._queue.task_done()
+
+    def _take(self, item):
+        """
+        Routes a completely written file and takes a slot of its table.
+
+        Returns:
+            tuple or None: (file_path, table_name, enqueued_at) to ingest now, or None if
+                           the file was finished here or set aside for a later slot.
+        """
+        file_path, enqueued_at = item
+        # Only process if the file still exists and hasn't been moved by a previous event
+        if not os.path.exists(file_path):
+            logger.debug("Skipping '%s', it no longer exists.", file_path)
+            self._finish(file_path, 'processed', time.monotonic() - enqueued_at)
+            return None
+        table_name = self.router.route(file_path)
+        if table_name is None:
+            logger.warning("No route matches '%s'. It will remain in the dropbox folder.", os.path.basename(file_path))
+            self._finish(file_path, 'unrouted', time.monotonic() - enqueued_at)
+            return None
+
+        with self._lock:
+            if not self.router.try_acquire(table_name):
+                self._deferred[table_name].append((file_path, enqueued_at))
+                self._stats['deferred'] += 1
+                QUEUE_DEFERRED.set(len(self._deferred[table_name]), table=table_name)
+                logger.debug("'%s' waits for a free '%s' slot.", file_path, table_name)
+                return None
+        return file_path, table_name, enqueued_at
+
+    def _ingest(self, file_path, table_name, enqueued_at):
+        """
+        Ingests one file while holding a slot of its table, then hands the slot to the
+        next set-aside file of the table or releases it.
+
+        Returns:
+            tuple or None: The next (file_path, table_name, enqueued_at) to ingest, or None.
+        """
+        succeeded = False
+        next_job = None
+        waited = time.monotonic() - enqueued_at
+        QUEUE_WAIT.observe(waited, table=table_name)
+        try:
+            succeeded = process_single_csv_file(file_path, table_name)
+        except Exception as e:
+            logger.critical("Ingest worker failed on '%s': %s", file_path, e, exc_info=True)
+        finally:
+            self._finish(file_path, 'processed' if succeeded else 'failed', waited)
+            with self._lock:
+                deferred = self._deferred[table_name]
+                if deferred:
+                    next_file_path, next_enqueued_at = deferred.popleft()
+                    next_job = (next_file_path, table_name, next_enqueued_at)
+                    QUEUE_DEFERRED.set(len(deferred), table=table_name)
+                else:
+                    self.router.release(table_name)
+        return next_job
+
+    def _finish(self, file_path, outcome, waited):
+        """Forgets a finished path so new events for it are queued again, and counts the outcome."""
+        with self._lock:
+            self._pending.discard(file_path)
+            if outcome in ('failed', 'unrouted', 'abandoned'):
+                self._left_behind.add(file_path)
+            else:
+                self._left_behind.discard(file_path)
+            self._stats[outcome] += 1
+            self._stats['total_wait_seconds'] += waited
@@ -0,0 +1,165 @@
+# business_layer/ingest_router.py
+
+import fnmatch
+import logging
+import os
+import re
+import threading
+
+from v3.src.config.settings import ROUTING_CONFIG
+from v3.src.data_layer.csv_processor import csv_parse_errors, read_column_names
+
+logger = logging.getLogger(__name__)
+
+class IngestRoute:
+    """
+    One entry of the routing table: which files go to which table.
+
+    A route matches on the file name (a glob 'pattern' or a 'regex') or on the file's
+    header (the columns it must contain). Its concurrency slots limit how many files of
+    its table are loaded at the same time; routes to the same table share them.
+    """
+    def __init__(self, table_name, pattern=None, regex=None, header=None):
+        if sum(matcher is not None for matcher in (pattern, regex, header)) != 1:
+            raise ValueError(f"Route to '{table_name}' needs exactly one of 'pattern', 'regex' or 'header'.")
+        self.table_name = table_name
+        self.pattern = pattern
+        self.regex = re.compile(regex) if regex is not None else None
+        self.header = frozenset(header) if header is not None else None
+
+    @property
+    def needs_header(self):
+        return self.header is not None
+
+    def matches(self, file_name, columns=None):
+        """
+        True if the route accepts the file.
+
+        Args:
+            file_name (str): The base name of the file.
+            columns (list, optional): The file's column names, needed by header routes.
+        """
+        if self.pattern is not None:
+            return fnmatch.fnmatchcase(file_name, self.pattern)
+        if self.regex is not None:
+            return self.regex.search(file_name) is not None
+        return columns is not None and self.header.issubset(columns)
+
+    def __repr__(self):
+        matcher = self.pattern or (self.regex.pattern if self.regex else sorted(self.header))
+        return f"IngestRoute({self.table_name!r}, {matcher!r})"
+
+class IngestRouter:
+    """
+    Maps dropbox files to their target tables and enforces per-table concurrency limits.
+
+    Routes are tried in order and the first match wins. A file's header is read at most
+    once, and only when a header route is reached. Files no route matches go to the
+    default table, if there is one.
+    """
+    def __init__(self, routes, default_table=None, max_concurrency=None):
+        """
+        Args:
+            routes (list): IngestRoute objects, in matching order.
+            default_table (str, optional): Table for files no route matches.
+            max_concurrency (dict, optional): Maximum files loaded at the same time, by table.
+        """
+        self.routes = list(routes)
+        self.default_table = default_table
+        self.max_concurrency = dict(max_concurrency or {})
+        self._active = {table_name: 0 for table_name in self.tables()}
+        self._lock = threading.Lock()
+
+    def tables(self):
+        """The distinct target tables, in routing order."""
+        tables = [route.table_name for route in self.routes]
+        if self.default_table is not None:
+            tables.append(self.default_table)
+        return list(dict.fromkeys(tables))
+
+    def route(self, file_path):
+        """
+        Returns the target table of a file.
+
+        Returns:
+            str or None: The table name, or None if no route matches and there is no
+                         default table (or the header of a file could not be read).
+        """
+        file_name = os.path.basename(file_path)
+        columns = None
+        for route in self.routes:
+            if route.needs_header and columns is None:
+                try:
+                    columns = read_column_names(file_path)
+                except (OSError, ValueError, ImportError) + csv_parse_errors() as e:
+                    logger.error("Could not read the header of '%s' to route it: %s", file_name, e)
+                    return None
+            if route.matches(file_name, columns):
+                return route.table_name
+        return self.default_table
+
+    def try_acquire(self, table_name):
+        """
+        Takes one of the table's concurrency slots if one is free.
+
+        Returns:
+            bool: True if the caller may load a file into the table now; it must call
+                  release() when done.
+        """
+        limit = self.max_concurrency.get(table_name)
+        with self._lock:
+            active = self._active.get(table_name, 0)
+            if limit is not None and active >= limit:
+                return False
+            self._active[table_name] = active + 1
+            return True
+
+    def release(self, table_name):
+        """Returns a slot taken with try_acquire()."""
+        with self._lock:
+            self._active[table_name] -= 1
+
+    def active(self):
+        """Files being loaded right now, by table."""
+        with self._lock:
+            return dict(self._active)
+
+def build_ingest_router(config):
+    """
+    Builds an IngestRouter from ROUTING_CONFIG-style settings.
+
+    Args:
+        config (dict): 'routes' (dicts with 'table', one of 'pattern' / 'regex' / 'header',
+                       and an optional 'max_concurrency') and 'default_table'.
+
+    Returns:
+        IngestRouter: The router.
+    """
+    routes = []
+    max_concurrency = {}
+    for entry in config.get('routes', ()):
+        table_name = entry['table']
+        routes.append(IngestRoute(table_name, entry.get('pattern'), entry.get('regex'), entry.get('header')))
+        limit = entry.get('max_concurrency')
+        if limit is not None:
+            if limit < 1:
+                raise ValueError(f"Route to '{table_name}' has max_concurrency {limit}; it must be at least 1.")
+            # Routes to the same table share one limit, the strictest one
+            max_concurrency[table_name] = min(limit, max_concurrency.get(table_name, limit))
+    return IngestRouter(routes, config.get('default_table'), max_concurrency)
+
+def single_table_router(table_name):
+    """An IngestRouter sending every file to one table, without a concurrency limit."""
+    return IngestRouter([], default_table=table_name)
+
+_ingest_router = None
+_ingest_router_lock = threading.Lock()
+
+def get_ingest_router():
+    """Returns the shared IngestRouter built from ROUTING_CONFIG, building it on first use."""
+    global _ingest_router
+    with _ingest_router_lock:
+        if _ingest_router is None:
+            _ingest_router = build_ingest_router(ROUTING_CONFIG)
+            logger.info("Routing input files to %s.", ', '.join(_ingest_router.tables()) or 'no tables')
+        return _ingest_router
@@ -1,30 +1,93 @@
+import collections
 import os
 import shutil
 import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 
 # Import configurations
-from v2.src.config.settings import MYSQL_CONFIG, DROPBOX_FOLDER, ARCHIVE_FOLDER
+from v3.src.config.settings import MYSQL_CONFIG, DROPBOX_FOLDER, ARCHIVE_FOLDER, INGEST_CONFIG, TABLE_INGEST_CONFIG, PARALLEL_CONFIG, LOGGING_CONFIG, RECORD_COUNT_MODE, MANIFEST_CONFIG, PROFILING_CONFIG
+
+# Import the file router
+from v3.src.business_layer.ingest_router import get_ingest_router, single_table_router
 
 # Import data layer functions
-from v2.src.data_layer.data_reader import read_records
-from v2.src.data_layer.csv_processor import process_csv_and_insert_into_mysql
+from v3.src.data_layer.checkpoint_store import DEFAULT_CHECKPOINT_TABLE, clear_checkpoint, stat_file_key
+from v3.src.data_layer.data_reader import count_records
+from v3.src.data_layer.csv_processor import COMMIT_PER_CHUNK, is_input_file, new_ingest_stats, process_csv_and_insert_into_mysql
+from v3.src.data_layer.db_connection import reset_pools_after_fork
+from v3.src.data_layer.ingest_manifest import IngestManifest
+from v3.src.utils import metrics
+from v3.src.utils.logger import setup_worker_logging, start_worker_log_forwarding
+from v3.src.utils.profiling import profile_calls
 
 logger = logging.getLogger(__name__)
 
+FILES_SEEN = metrics.counter('etl_files_seen_total', 'CSV files picked up for ingestion.', ['table'])
+FILES_PROCESSED = metrics.counter('etl_files_processed_total', 'CSV files loaded and archived.', ['table'])
+FILES_SKIPPED = metrics.counter('etl_files_skipped_total', 'CSV files skipped because their content was already ingested.', ['table'])
+FILES_FAILED = metrics.counter('etl_files_failed_total', 'CSV files that failed and were left in the dropbox folder.', ['table'])
+ROWS_INSERTED = metrics.counter('etl_rows_inserted_total', 'Rows inserted into MySQL.', ['table'])
+ROWS_REJECTED = metrics.counter('etl_rows_rejected_total', 'Rows rejected by MySQL and written to a dead-letter file.', ['table'])
+BYTES_READ = metrics.counter('etl_bytes_read_total', 'Bytes of CSV files read for ingestion.', ['table'])
+STAGE_DURATION = metrics.histogram(
+    'etl_stage_duration_seconds', 'Per-file time spent in each ingest stage (parse, convert, insert, commit, archive).',
+    ['table', 'stage']
+)
+FILE_DURATION = metrics.histogram('etl_file_duration_seconds', 'Wall-clock time to ingest and archive one CSV file.', ['table'])
+
 def ensure_directories_exist():
     """Ensures that the dropbox and archive directories exist."""
     try:
         os.makedirs(DROPBOX_FOLDER, exist_ok=True)
         os.makedirs(ARCHIVE_FOLDER, exist_ok=True)
-        logger.info(f"Ensured '{DROPBOX_FOLDER}' and '{ARCHIVE_FOLDER}' directories exist.")
+        logger.info("Ensured '%s' and '%s' directories exist.", DROPBOX_FOLDER, ARCHIVE_FOLDER)
         return True
     except OSError as e:
-        logger.error(f"Error creating directories: {e}")
+        logger.error("Error creating directories: %s", e)
         return False
 
+def get_ingest_config(table_name):
+    """
+    Returns the ingest options for a table: INGEST_CONFIG merged with the table's
+    entry in TABLE_INGEST_CONFIG, if any.
+    """
+    return {**INGEST_CONFIG, **TABLE_INGEST_CONFIG.get(table_name, {})}
+
+_ingest_manifest = None
+_ingest_manifest_lock = threading.Lock()
+
+def get_ingest_manifest():
+    """
+    Returns the shared IngestManifest, opening it on first use.
+
+    Returns:
+        IngestManifest or None: The manifest, or None if MANIFEST_CONFIG disables it.
+    """
+    global _ingest_manifest
+    if not MANIFEST_CONFIG['enabled']:
+        return None
+    with _ingest_manifest_lock:
+        if _ingest_manifest is None:
+            _ingest_manifest = IngestManifest(MANIFEST_CONFIG['path'], MANIFEST_CONFIG['trust_size_mtime'])
+        return _ingest_manifest
+
+def _record_ingest_metrics(table_name, stats, file_size):
+    """Adds the rows, bytes and stage timings of one ingest attempt to the exported metrics."""
+    ROWS_INSERTED.inc(stats['rows'], table=table_name)
+    ROWS_REJECTED.inc(stats['rejected_rows'], table=table_name)
+    BYTES_READ.inc(file_size, table=table_name)
+    for stage in ('parse', 'convert', 'insert', 'commit'):
+        STAGE_DURATION.observe(stats[f'{stage}_seconds'], table=table_name, stage=stage)
+
+@profile_calls(PROFILING_CONFIG)
 def process_single_csv_file(file_path, table_name):
     """
     Processes a single CSV file, inserts data into MySQL, and moves it to the archive.
+    Files whose content is already in the ingest manifest are archived without loading them again.
+    With checkpointing, a file whose earlier load was interrupted resumes after its last committed chunk.
+    A sample of the calls is profiled when PROFILING_CONFIG enables it.
 
     Args:
         file_path (str): The full path to the CSV file to process.
@@ -36,58 +99,242 @@ def process_single_csv_file(file_path, table_name):
     filename = os.path.basename(file_path)
     archive_file_path = os.path.join(ARCHIVE_FOLDER, filename)
 
-    logger.info(f"Attempting to process single CSV file: {filename}...")
+    logger.info("Attempting to process single CSV file: %s...", filename)
+    FILES_SEEN.inc(table=table_name)
+    started = time.perf_counter()
+    manifest = get_ingest_manifest()
+    claimed_hash = None
     try:
-        if process_csv_and_insert_into_mysql(file_path, MYSQL_CONFIG, table_name):
+        if manifest is not None:
+            identity, known = manifest.identify(file_path)
+            if known:
+                shutil.move(file_path, archive_file_path)
+                FILES_SKIPPED.inc(table=table_name)
+                logger.warning(
+                    "Skipped '%s': identical content was already ingested into '%s' on %s as '%s'. Moved it to '%s'.",
+                    filename, known['table_name'], known['ingested_at'], known['file_name'], ARCHIVE_FOLDER
+                )
+                return True
+            if not manifest.claim(identity['content_hash']):
+                FILES_SKIPPED.inc(table=table_name)
+                logger.warning("Skipped '%s': identical content is being ingested by another worker. It will remain in the dropbox folder.", filename)
+                return False
+            claimed_hash = identity['content_hash']
+
+        ingest_config = get_ingest_config(table_name)
+        file_key = None
+        if ingest_config.get('checkpoint') and ingest_config.get('commit_mode') == COMMIT_PER_CHUNK:
+            file_key = claimed_hash or stat_file_key(file_path)
+
+        stats = new_ingest_stats()
+        file_size = os.path.getsize(file_path)
+        succeeded = process_csv_and_insert_into_mysql(file_path, MYSQL_CONFIG, table_name, ingest_config, stats, file_key=file_key)
+        _record_ingest_metrics(table_name, stats, file_size)
+        if succeeded:
+            if manifest is not None:
+                manifest.record(identity, table_name)
+            archive_started = time.perf_counter()
             shutil.move(file_path, archive_file_path)
-            logger.info(f"Successfully processed and moved '{filename}' to '{ARCHIVE_FOLDER}'.")
+            STAGE_DURATION.observe(time.perf_counter() - archive_started, table=table_name, stage='archive')
+            logger.info("Successfully processed and moved '%s' to '%s'.", filename, ARCHIVE_FOLDER)
+            if file_key is not None:
+                clear_checkpoint(MYSQL_CONFIG, file_key, ingest_config.get('checkpoint_table', DEFAULT_CHECKPOINT_TABLE))
+            FILES_PROCESSED.inc(table=table_name)
+            FILE_DURATION.observe(time.perf_counter() - started, table=table_name)
             return True
         else:
-            logger.error(f"Failed to process '{filename}'. It will remain in the dropbox folder.")
+            logger.error("Failed to process '%s'. It will remain in the dropbox folder.", filename)
+            FILES_FAILED.inc(table=table_name)
             return False
     except Exception as e:
-        logger.critical(f"Critical error processing single file '{filename}': {e}", exc_info=True)
+        logger.critical("Critical error processing single file '%s': %s", filename, e, exc_info=True)
+        FILES_FAILED.inc(table=table_name)
         return False
+    finally:
+        if claimed_hash is not None:
+            manifest.release(claimed_hash)
     
 def csv_file_generator(directory):
-    """Yields one CSV file path at a time from the specified directory."""
+    """Yields one input file path (plain or compressed CSV, Parquet, Arrow IPC) at a time from the specified directory."""
     with os.scandir(directory) as entries:
         for entry in entries:
-            if entry.is_file() and entry.name.endswith('.csv'):
+            if entry.is_file() and is_input_file(entry.name):
                 yield entry.path
 
 
-def process_all_csv_files(table_name):
+def _init_worker_process(log_queue):
+    """Prepares a worker process: fresh connection pools and manifest, and logging through the main process."""
+    global _ingest_manifest
+    reset_pools_after_fork()
+    _ingest_manifest = None # Open a separate SQLite connection in this process
+    metrics.REGISTRY.drain_values() # Forget the counts inherited from the main process
+    setup_worker_logging(log_queue, LOGGING_CONFIG['log_level'])
+
+def _process_file_in_worker_process(file_path, table_name):
+    """
+    Runs process_single_csv_file in a worker process.
+
+    Returns:
+        tuple: (result, metric values recorded meanwhile) for the main process to export.
+    """
+    succeeded = process_single_csv_file(file_path, table_name)
+    return succeeded, metrics.REGISTRY.drain_values()
+
+def _process_files_in_parallel(routed_files, router, max_workers, executor_kind):
+    """
+    Processes files concurrently. Each worker runs process_single_csv_file, so a file
+    is archived only after its own data has been committed. A file is only handed to
+    the pool while its table is below its concurrency limit; files of other tables go
+    ahead of it meanwhile.
+
+    Process workers log through the main process and return the metrics they recorded
+    with each result, so the log file and the exported metrics cover them as well.
+
+    Args:
+        routed_files (list): (file_path, table_name) pairs, in processing order.
+        router (IngestRouter): Holds the per-table concurrency limits.
+
+    Returns:
+        dict: Maps each file path to True if it was processed and archived, else False.
+    """
+    in_processes = executor_kind == 'process'
+    log_forwarder = None
+    if in_processes:
+        log_queue, log_forwarder = start_worker_log_forwarding()
+        executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker_process, initargs=(log_queue,))
+        process_file = _process_file_in_worker_process
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='csv-ingest')
+        process_file = process_single_csv_file
+
+    results = {}
+    waiting = collections.deque(routed_files)
+    futures = {}
+    try:
+        with executor:
+            while waiting or futures:
+                held_back = collections.deque()
+                while waiting:
+                    file_path, table_name = waiting.popleft()
+                    if router.try_acquire(table_name):
+                        futures[executor.submit(process_file, file_path, table_name)] = (file_path, table_name)
+                    else:
+                        held_back.append((file_path, table_name))
+                waiting = held_back
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file_path, table_name = futures.pop(future)
+                    router.release(table_name)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.critical("Worker failed while processing '%s': %s", os.path.basename(file_path), e, exc_info=True)
+                        results[file_path] = False
+                        continue
+                    if in_processes:
+                        result, metric_values = result
+                        metrics.REGISTRY.merge_values(metric_values)
+                    results[file_path] = result
+    finally:
+        if log_forwarder is not None:
+            log_forwarder.stop() # The workers have exited; write their last records
+    return results
+
+def route_files(file_paths, router):
+    """
+    Routes files to their tables.
+
+    Returns:
+        tuple: ([(file_path, table_name)] for the routed files, [file_path] no route matches).
+    """
+    routed_files = []
+    unrouted_files = []
+    for file_path in file_paths:
+        table_name = router.route(file_path)
+        if table_name is None:
+            logger.warning("No route matches '%s'. It will remain in the dropbox folder.", os.path.basename(file_path))
+            unrouted_files.append(file_path)
+        else:
+            routed_files.append((file_path, table_name))
+    return routed_files, unrouted_files
+
+def _log_run_summary(results, elapsed_seconds):
+    """Builds and logs the summary of one processing run."""
+    failed_files = sorted(os.path.basename(path) for path, ok in results.items() if not ok)
+    summary = {
+        'files_found': len(results),
+        'files_processed': len(results) - len(failed_files),
+        'files_failed': len(failed_files),
+        'failed_files': failed_files,
+        'elapsed_seconds': round(elapsed_seconds, 3),
+        'files_per_second': round(len(results) / elapsed_seconds, 2) if elapsed_seconds > 0 else 0.0
+    }
+    logger.info(
+        "Run summary: %s found, %s processed, %s failed in %ss (%s files/s).",
+        summary['files_found'], summary['files_processed'], summary['files_failed'], summary['elapsed_seconds'], summary['files_per_second']
+    )
+    if failed_files:
+        logger.warning("Files left in the dropbox folder after failures: %s", ', '.join(failed_files))
+    return summary
+
+def process_all_csv_files(table_name=None):
     """
-    Processes CSV files one-by-one from the DROPBOX_FOLDER.
+    Processes the input files in the DROPBOX_FOLDER, one-by-one or with a worker pool
+    as configured in PARALLEL_CONFIG. Each file goes to the table ROUTING_CONFIG routes
+    it to; files no route matches stay in the dropbox folder and count as failed.
     Useful for an initial scan when the application starts.
+
+    Args:
+        table_name (str, optional): Load every file into this table instead of routing them.
+
+    Returns:
+        dict or None: The run summary (files found/processed/failed, elapsed time),
+                      or None if the folders could not be created.
     """
     if not ensure_directories_exist():
         logger.error("Cannot proceed with CSV processing due to directory creation failure.")
-        return
+        return None
 
-    logger.info(f"Performing initial scan for CSV files in '{DROPBOX_FOLDER}'...")
-    processed_count = 0
+    logger.info("Performing initial scan for CSV files in '%s'...", DROPBOX_FOLDER)
+    router = single_table_router(table_name) if table_name else get_ingest_router()
+    max_workers = max(1, PARALLEL_CONFIG.get('max_workers', 1))
+    executor_kind = PARALLEL_CONFIG.get('executor', 'thread')
+    started = time.perf_counter()
 
-    for file_path in csv_file_generator(DROPBOX_FOLDER):
-        if process_single_csv_file(file_path, table_name):
-            processed_count += 1
+    results = {}
+    if max_workers == 1:
+        for file_path in csv_file_generator(DROPBOX_FOLDER):
+            routed_files, unrouted_files = route_files([file_path], router)
+            for routed_path, routed_table in routed_files:
+                results[routed_path] = process_single_csv_file(routed_path, routed_table)
+            results.update((unrouted_path, False) for unrouted_path in unrouted_files)
+    else:
+        routed_files, unrouted_files = route_files(csv_file_generator(DROPBOX_FOLDER), router)
+        logger.info("Processing %s CSV files with %s %s workers...", len(routed_files), max_workers, executor_kind)
+        results = _process_files_in_parallel(routed_files, router, max_workers, executor_kind)
+        results.update((unrouted_path, False) for unrouted_path in unrouted_files)
 
+    processed_count = sum(1 for ok in results.values() if ok)
     if processed_count == 0:
         logger.info("No existing CSV files found or processed during initial scan.")
     else:
-        logger.info(f"Finished initial scan, processed {processed_count} CSV files.")
+        logger.info("Finished initial scan, processed %s CSV files.", processed_count)
+    return _log_run_summary(results, time.perf_counter() - started)
 
 def display_current_database_records(table_name):
     """
-    Reads and displays all current records from the specified MySQL table.
+    Logs the number of records currently in the specified MySQL table, using an exact
+    COUNT(*) or the table statistics estimate as configured by RECORD_COUNT_MODE.
     """
-    logger.info(f"Reading current records from '{table_name}' table for verification:")
-    current_records = read_records(MYSQL_CONFIG, table_name)
+    estimate = RECORD_COUNT_MODE == 'estimate'
+    logger.info("Counting current records in '%s' table for verification (%s):", table_name, RECORD_COUNT_MODE)
+    record_count = count_records(MYSQL_CONFIG, table_name, estimate=estimate)
 
-    if current_records:
-        logger.info(f"Total {len(current_records)} records found in '{table_name}'.")
-        # The read_records function (in data_layer/read_data.py) already prints
-        # the records to the console.
+    if record_count is None:
+        logger.error("Could not count the records in '%s'.", table_name)
+    elif record_count:
+        prefix = "About" if estimate else "Total"
+        logger.info("%s %s records found in '%s'.", prefix, record_count, table_name)
     else:
-        logger.warning(f"No records found in '{table_name}'.")
+        logger.warning("No records found in '%s'.", table_name)
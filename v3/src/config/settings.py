@@ -9,26 +9,268 @@ MYSQL_CONFIG = {
     'host': 'localhost',  # e.g., 'localhost' or '
     'database': 'ETL_WORKFLOW_PROJECT', # e.g., 'my_new_app_db'
     'user': 'root',                   # Your MySQL username
-    'password': ''                    # Your MySQL password (empty if no password)
+    'password': '',                   # Your MySQL password (empty if no password)
+    # Required by the 'load_data' ingest engine. The server must also run with local_infile=1.
+    'allow_local_infile': False,
+    # Connection pool shared by the CSV processor and the data reader
+    'pool_size': 5,                     # Maximum number of open connections
+    'pool_ping_on_borrow': True,        # Health-check (and reconnect) connections when borrowed
+    'pool_max_idle_seconds': 300,       # Close connections left idle longer than this
+    'pool_acquire_timeout_seconds': 30, # How long to wait for a free connection
+    'pool_reconnect_attempts': 3        # Reconnect attempts for a dropped connection
 }
 
 # Define the table for data operations
 STUDENTS_TABLE = 'students_performance' # Make sure this table exists in your database
 
+# How display_current_database_records counts the table at startup
+# 'exact'    - SELECT COUNT(*), exact but scans an index on large tables
+# 'estimate' - InnoDB table statistics from INFORMATION_SCHEMA, instant but approximate
+RECORD_COUNT_MODE = 'exact'
+
 # Folder paths for CSV processing
-# These paths are relative to the project's base directory
-DROPBOX_FOLDER = os.path.join(BASE_DIR, 'dropbox')
-ARCHIVE_FOLDER = os.path.join(BASE_DIR, 'archive')
+# These paths are relative to the project's base directory; the ETL_DROPBOX_FOLDER and
+# ETL_ARCHIVE_FOLDER environment variables override them (e.g. per cron entry)
+DROPBOX_FOLDER = os.environ.get('ETL_DROPBOX_FOLDER', os.path.join(BASE_DIR, 'dropbox'))
+ARCHIVE_FOLDER = os.environ.get('ETL_ARCHIVE_FOLDER', os.path.join(BASE_DIR, 'archive'))
+
+# CSV ingest configuration
+# 'chunk_size' is the number of CSV rows parsed and inserted at a time, so memory
+# stays flat no matter how large the file is.
+# 'commit_mode' controls the transaction boundaries:
+#   'file'  - one transaction per file, all-or-nothing (default)
+#   'chunk' - commit after every chunk, rows committed before a failure are kept
+# 'engine' selects how rows are written to MySQL:
+#   'executemany' - parameterised multi-row INSERT statements (default, works everywhere)
+#   'load_data'   - LOAD DATA LOCAL INFILE, 10-50x faster for large files; needs
+#                   'allow_local_infile' in MYSQL_CONFIG and falls back to
+#                   'executemany' when the server refuses local files
+# 'max_batch_rows', 'max_batch_bytes' and 'packet_fill_ratio' size the multi-row INSERT
+# statements: at most 'max_batch_rows' rows and 'packet_fill_ratio' of the server's
+# max_allowed_packet per statement ('max_batch_bytes' can lower the byte budget further).
+# 'use_table_schema' reads the target table's columns from INFORMATION_SCHEMA (cached for
+# 'schema_cache_ttl_seconds') to give pandas explicit dtypes/usecols and to reject files
+# whose header does not match the table. 'categorical_columns' (set per table below) are
+# parsed as pandas categoricals.
+# 'checkpoint' (effective with commit_mode 'chunk') records the byte offset of every
+# committed chunk in 'checkpoint_table', in the same transaction as the chunk, so a load
+# interrupted by a crash or restart resumes after the last committed chunk.
+# 'pipeline' parses and converts the next chunks in background threads while the current
+# chunk is inserted; 'parse_queue_depth' and 'convert_queue_depth' are the number of
+# chunks each stage may run ahead (memory grows with them, by one chunk each).
+# 'parser' selects the CSV parser:
+#   'pandas' - pandas' C engine (default)
+#   'arrow'  - Arrow's multithreaded CSV reader, which converts its columns to rows
+#              without a pandas round-trip; needs the optional pyarrow package (falls
+#              back to 'pandas' without it). Parquet and Arrow IPC files in the
+#              dropbox are always read with Arrow.
+# 'load_strategy' selects where the rows go:
+#   'direct'  - inserted straight into the target table (default)
+#   'staging' - bulk-loaded into an unindexed temporary staging table, then moved into
+#               the target with one INSERT ... SELECT, so the file's rows become visible
+#               at once (always one transaction per file). With 'staging_dedupe', rows
+#               already in the target (compared on 'staging_dedupe_columns', all columns
+#               if None) or repeated in the file are skipped. 'staging_cleanup' is 'drop'
+#               or 'truncate' (keeps the table for the next file with the same columns
+#               on the same connection).
+# 'isolate_bad_rows' sets aside the rows MySQL rejects for their values (bad types, NULLs
+# in NOT NULL columns, duplicate keys, values too long...) instead of failing the file:
+# a failing INSERT batch is bisected until the offending rows are found, they are
+# written with the error to '<dead_letter_dir>/<file name>.rejected.csv', and the good
+# rows are committed. More than 'max_rejected_rows' bad rows (None: no limit) fail the
+# file as before. Applies to the 'executemany' engine; LOAD DATA LOCAL only warns about
+# bad values.
+# 'write_mode' selects what happens to rows that describe a record already in the table:
+#   'insert' - every row becomes a new record (default)
+#   'upsert' - rows are sent as batched INSERT ... ON DUPLICATE KEY UPDATE, so a row whose
+#              'natural_key' columns match an existing record overwrites its
+#              'update_columns' (None: every loaded column outside the key; []: keep the
+#              existing record), and re-sent corrections never become duplicates. The
+#              table needs a unique index on exactly the natural key columns (see
+#              sql.txt) and each file the key columns; other files are not loaded.
+#              Upserts use the 'executemany' engine, or the merge of the 'staging' load
+#              strategy. No table has a natural key by default.
+INGEST_CONFIG = {
+    'chunk_size': 50000,
+    'commit_mode': 'file',
+    'engine': 'executemany',
+    'max_batch_rows': 5000,
+    'max_batch_bytes': None,
+    'packet_fill_ratio': 0.5,
+    'use_table_schema': True,
+    'schema_cache_ttl_seconds': 600,
+    'checkpoint': True,
+    'checkpoint_table': 'etl_ingest_checkpoints',
+    'pipeline': True,
+    'parse_queue_depth': 2,
+    'convert_queue_depth': 2,
+    'parser': 'pandas',
+    'load_strategy': 'direct',
+    'staging_dedupe': False,
+    'staging_dedupe_columns': None,
+    'staging_cleanup': 'drop',
+    'isolate_bad_rows': True,
+    'dead_letter_dir': os.path.join(BASE_DIR, 'dead_letter'),
+    'max_rejected_rows': 1000,
+    'write_mode': 'insert',
+    'natural_key': None,
+    'update_columns': None
+}
+
+# Per-table overrides of INGEST_CONFIG, keyed by table name
+# e.g. {STUDENTS_TABLE: {'engine': 'load_data'}}
+# Set 'write_mode': 'upsert' on a table to apply re-sent rows to the records with the
+# same 'natural_key' instead of inserting them again.
+TABLE_INGEST_CONFIG = {
+    STUDENTS_TABLE: {
+        'engine': 'executemany',
+        'categorical_columns': ['gender', 'race_ethnicity', 'parental_level_of_education', 'lunch', 'test_preparation_course']
+    }
+}
+
+# Routing of dropbox files to target tables, so one process loads every table
+# 'routes' are tried in order and the first match wins. Each route has a 'table' and one
+# way of matching files:
+#   'pattern' - a glob on the file name, e.g. 'scores_*.csv*'
+#   'regex'   - a regular expression searched in the file name
+#   'header'  - a header signature: the columns the file must contain (any order,
+#               extra columns allowed); the header is only read if no earlier name
+#               route matched
+# 'max_concurrency' (optional) limits how many files of the route's table are loaded at
+# the same time; files over the limit wait without holding up other tables.
+# 'default_table' receives files no route matches (None leaves them in the dropbox).
+ROUTING_CONFIG = {
+    'routes': [
+        {'table': STUDENTS_TABLE, 'pattern': '*', 'max_concurrency': None}
+    ],
+    'default_table': None
+}
+
+# Manifest of ingested files, used to skip files whose content was already loaded
+# 'path'             - SQLite file holding one entry per ingested content hash
+# 'trust_size_mtime' - treat a file with the same name, size and mtime as a recorded
+#                      entry as known without hashing it
+MANIFEST_CONFIG = {
+    'enabled': True,
+    'path': os.path.join(BASE_DIR, 'ingest_manifest.sqlite3'),
+    'trust_size_mtime': True
+}
+
+# Parallel processing of the files found by a dropbox scan
+# 'max_workers' - number of files processed at the same time (1 keeps the sequential behaviour)
+# 'executor'    - 'thread'  for DB-bound loads, workers share the connection pool
+#                 'process' for parse-bound loads, each worker parses in its own process
+# A worker loads a whole file (parse, convert and insert); within a file, INGEST_CONFIG
+# 'pipeline' already overlaps parsing with the inserts, so there are no separate parser
+# processes feeding inserter threads. Process workers log through the main process and
+# report their metrics to it, and the ingest manifest claims hold across processes.
+# Keep 'max_workers' at or below MYSQL_CONFIG['pool_size'] when using threads.
+PARALLEL_CONFIG = {
+    'max_workers': 1,
+    'executor': 'thread'
+}
+
+# Work queue between the watchdog handler and the ingest workers
+# 'max_size' - completely written files that can wait in the queue before new ones are
+#              held back (backpressure)
+# 'workers'  - threads draining the queue
+WATCHDOG_QUEUE_CONFIG = {
+    'max_size': 1000,
+    'workers': 2
+}
+
+# When a file reported by watchdog is completely written and can be read
+# 'use_close_events'      - where the observer reports the writer closing a file (inotify
+#                           on Linux), a file is ready when it is closed or renamed into
+#                           the dropbox; elsewhere (other platforms, with False, or for
+#                           writes on SMB/NFS shares) files are polled
+# 'min_quiet_seconds'     - how long a polled file's size and mtime must stay unchanged;
+#                           keep it at seconds, as NFS caches attributes and remote
+#                           writers pause, so a file can look finished while it is not
+# 'initial_quiet_seconds' - delay before a file waiting for its close is stat'ed a
+#                           second time; the interval doubles with each stat...
+# 'max_quiet_seconds'     - ...up to this. A polled file's quiet period also doubles
+#                           each time it is seen growing, up to this, so a copy that
+#                           stalls after being caught mid-write is not handed on early
+# 'close_wait_seconds'    - with close events, a file unchanged this long is read even if
+#                           its close was missed
+# 'timeout_seconds'       - give up on a file that is not complete after this long; it
+#                           stays in the dropbox folder for the next scan
+# Parquet and Arrow IPC files must also end with their footer.
+READINESS_CONFIG = {
+    'use_close_events': True,
+    'min_quiet_seconds': 2.0,
+    'initial_quiet_seconds': 0.01,
+    'max_quiet_seconds': 30,
+    'close_wait_seconds': 30,
+    'timeout_seconds': 3600
+}
+
+# Metrics exported in the Prometheus text format (file/row counters, stage durations,
+# queue depth, connection pool usage)
+# 'http_host', 'http_port' - serve GET /metrics here (port None disables the endpoint);
+#                            keep the host local unless the endpoint is scraped remotely
+# 'textfile_path'          - also write the metrics to this file for node_exporter's
+#                            textfile collector (None disables it)
+# 'textfile_interval_seconds' - how often the textfile is rewritten
+METRICS_CONFIG = {
+    'enabled': True,
+    'http_host': '127.0.0.1',
+    'http_port': 9108,
+    'textfile_path': None,
+    'textfile_interval_seconds': 15
+}
+
+# Sampled profiling of process_single_csv_file with cProfile and tracemalloc, cheap
+# enough to leave on in production at a low 'sample_rate'. Every profiled file writes a
+# .prof dump and a .txt report (top functions, top allocation sites) to 'output_dir'.
+# Environment overrides: ETL_PROFILE=1 enables it, ETL_PROFILE_SAMPLE_RATE and
+# ETL_PROFILE_DIR set the sample rate and output directory.
+PROFILING_CONFIG = {
+    'enabled': os.environ.get('ETL_PROFILE', '0') == '1',
+    'sample_rate': float(os.environ.get('ETL_PROFILE_SAMPLE_RATE', '0.05')),
+    'output_dir': os.environ.get('ETL_PROFILE_DIR', os.path.join(BASE_DIR, 'profiles')),
+    'top_functions': 30,
+    'top_allocations': 25,
+    'tracemalloc_frames': 1
+}
 
 # Logging Configuration
+# 'log_format'   - 'text', or 'json' for one JSON object per line (for log shippers)
+# 'max_bytes'    - rotate the log file once it reaches this size (0 never rotates)
+# 'backup_count' - rotated log files to keep (app.log.1, app.log.2, ...)
+# 'use_queue'    - write log records from a background thread, so the ingest threads
+#                  never wait on the log file or the console
 LOGGING_CONFIG = {
     'log_file': os.path.join(BASE_DIR, 'app.log'),
-    'log_level': 'INFO' # Options: DEBUG, INFO, WARNING, ERROR, CRITICAL
+    'log_level': 'INFO', # Options: DEBUG, INFO, WARNING, ERROR, CRITICAL
+    'log_format': 'text',
+    'max_bytes': 10 * 1024 * 1024,
+    'backup_count': 5,
+    'use_queue': True
 }
 
-# Folder scanning interval in seconds
+# Folder scanning interval in seconds, used by WATCH_CONFIG's 'polling' mode
 # For 2 minutes, set to 120. For 30 minutes, set to 1800.
-SCAN_INTERVAL_SECONDS = 30 # Default to 2 minutes
+SCAN_INTERVAL_SECONDS = 30 # Default to 30 seconds
+
+# How main.py notices new files in the dropbox folder
+# 'mode'       - 'events'  : watchdog file system events (inotify, FSEvents, ReadDirectoryChangesW)
+#                'polling' : list the folder every SCAN_INTERVAL_SECONDS and queue the files that
+#                            are new or changed since the last listing; use it on NFS/SMB mounts,
+#                            where writes made by other machines raise no events
+# 'index_path' - with 'polling', keep the last listing in this SQLite file so a restart only
+#                queues the files added or changed meanwhile, and those whose ingest failed,
+#                matched no route or was cut short (None keeps it in memory, and every file
+#                in the folder is queued at start)
+# 'full_stat_every' - with 'polling', stat every file only on every Nth listing; the others
+#                only stat new or replaced files, so a file left in the folder and rewritten
+#                in place is noticed up to N listings late (1 stats every file every time)
+WATCH_CONFIG = {
+    'mode': 'events',
+    'index_path': None, # e.g. os.path.join(BASE_DIR, 'dropbox_index.sqlite3')
+    'full_stat_every': 10
+}
 
 # You can add other application-wide settings here if needed
 APP_NAME = "MySQL Data Processor"
@@ -0,0 +1,177 @@
+# data_layer/arrow_reader.py
+"""
+Apache Arrow input: a multithreaded CSV parser and Parquet / Arrow IPC files.
+
+Arrow data is converted to row tuples directly with Array.to_pylist(), without going
+through pandas. pyarrow is an optional dependency; without it CSV files are parsed by
+pandas and columnar files are rejected. It is imported on first use, since importing
+it takes longer than the rest of the processor and most runs only read CSV files.
+"""
+
+import io
+import os
+
+# pyarrow modules, set by _import_pyarrow()
+pa = pc = pa_csv = pa_ipc = pq = None
+
+# Columnar input files picked up from the dropbox, by suffix
+COLUMNAR_FORMATS = {
+    '.parquet': 'parquet',
+    '.arrow': 'ipc',
+    '.feather': 'ipc',
+}
+
+# Smallest block each Arrow parser thread works on
+MIN_BLOCK_BYTES = 256 * 1024
+
+def _import_pyarrow():
+    """Imports the pyarrow modules used here, once. Raises ImportError without pyarrow."""
+    global pa, pc, pa_csv, pa_ipc, pq
+    if pa is None:
+        import pyarrow.compute
+        import pyarrow.csv
+        import pyarrow.ipc
+        import pyarrow.parquet
+        pc, pa_csv, pa_ipc, pq = pyarrow.compute, pyarrow.csv, pyarrow.ipc, pyarrow.parquet
+        pa = pyarrow
+    return pa
+
+def arrow_unavailable():
+    """Returns why the Arrow reader cannot be used here, or None if it can."""
+    try:
+        _import_pyarrow()
+    except ImportError: # Optional dependency, see requirements.txt
+        return "the Arrow reader requires the 'pyarrow' package (pip install pyarrow)"
+    return None
+
+def arrow_parse_errors():
+    """The exceptions Arrow raises for malformed input (none if pyarrow was never used)."""
+    return (pa.ArrowInvalid,) if pa is not None else ()
+
+def columnar_format(file_path):
+    """Returns 'parquet' or 'ipc' for a columnar input file, or None for anything else."""
+    for suffix, file_format in COLUMNAR_FORMATS.items():
+        if file_path.endswith(suffix):
+            return file_format
+    return None
+
+def is_columnar_file(file_path):
+    """True if the file name is a Parquet or Arrow IPC file the processor accepts."""
+    return columnar_format(file_path) is not None
+
+def _arrow_type(dtype):
+    """Maps a pandas dtype from build_read_csv_options() to the Arrow type parsed instead."""
+    if dtype == 'category':
+        return pa.dictionary(pa.int32(), pa.string())
+    if dtype == 'float64':
+        return pa.float64()
+    return pa.string()
+
+def csv_convert_options(read_csv_options):
+    """
+    Translates the schema-driven pandas.read_csv options (usecols, dtype, parse_dates)
+    into Arrow CSV ConvertOptions, so both parsers produce the same column types.
+    Integer columns are inferred here too: Arrow reads blanks as nulls and falls back
+    to strings for a column holding a malformed value. Blank strings are nulls, as they
+    are for pandas.
+    """
+    _import_pyarrow()
+    column_types = {name: _arrow_type(dtype) for name, dtype in read_csv_options.get('dtype', {}).items()}
+    for name in read_csv_options.get('parse_dates', ()):
+        column_types[name] = pa.timestamp('us')
+    include_columns = list(read_csv_options.get('usecols', ()))
+    return pa_csv.ConvertOptions(column_types=column_types, include_columns=include_columns, strings_can_be_null=True)
+
+def parse_csv_bytes(data, convert_options):
+    """
+    Parses a block of CSV text (header record included) with Arrow's multithreaded reader.
+
+    The block is split across the reader's threads, so it is cut into pieces of at least
+    MIN_BLOCK_BYTES, one or two per CPU.
+
+    Returns:
+        pyarrow.Table: The parsed rows.
+    """
+    _import_pyarrow()
+    block_size = max(len(data) // (2 * (os.cpu_count() or 1)), MIN_BLOCK_BYTES)
+    read_options = pa_csv.ReadOptions(use_threads=True, block_size=block_size)
+    # Quoted fields may hold line breaks; without this a block boundary can split a record
+    parse_options = pa_csv.ParseOptions(newlines_in_values=True)
+    return pa_csv.read_csv(io.BytesIO(data), read_options=read_options, parse_options=parse_options, convert_options=convert_options)
+
+def columnar_column_names(file_path):
+    """The column names of a Parquet or Arrow IPC file, read from its schema only."""
+    _import_pyarrow()
+    if columnar_format(file_path) == 'parquet':
+        return list(pq.read_schema(file_path).names)
+    with pa.memory_map(file_path) as source:
+        return list(pa_ipc.open_file(source).schema.names)
+
+def iter_columnar_batches(file_path, chunk_size, columns=None):
+    """
+    Reads a Parquet or Arrow IPC file one record batch at a time.
+
+    Args:
+        file_path (str): The file to read.
+        chunk_size (int): Maximum rows per batch (Parquet; IPC files keep their own batches).
+        columns (list, optional): Only read these columns.
+
+    Yields:
+        pyarrow.RecordBatch: The next batch of rows.
+    """
+    _import_pyarrow()
+    if columnar_format(file_path) == 'parquet':
+        parquet_file = pq.ParquetFile(file_path)
+        try:
+            yield from parquet_file.iter_batches(batch_size=chunk_size, columns=columns)
+        finally:
+            parquet_file.close()
+        return
+    with pa.memory_map(file_path) as source:
+        reader = pa_ipc.open_file(source)
+        for index in range(reader.num_record_batches):
+            batch = reader.get_batch(index)
+            yield batch.select(columns) if columns else batch
+
+def is_arrow_data(chunk):
+    """True for a pyarrow Table or RecordBatch (as opposed to a pandas DataFrame)."""
+    # Without pyarrow imported there can be no Arrow data
+    return pa is not None and isinstance(chunk, (pa.Table, pa.RecordBatch))
+
+def _dictionary_to_pylist(column):
+    """
+    Decodes a dictionary-encoded (categorical) column through its indices, so each
+    distinct value becomes one Python string shared by its rows; Array.to_pylist() on
+    the dictionary array builds a scalar per row and is several times slower.
+    """
+    chunks = column.chunks if isinstance(column, pa.ChunkedArray) else [column]
+    values = []
+    for chunk in chunks:
+        dictionary = chunk.dictionary.to_pylist() + [None]
+        indices = chunk.indices.fill_null(len(dictionary) - 1).to_pylist()
+        values.extend([dictionary[index] for index in indices])
+    return values
+
+def arrow_to_rows(data, columns):
+    """
+    Converts a pyarrow Table or RecordBatch to a list of row tuples of native Python
+    values (None for nulls), column by column.
+
+    Args:
+        data (pyarrow.Table or pyarrow.RecordBatch): The parsed rows.
+        columns (list): The columns to extract, in insert order.
+
+    Returns:
+        list: One tuple per row.
+    """
+    values = []
+    for name in columns:
+        column = data.column(data.schema.get_field_index(name))
+        if pa.types.is_floating(column.type):
+            # NaN is not a valid MySQL value; send it as NULL like the pandas path does
+            column = pc.if_else(pc.is_nan(column), pa.scalar(None, column.type), column)
+        if pa.types.is_dictionary(column.type):
+            values.append(_dictionary_to_pylist(column))
+        else:
+            values.append(column.to_pylist())
+    return list(zip(*values))
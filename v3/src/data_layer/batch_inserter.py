@@ -0,0 +1,267 @@
+# data_layer/batch_inserter.py
+
+import itertools
+import logging
+import marshal
+import time
+
+from mysql.connector import Error
+
+from v3.src.data_layer.dead_letter import ROW_DATA_ERRNOS, describe_error
+
+# Set up logging for this module
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH_ROWS = 5000
+
+# Share of max_allowed_packet a single statement may use. Batch sizes are upper bounds,
+# so this is only a safety margin.
+DEFAULT_PACKET_FILL_RATIO = 0.5
+
+# The ', ' between two value groups
+ROW_SEPARATOR_BYTES = 2
+
+# marshal stores text as its UTF-8 bytes, but numbers and NULL in fewer bytes than the
+# statement spells them out in: a float takes 9 bytes for up to 24 characters. Allowing
+# this much per value (separator included), and counting the escapes, makes the
+# marshalled size an upper bound.
+VALUE_ALLOWANCE_BYTES = 17
+
+# Format version 2 writes every value in full; later versions refer back to repeated objects
+MARSHAL_VERSION = 2
+
+# Characters the connector sends backslash-escaped in string values, each taking one
+# byte more in the statement than in the value
+ESCAPED_CHARACTERS = ('\\', '\n', '\r', "'", '"', '\x1a', '\x00')
+_ESCAPED_BYTES = ''.join(ESCAPED_CHARACTERS).encode('ascii')
+
+def get_max_allowed_packet(cursor):
+    """
+    Reads the server's max_allowed_packet, the upper bound for a single statement.
+
+    Args:
+        cursor (mysql.connector.cursor.MySQLCursor): A cursor on the target server.
+
+    Returns:
+        int: max_allowed_packet in bytes.
+    """
+    cursor.execute("SELECT @@max_allowed_packet")
+    (max_allowed_packet,) = cursor.fetchone()
+    return int(max_allowed_packet)
+
+def row_statement_bytes(row):
+    """
+    The size in bytes of one row's '(...)' value group in a multi-row INSERT statement.
+
+    The tuple's repr quotes strings and separates the values as the statement does. It
+    is only encoded when it holds non-ASCII text, whose UTF-8 bytes outnumber its
+    characters. Every character the connector escapes counts twice.
+
+    Args:
+        row (tuple): The values of one row.
+
+    Returns:
+        int: The size of the row's value group in bytes.
+    """
+    text = repr(row)
+    escapes = sum(text.count(character) for character in ESCAPED_CHARACTERS)
+    return (len(text) if text.isascii() else len(text.encode('utf-8'))) + escapes
+
+def batch_statement_bytes(batch, column_count):
+    """
+    An upper bound for the size in bytes of the VALUES list of a multi-row INSERT
+    statement holding batch.
+
+    marshal serialises the whole batch in one call, several times faster than measuring
+    each row, and holds text as its UTF-8 bytes. Every byte of it that the connector
+    would escape counts twice; bytes of the binary framing that happen to look like one
+    only make the bound looser. Batches holding values marshal cannot serialise
+    (datetimes) are measured row by row instead.
+
+    Args:
+        batch (list): Tuples of values, one per row.
+        column_count (int): The number of values in each row.
+
+    Returns:
+        int: The size bound in bytes.
+    """
+    try:
+        encoded = marshal.dumps(batch, MARSHAL_VERSION)
+    except ValueError:
+        return sum(map(row_statement_bytes, batch)) + ROW_SEPARATOR_BYTES * len(batch)
+    escapes = len(encoded) - len(encoded.translate(None, _ESCAPED_BYTES))
+    return len(encoded) + escapes + VALUE_ALLOWANCE_BYTES * column_count * len(batch)
+
+def upsert_update_columns(columns, natural_key, update_columns=None):
+    """
+    The columns an upsert overwrites in an existing record.
+
+    Args:
+        columns (list): The columns being loaded.
+        natural_key (list): The columns of the unique index identifying a record.
+        update_columns (list, optional): The columns to overwrite; None for every loaded
+                                         column outside the natural key.
+
+    Returns:
+        list: The update columns that are loaded and not part of the natural key.
+    """
+    if update_columns is None:
+        return [column for column in columns if column not in natural_key]
+    return [column for column in update_columns if column in columns and column not in natural_key]
+
+def on_duplicate_key_update(update_columns, natural_key):
+    """
+    The ' ON DUPLICATE KEY UPDATE ...' clause that overwrites update_columns of the record
+    an incoming row collides with. Without update columns the existing record is kept
+    as it is: assigning a key column to itself changes nothing.
+    """
+    if not update_columns:
+        return f" ON DUPLICATE KEY UPDATE {natural_key[0]} = {natural_key[0]}"
+    # VALUES() rather than the row alias of MySQL 8.0.19+, which older servers and MariaDB lack
+    return " ON DUPLICATE KEY UPDATE " + ', '.join(f"{column} = VALUES({column})" for column in update_columns)
+
+class BatchInserter:
+    """
+    Inserts rows with multi-row 'INSERT ... VALUES (...), (...)' statements.
+
+    Each statement holds at most max_batch_rows rows and is closed before the encoded
+    size of its rows exceeds max_batch_bytes, so large chunks never exceed the server's
+    max_allowed_packet while small files still go out in a single round-trip. Per-batch timings are logged at
+    DEBUG level and accumulated in stats().
+
+    With reject_row, a batch failing on the values of some of its rows is bisected: each
+    half is retried and the failing halves split again, until the offending rows are
+    isolated and handed to reject_row(row, reason). A few bad rows cost about
+    2 * log2(batch size) extra statements each. MySQL rolls back only the failed
+    statement, so the rows inserted so far stay in the open transaction.
+
+    With update_clause (from on_duplicate_key_update()) every statement upserts: rows
+    colliding with an existing record on a unique index update it instead of failing.
+    The affected-rows count MySQL reports (1 per new record, 2 per changed record, 0 per
+    unchanged one) is accumulated in stats() as 'affected_rows'.
+    """
+    def __init__(self, cursor, table_name, columns, max_batch_bytes, max_batch_rows=DEFAULT_MAX_BATCH_ROWS,
+                 reject_row=None, max_rejected_rows=None, update_clause=None):
+        self.cursor = cursor
+        self.table_name = table_name
+        self.columns = columns
+        self.max_batch_bytes = max_batch_bytes
+        self.max_batch_rows = max_batch_rows
+        self.reject_row = reject_row
+        self.max_rejected_rows = max_rejected_rows
+        self._prefix = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES "
+        self._row_placeholders = '(' + ', '.join(['%s'] * len(columns)) + ')'
+        self._suffix = update_clause or ''
+        self._statements = {} # Statement text by number of rows
+        self._stats = {
+            'batches': 0, 'rows': 0, 'seconds': 0.0, 'max_batch_seconds': 0.0, 'rejected_rows': 0, 'failed_batches': 0,
+            'affected_rows': 0
+        }
+
+    def statement_for(self, row_count):
+        """Returns the multi-row INSERT statement for row_count rows (cached)."""
+        statement = self._statements.get(row_count)
+        if statement is None:
+            statement = self._prefix + ', '.join([self._row_placeholders] * row_count) + self._suffix
+            self._statements[row_count] = statement
+        return statement
+
+    def iter_batches(self, rows):
+        """
+        Splits rows into batches within both limits. Every batch is measured before it is
+        sent, so wide rows (or multi-byte text) anywhere in the chunk shrink their batch.
+        A row too large for the byte budget goes in a batch of its own.
+
+        Yields:
+            list: The rows of the next batch.
+        """
+        budget = self.max_batch_bytes - len(self._prefix) - len(self._suffix)
+        start = 0
+        while start < len(rows):
+            end = min(start + self.max_batch_rows, len(rows))
+            while end - start > 1:
+                batch_bytes = batch_statement_bytes(rows[start:end], len(self.columns))
+                if batch_bytes <= budget:
+                    break
+                # Shrink in proportion to the excess; the wide rows may sit at either end
+                end = start + max(1, min(end - start - 1, (end - start) * budget // batch_bytes))
+            yield rows[start:end]
+            start = end
+
+    def execute_batch(self, batch):
+        """
+        Sends one multi-row INSERT for the given rows.
+
+        Args:
+            batch (list): Tuples of values, one per row.
+
+        Returns:
+            int: The number of rows inserted (or, when upserting, inserted or applied to
+                 an existing record).
+        """
+        params = list(itertools.chain.from_iterable(batch))
+        started = time.perf_counter()
+        self.cursor.execute(self.statement_for(len(batch)), params)
+        elapsed = time.perf_counter() - started
+
+        self._stats['batches'] += 1
+        self._stats['rows'] += len(batch)
+        self._stats['seconds'] += elapsed
+        self._stats['max_batch_seconds'] = max(self._stats['max_batch_seconds'], elapsed)
+        logger.debug("Inserted batch %s of %s rows into '%s' in %.4fs.", self._stats['batches'], len(batch), self.table_name, elapsed)
+        if self._suffix:
+            self._stats['affected_rows'] += self.cursor.rowcount
+            return len(batch) # An unchanged record counts 0 affected rows, but was applied
+        return self.cursor.rowcount
+
+    def insert(self, rows):
+        """
+        Inserts rows in packet-sized batches.
+
+        Args:
+            rows (list): Tuples of values, in the order of self.columns.
+
+        Returns:
+            int: The number of rows inserted.
+        """
+        inserted = 0
+        for batch in self.iter_batches(rows):
+            inserted += self.insert_batch(batch)
+        return inserted
+
+    def insert_batch(self, batch):
+        """
+        Sends one batch, isolating the rows MySQL rejects if reject_row is set.
+
+        Returns:
+            int: The number of rows inserted.
+
+        Raises:
+            mysql.connector.Error: For errors not caused by row values, or once more than
+                                   max_rejected_rows rows were rejected.
+        """
+        try:
+            return self.execute_batch(batch)
+        except Error as e:
+            if self.reject_row is None or e.errno not in ROW_DATA_ERRNOS:
+                raise
+            self._stats['failed_batches'] += 1
+            if len(batch) == 1:
+                self._reject(batch[0], e)
+                return 0
+            logger.debug("Batch of %s rows into '%s' failed (%s). Bisecting it to isolate the bad rows.", len(batch), self.table_name, e)
+            middle = len(batch) // 2
+            return self.insert_batch(batch[:middle]) + self.insert_batch(batch[middle:])
+
+    def _reject(self, row, error):
+        if self.max_rejected_rows is not None and self._stats['rejected_rows'] >= self.max_rejected_rows:
+            logger.error("More than %s rows were rejected by '%s'. Giving up on the file.", self.max_rejected_rows, self.table_name)
+            raise error
+        self._stats['rejected_rows'] += 1
+        self.reject_row(row, describe_error(error))
+
+    def stats(self):
+        """Returns the accumulated batch count, rows and timings as a dict."""
+        stats = dict(self._stats)
+        stats['avg_batch_seconds'] = stats['seconds'] / stats['batches'] if stats['batches'] else 0.0
+        return stats
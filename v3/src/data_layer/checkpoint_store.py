@@ -0,0 +1,147 @@
+# data_layer/checkpoint_store.py
+
+import hashlib
+import logging
+import os
+import threading
+
+from mysql.connector import Error
+
+from v3.src.data_layer.db_connection import pooled_connection
+
+# Set up logging for this module
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_TABLE = 'etl_ingest_checkpoints'
+
+# Checkpoint tables known to exist, so CREATE TABLE runs once per process
+_created_tables = set()
+_created_tables_lock = threading.Lock()
+
+def stat_file_key(file_path):
+    """
+    A cheap file identity from name, size and mtime, for when no content hash is available.
+
+    Returns:
+        str: A 64-character hex key.
+    """
+    stat = os.stat(file_path)
+    identity = f"{os.path.basename(file_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+def ensure_checkpoint_table(cursor, checkpoint_table=DEFAULT_CHECKPOINT_TABLE):
+    """
+    Creates the checkpoint table if needed. DDL commits implicitly in MySQL, so call this
+    before any rows are inserted on the connection.
+    """
+    with _created_tables_lock:
+        if checkpoint_table in _created_tables:
+            return
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {checkpoint_table} ("
+        "file_key CHAR(64) PRIMARY KEY, "
+        "file_name VARCHAR(255) NOT NULL, "
+        "table_name VARCHAR(64) NOT NULL, "
+        "byte_offset BIGINT NOT NULL, "
+        "rows_committed BIGINT NOT NULL, "
+        "chunks_committed INT NOT NULL, "
+        "completed BOOLEAN NOT NULL DEFAULT FALSE, "
+        "updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP)"
+    )
+    with _created_tables_lock:
+        _created_tables.add(checkpoint_table)
+
+class FileCheckpoint:
+    """
+    Durable progress of one file's chunked load.
+
+    The checkpoint row is written on the same connection and inside the same transaction
+    as the chunk it describes, so after a crash the committed rows and the recorded byte
+    offset always agree: a resumed load starts exactly after the last committed chunk.
+    """
+    def __init__(self, file_key, file_name, table_name, checkpoint_table=DEFAULT_CHECKPOINT_TABLE,
+                 byte_offset=0, rows_committed=0, chunks_committed=0, completed=False):
+        self.file_key = file_key
+        self.file_name = file_name
+        self.table_name = table_name
+        self.checkpoint_table = checkpoint_table
+        self.byte_offset = byte_offset
+        self.rows_committed = rows_committed
+        self.chunks_committed = chunks_committed
+        self.completed = completed
+
+    @classmethod
+    def load(cls, cursor, file_key, file_name, table_name, checkpoint_table=DEFAULT_CHECKPOINT_TABLE):
+        """
+        Reads the checkpoint of a file, or starts a new one at offset 0.
+
+        Returns:
+            FileCheckpoint: The stored progress ('byte_offset' 0 if the file is new).
+        """
+        ensure_checkpoint_table(cursor, checkpoint_table)
+        cursor.execute(
+            f"SELECT byte_offset, rows_committed, chunks_committed, completed FROM {checkpoint_table} WHERE file_key = %s",
+            (file_key,)
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return cls(file_key, file_name, table_name, checkpoint_table)
+        byte_offset, rows_committed, chunks_committed, completed = row
+        return cls(file_key, file_name, table_name, checkpoint_table,
+                   int(byte_offset), int(rows_committed), int(chunks_committed), bool(completed))
+
+    @property
+    def is_resume(self):
+        """True if earlier chunks of this file were already committed."""
+        return self.chunks_committed > 0
+
+    def _write(self, cursor):
+        cursor.execute(
+            f"INSERT INTO {self.checkpoint_table} "
+            "(file_key, file_name, table_name, byte_offset, rows_committed, chunks_committed, completed) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE byte_offset = VALUES(byte_offset), rows_committed = VALUES(rows_committed), "
+            "chunks_committed = VALUES(chunks_committed), completed = VALUES(completed)",
+            (self.file_key, self.file_name, self.table_name, self.byte_offset,
+             self.rows_committed, self.chunks_committed, self.completed)
+        )
+
+    def advance(self, cursor, end_offset, rows):
+        """
+        Records a chunk in the open transaction; it becomes durable with the chunk's commit.
+
+        Args:
+            cursor: A cursor on the connection that inserted the chunk.
+            end_offset (int): Byte offset just after the chunk.
+            rows (int): Rows inserted from the chunk.
+        """
+        self.byte_offset = end_offset
+        self.rows_committed += rows
+        self.chunks_committed += 1
+        self._write(cursor)
+
+    def complete(self, cursor):
+        """Marks the file as fully loaded in the open transaction."""
+        self.completed = True
+        self._write(cursor)
+
+def clear_checkpoint(mysql_config, file_key, checkpoint_table=DEFAULT_CHECKPOINT_TABLE):
+    """
+    Deletes a file's checkpoint once the file has been archived. Failures are only logged:
+    a leftover completed checkpoint merely makes a re-run skip the file.
+    """
+    with pooled_connection(mysql_config) as connection:
+        if connection is None:
+            return False
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            cursor.execute(f"DELETE FROM {checkpoint_table} WHERE file_key = %s", (file_key,))
+            connection.commit()
+            return True
+        except Error as e:
+            logger.warning("Could not clear checkpoint %s: %s", file_key[:12], e)
+            return False
+        finally:
+            if cursor:
+                cursor.close()
@@ -0,0 +1,110 @@
+# data_layer/chunk_reader.py
+
+import io
+
+# Bytes read from the file per read() call
+READ_BLOCK_BYTES = 1024 * 1024
+
+def read_header(stream):
+    """
+    Reads the header record of a CSV stream, including any quoted line breaks in it.
+
+    Args:
+        stream: A binary file object positioned at the start of the file.
+
+    Returns:
+        bytes: The header record with its line terminator ('' for an empty file).
+    """
+    header = stream.readline()
+    while header and header.count(b'"') % 2:
+        line = stream.readline()
+        if not line:
+            break
+        header += line
+    return header
+
+def _record_boundary(buffer, limit):
+    """
+    Finds the end of the last complete record in buffer[:limit]; buffer starts on a
+    record boundary.
+
+    A newline ends a record only if it is outside quotes, i.e. the number of quote
+    characters before it is even ('""' escapes count twice and cancel out).
+
+    Returns:
+        int or None: The index just past the record's newline, or None if that part of
+                     the buffer holds no complete record.
+    """
+    position = buffer.rfind(b'\n', 0, limit)
+    while position != -1:
+        if buffer.count(b'"', 0, position) % 2 == 0:
+            return position + 1
+        position = buffer.rfind(b'\n', 0, position)
+    return None
+
+def iter_csv_byte_chunks(stream, target_bytes, offset):
+    """
+    Splits the data records of a CSV stream into chunks of roughly target_bytes that
+    always end on a record boundary.
+
+    Args:
+        stream: A binary file object positioned at offset, just after the header or at
+                the end of a previously returned chunk.
+        target_bytes (int): The approximate size of each chunk.
+        offset (int): The byte position of stream in the (uncompressed) file.
+
+    Yields:
+        tuple: (chunk_bytes, end_offset), where end_offset is the position just after
+               the chunk; a later read can resume from it.
+    """
+    buffer = b''
+    at_eof = False
+    while True:
+        while not at_eof and len(buffer) < target_bytes:
+            block = stream.read(READ_BLOCK_BYTES)
+            if block:
+                buffer += block
+            else:
+                at_eof = True
+        if not buffer:
+            return
+
+        cut = None
+        if len(buffer) > target_bytes:
+            # Prefer the last record ending within the target, else the first one after it
+            cut = _record_boundary(buffer, target_bytes) or _record_boundary(buffer, len(buffer))
+        if cut is None:
+            if not at_eof:
+                # A single record larger than the buffer: read more of it
+                target_bytes = len(buffer) + READ_BLOCK_BYTES
+                continue
+            # End of file: whatever is left is the last chunk
+            cut = len(buffer)
+
+        yield buffer[:cut], offset + cut
+        offset += cut
+        buffer = buffer[cut:]
+
+def skip_bytes(stream, count):
+    """
+    Moves a stream forward by count bytes, seeking when possible and otherwise reading
+    and discarding (e.g. for decompression streams). The skipped bytes are not parsed.
+    """
+    if stream.seekable():
+        stream.seek(count, io.SEEK_CUR)
+        return
+    while count > 0:
+        block = stream.read(min(READ_BLOCK_BYTES, count))
+        if not block:
+            break
+        count -= len(block)
+
+def estimate_target_bytes(stream, header, rows_per_chunk):
+    """
+    Estimates how many bytes hold rows_per_chunk records from the average header/record
+    length at the start of the stream, without moving the stream.
+    """
+    sample = stream.peek(READ_BLOCK_BYTES)[:READ_BLOCK_BYTES] if hasattr(stream, 'peek') else b''
+    lines = sample.count(b'\n')
+    average = len(sample) / lines if lines else max(len(header), 1)
+    return max(int(average * rows_per_chunk), 1)
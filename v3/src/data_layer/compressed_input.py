@@ -0,0 +1,81 @@
+# data_layer/compressed_input.py
+
+import bz2
+import gzip
+import io
+import lzma
+
+# Set by _import_zstandard() when the first .csv.zst file is read
+zstandard = None
+
+# File name suffixes of the CSV files picked up from the dropbox, and their compression
+CSV_COMPRESSIONS = {
+    '.csv': None,
+    '.csv.gz': 'gzip',
+    '.csv.bz2': 'bz2',
+    '.csv.xz': 'xz',
+    '.csv.zst': 'zstd',
+}
+
+def _import_zstandard():
+    """Imports zstandard on first use. Raises ImportError without it."""
+    global zstandard
+    if zstandard is None:
+        import zstandard as zstandard_module
+        zstandard = zstandard_module
+    return zstandard
+
+def csv_compression(file_path):
+    """
+    Returns the compression of a CSV file from its name.
+
+    Returns:
+        str or None: 'gzip', 'bz2', 'xz' or 'zstd', or None for a plain CSV file (or a
+                     name without a known suffix, which is read as plain text).
+    """
+    for suffix, compression in CSV_COMPRESSIONS.items():
+        if compression is not None and file_path.endswith(suffix):
+            return compression
+    return None
+
+def is_csv_file(file_path):
+    """True if the file name is a plain or compressed CSV file the processor accepts."""
+    return file_path.endswith(tuple(CSV_COMPRESSIONS))
+
+def compression_unavailable(file_path):
+    """
+    Returns why a CSV file cannot be decompressed here, or None if it can.
+
+    Returns:
+        str or None: An error message, e.g. when the optional zstandard package is missing.
+    """
+    if csv_compression(file_path) == 'zstd':
+        try:
+            _import_zstandard()
+        except ImportError: # Optional dependency, only needed for .csv.zst files
+            return "reading .csv.zst files requires the 'zstandard' package (pip install zstandard)"
+    return None
+
+def open_csv_stream(file_path):
+    """
+    Opens a plain or compressed CSV file for reading as a stream of uncompressed bytes.
+    Nothing is decompressed to disk; the data is decompressed as it is read.
+
+    Returns:
+        A binary file object with read(), readline() and peek().
+    """
+    compression = csv_compression(file_path)
+    if compression == 'gzip':
+        return gzip.open(file_path, 'rb')
+    if compression == 'bz2':
+        return bz2.open(file_path, 'rb')
+    if compression == 'xz':
+        return lzma.open(file_path, 'rb')
+    if compression == 'zstd':
+        unavailable = compression_unavailable(file_path)
+        if unavailable:
+            raise ImportError(unavailable)
+        raw = open(file_path, 'rb')
+        # Files written by parallel compressors hold several frames; read them all
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True))
+    return open(file_path, 'rb')
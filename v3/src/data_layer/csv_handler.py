@@ -1,36 +1,61 @@
 import logging
-import os
-import time
-from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
-from v2.src.business_layer.processor_service import process_single_csv_file
+from v3.src.business_layer.ingest_queue import IngestQueue
+from v3.src.data_layer.csv_processor import is_input_file
+
+def observer_reports_close_events(observer):
+    """True if the watchdog observer reports files being closed after writing (inotify)."""
+    try:
+        from watchdog.observers.inotify import InotifyObserver
+    except (ImportError, OSError):
+        return False
+    return isinstance(observer, InotifyObserver)
 
 class CSVHandler(FileSystemEventHandler):
     """
-    Custom event handler for watchdog to process CSV file system events.
+    Custom event handler for watchdog to process CSV file system events, for plain
+    and compressed (.csv.gz, .csv.bz2, .csv.xz, .csv.zst) CSV files and for Parquet and
+    Arrow IPC files.
+
+    The handler runs on watchdog's observer thread, so it only hands the file path to
+    an IngestQueue; waiting for the file to be completely written runs on the queue's
+    readiness monitor, and routing to a table and the ingest itself on its worker
+    threads. Close-write events (where the platform reports them) and renames into the
+    folder tell the queue that a file is complete.
     """
-    def __init__(self, table_name):
+    def __init__(self, ingest_queue=None):
         super().__init__()
         self.logger = logging.getLogger(__name__)
-        self.table_name = table_name
+        if ingest_queue is None:
+            ingest_queue = IngestQueue()
+            ingest_queue.start()
+        self.ingest_queue = ingest_queue
 
     def on_created(self, event):
         """Called when a file or directory is created."""
-        if not event.is_directory and event.src_path.endswith('.csv'):
-            self.logger.info(f"Watchdog detected new CSV file created: {event.src_path}")
-            # Add a small delay to ensure the file is fully written
-            time.sleep(0.5) # Wait for 500 milliseconds
-            process_single_csv_file(event.src_path, self.table_name)
+        if not event.is_directory and is_input_file(event.src_path):
+            self.logger.info("Watchdog detected new CSV file created: %s", event.src_path)
+            self.ingest_queue.submit(event.src_path)
 
     def on_modified(self, event):
         """Called when a file or directory is modified."""
-        # This can sometimes trigger for files being written.
-        # We might want to add a small delay or a check to ensure the file is fully written.
-        if not event.is_directory and event.src_path.endswith('.csv'):
-            self.logger.info(f"Watchdog detected CSV file modified: {event.src_path}")
-            # Add a small delay to ensure the file is fully written
-            time.sleep(0.5) # Wait for 500 milliseconds
-            # Only process if the file still exists and hasn't been moved by a previous event
-            if os.path.exists(event.src_path):
-                process_single_csv_file(event.src_path, self.table_name)
\ No newline at end of file
+        # This can trigger several times while a file is being written; the queue
+        # ignores paths that are already queued or being processed.
+        if not event.is_directory and is_input_file(event.src_path):
+            self.logger.debug("Watchdog detected CSV file modified: %s", event.src_path)
+            self.ingest_queue.submit(event.src_path, written=True)
+
+    def on_closed(self, event):
+        """Called when a file opened for writing is closed."""
+        if not event.is_directory and is_input_file(event.src_path):
+            self.logger.debug("Watchdog detected CSV file closed after writing: %s", event.src_path)
+            self.ingest_queue.submit(event.src_path, closed=True)
+
+    def on_moved(self, event):
+        """Called when a file or directory is renamed."""
+        # Writers that upload to a temporary name and rename when done (e.g. 'x.csv.part'
+        # to 'x.csv') leave a complete file under the new name
+        if not event.is_directory and is_input_file(event.dest_path):
+            self.logger.info("Watchdog detected CSV file moved into place: %s", event.dest_path)
+            self.ingest_queue.submit(event.dest_path, closed=True)
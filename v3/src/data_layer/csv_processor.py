@@ -1,106 +1,773 @@
 # data_layer/csv_processor.py
 
+import functools
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
 import pandas as pd
-import mysql.connector
 from mysql.connector import Error
 import logging
 
+from v3.src.data_layer.arrow_reader import (
+    arrow_parse_errors, arrow_to_rows, arrow_unavailable, columnar_column_names, csv_convert_options,
+    is_arrow_data, is_columnar_file, iter_columnar_batches, parse_csv_bytes
+)
+from v3.src.data_layer.batch_inserter import (
+    BatchInserter, DEFAULT_MAX_BATCH_ROWS, DEFAULT_PACKET_FILL_RATIO, get_max_allowed_packet, on_duplicate_key_update,
+    upsert_update_columns
+)
+from v3.src.data_layer.checkpoint_store import DEFAULT_CHECKPOINT_TABLE, FileCheckpoint
+from v3.src.data_layer.compressed_input import compression_unavailable, is_csv_file, open_csv_stream
+from v3.src.data_layer.dead_letter import DeadLetterFile, dead_letter_path
+from v3.src.data_layer.chunk_reader import estimate_target_bytes, iter_csv_byte_chunks, read_header, skip_bytes
+from v3.src.data_layer.db_connection import pooled_connection
+from v3.src.data_layer.pipeline import DEFAULT_QUEUE_DEPTH, Pipeline
+from v3.src.data_layer.row_converter import dataframe_to_rows
+from v3.src.data_layer.staging_loader import (
+    STAGING_CLEANUP_DROP, cleanup_staging_table, create_staging_table, merge_staging_table, staging_table_name
+)
+from v3.src.data_layer.insert_plan import get_insert_plan
+from v3.src.data_layer.table_schema import (
+    DEFAULT_SCHEMA_CACHE_TTL_SECONDS, find_unique_key, get_unique_keys, invalidate_table_schema
+)
+from v3.src.utils.profiling import record_allocations
+
 # Set up logging for this module
 logger = logging.getLogger(__name__)
 
-def get_db_connection(mysql_config):
+# Transaction boundaries supported by process_csv_and_insert_into_mysql
+COMMIT_PER_FILE = 'file'
+COMMIT_PER_CHUNK = 'chunk'
+
+# Where the rows of a file are written
+LOAD_DIRECT = 'direct'   # straight into the target table
+LOAD_STAGING = 'staging' # into an unindexed staging table, then merged into the target
+
+# How rows are written into the target
+WRITE_INSERT = 'insert' # every row becomes a new record
+WRITE_UPSERT = 'upsert' # rows matching a record on the table's natural key update it
+
+# Parsers that can read CSV files
+PARSER_PANDAS = 'pandas' # pandas' C engine, single threaded
+PARSER_ARROW = 'arrow'   # Arrow's multithreaded CSV reader (needs pyarrow)
+
+# Engines that can write the parsed rows into MySQL
+ENGINE_EXECUTEMANY = 'executemany'
+ENGINE_LOAD_DATA = 'load_data'
+
+DEFAULT_CHUNK_SIZE = 50000
+
+# MySQL error codes meaning LOAD DATA LOCAL INFILE is disabled on the client or server
+LOCAL_INFILE_DISABLED_ERRNOS = (1148, 2068, 3948)
+
+# MySQL error codes suggesting the cached table schema is out of date
+# (unknown column, unknown table, column count mismatch)
+SCHEMA_CHANGED_ERRNOS = (1054, 1146, 1136)
+
+# Escapes for MySQL's default LOAD DATA text format (tab separated, backslash escaped)
+_LOAD_DATA_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+    '\0': '\\0',
+})
+
+def format_load_data_value(value):
     """
-    Establishes and returns a MySQL database connection.
-    This is duplicated from read_data.py for self-containment, but in a larger
-    application, a single utility function for connection would be better.
+    Formats a single value for MySQL's default LOAD DATA text format.
 
     Args:
-        mysql_config (dict): A dictionary containing MySQL connection parameters.
+        value: The value to format.
 
     Returns:
-        mysql.connector.connection.MySQLConnection or None: The connection object if successful, else None.
+        str: The escaped field, or '\\N' for NULL/NaN values.
+    """
+    if value is None or value != value: # NaN is the only value not equal to itself
+        return '\\N'
+    if isinstance(value, (bool, np.bool_)):
+        return '1' if value else '0'
+    return str(value).translate(_LOAD_DATA_ESCAPES)
+
+def load_data_local_infile(cursor, table_name, columns, rows):
     """
+    Writes rows into a MySQL table with LOAD DATA LOCAL INFILE.
+
+    The rows are streamed into a temporary tab-separated file in MySQL's default
+    LOAD DATA format, which is loaded and then removed. Only one chunk is ever
+    written at a time, so the file stays as small as the chunk.
+
+    Args:
+        cursor (mysql.connector.cursor.MySQLCursor): Cursor of a connection opened
+                                                     with allow_local_infile=True.
+        table_name (str): The name of the table to insert data into.
+        columns (list): The column names, in the order of the values in each row.
+        rows (iterable): Tuples of values to load.
+
+    Returns:
+        int: The number of rows loaded.
+    """
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', newline='', suffix='.tsv', delete=False) as data_file:
+        temp_path = data_file.name
+        for row in rows:
+            data_file.write('\t'.join(format_load_data_value(value) for value in row))
+            data_file.write('\n')
     try:
-        connection = mysql.connector.connect(
-            host=mysql_config['host'],
-            database=mysql_config['database'],
-            user=mysql_config['user'],
-            password=mysql_config['password']
+        # MySQL expects forward slashes and escaped quotes inside the file name literal
+        file_literal = temp_path.replace('\\', '/').replace("'", "\\'")
+        column_names_sql = ', '.join(columns)
+        cursor.execute(
+            f"LOAD DATA LOCAL INFILE '{file_literal}' INTO TABLE {table_name} "
+            f"CHARACTER SET utf8mb4 ({column_names_sql})"
         )
-        if connection.is_connected():
-            logger.info(f"Successfully connected to MySQL Server version {connection.get_server_info()}")
-            return connection
+        return cursor.rowcount
+    finally:
+        os.remove(temp_path)
+
+def new_ingest_stats():
+    """
+    Returns an empty per-file stats dict, filled in by process_csv_and_insert_into_mysql.
+
+    'rows' counts the rows inserted and 'rejected_rows' those written to the dead-letter
+    file instead. Stage timings are wall-clock seconds: 'parse_seconds' (reading and parsing chunks),
+    'convert_seconds' (DataFrame to rows), 'insert_seconds' (sending rows to MySQL),
+    'merge_seconds' (staging table to target, LOAD_STAGING only) and 'commit_seconds'. With the 'pipeline' option the stages overlap, so they can add
+    up to more than the elapsed time, and 'pipeline' receives the per-stage utilization
+    from Pipeline.stats().
+    """
+    return {
+        'rows': 0,
+        'rejected_rows': 0,
+        'chunks': 0,
+        'parse_seconds': 0.0,
+        'convert_seconds': 0.0,
+        'insert_seconds': 0.0,
+        'merge_seconds': 0.0,
+        'commit_seconds': 0.0
+    }
+
+def timed_iter(iterable, stats, key):
+    """Yields the items of iterable, adding the time spent producing each one to stats[key]."""
+    iterator = iter(iterable)
+    while True:
+        started = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            stats[key] += time.perf_counter() - started
+            return
+        stats[key] += time.perf_counter() - started
+        yield item
+
+def csv_parse_errors():
+    """The exceptions raised for malformed CSV input by either parser. Called when an
+    exception is matched, so it only includes Arrow's once pyarrow has been imported."""
+    return (pd.errors.ParserError,) + arrow_parse_errors()
+
+def is_input_file(file_path):
+    """True if the file is a (compressed) CSV, Parquet or Arrow IPC file this module can load."""
+    return is_csv_file(file_path) or is_columnar_file(file_path)
+
+def iter_chunks(file_path, chunk_size, read_csv_options, start_offset=None, parser=PARSER_PANDAS):
+    """
+    Parses a CSV file lazily, one chunk at a time.
+
+    Without start_offset, pandas' own chunked reader is used. With start_offset, the raw
+    file is split into chunks that end on record boundaries and each chunk's end byte
+    offset is reported, so a checkpointed load can later resume right after any chunk;
+    the bytes before start_offset are skipped without being parsed. Compressed files are
+    decompressed as a stream either way; their offsets count uncompressed bytes, so a
+    resume decompresses (but does not parse) the part already loaded.
+
+    PARSER_ARROW always reads record-aligned byte chunks and parses each with Arrow's
+    multithreaded reader, yielding pyarrow Tables instead of DataFrames.
+
+    Args:
+        file_path (str): The full path to the CSV file.
+        chunk_size (int): Approximate number of rows per chunk.
+        read_csv_options (dict): Extra keyword arguments for pandas.read_csv.
+        start_offset (int, optional): Byte offset to resume from (0 for the first record).
+        parser (str): PARSER_PANDAS or PARSER_ARROW.
+
+    Yields:
+        tuple: (DataFrame or pyarrow.Table, end_offset); end_offset is None without
+               start_offset, unless the Arrow parser is used.
+    """
+    if parser == PARSER_ARROW:
+        convert_options = csv_convert_options(read_csv_options)
+        parse = lambda data: parse_csv_bytes(data, convert_options)
+        start_offset = start_offset or 0
+    else:
+        parse = lambda data: pd.read_csv(io.BytesIO(data), **read_csv_options)
+
+    if start_offset is None:
+        with pd.read_csv(file_path, chunksize=chunk_size, **read_csv_options) as reader:
+            for chunk in reader:
+                yield chunk, None
+        return
+
+    with open_csv_stream(file_path) as stream:
+        header = read_header(stream)
+        if not header:
+            return
+        offset = len(header)
+        if start_offset > offset:
+            skip_bytes(stream, start_offset - offset)
+            offset = start_offset
+        target_bytes = estimate_target_bytes(stream, header, chunk_size)
+        for chunk_bytes, end_offset in iter_csv_byte_chunks(stream, target_bytes, offset):
+            yield parse(header + chunk_bytes), end_offset
+
+def iter_columnar_chunks(file_path, chunk_size, read_csv_options):
+    """Reads a Parquet or Arrow IPC file as (pyarrow.RecordBatch, None) chunks, like iter_chunks()."""
+    for batch in iter_columnar_batches(file_path, chunk_size, read_csv_options.get('usecols')):
+        yield batch, None
+
+def prepend(first, rest):
+    """Yields first, then the items of rest; closing the generator also closes rest."""
+    yield first
+    yield from rest
+
+def insert_columns(chunk):
+    """The columns of a parsed chunk (DataFrame or Arrow data) that are written to MySQL."""
+    names = chunk.schema.names if is_arrow_data(chunk) else chunk.columns
+    # Assuming CSV column names match database column names exactly
+    # Exclude 'id' column as it's AUTO_INCREMENT
+    return [col for col in names if col != 'id']
+
+def convert_chunk(item, stats):
+    """
+    Converts a parsed chunk to the columns and row tuples that are sent to MySQL.
+
+    Args:
+        item (tuple): (DataFrame or Arrow data, end_offset) from iter_chunks().
+        stats (dict): A dict from new_ingest_stats() receiving the conversion time.
+
+    Returns:
+        tuple: (columns, rows, end_offset).
+    """
+    chunk, end_offset = item
+    started = time.perf_counter()
+    columns = insert_columns(chunk)
+    # Convert the chunk column-wise to tuples of native Python values
+    rows = arrow_to_rows(chunk, columns) if is_arrow_data(chunk) else dataframe_to_rows(chunk, columns)
+    stats['convert_seconds'] += time.perf_counter() - started
+    return columns, rows, end_offset
+
+def insert_chunks_pipelined(connection, chunks, file_path, table_name, options, stats, checkpoint=None, before_commit=None):
+    """
+    Runs insert_chunks() with parsing and row conversion in their own threads.
+
+    The parser, converter and inserter (the calling thread, which owns the connection)
+    are joined by bounded queues of 'parse_queue_depth' and 'convert_queue_depth' chunks,
+    so the next chunks are parsed and converted while MySQL is busy with the current one.
+    Chunks stay in file order, so commits and checkpoints behave as in insert_chunks().
+
+    Args:
+        connection (mysql.connector.connection.MySQLConnection): An open (pooled) connection.
+        chunks (iterable): (DataFrame, end_offset) pairs from iter_chunks(); iterating it
+                           is the parser stage's work.
+        file_path (str): The CSV file the chunks come from, used for logging.
+        table_name (str): The name of the table to insert data into.
+        options (dict): Validated ingest options, see insert_chunks().
+        stats (dict): A dict from new_ingest_stats(); 'pipeline' receives the stage utilization.
+        checkpoint (FileCheckpoint, optional): See insert_chunks().
+        before_commit (callable, optional): See insert_chunks().
+
+    Returns:
+        bool: True if every chunk was inserted and committed, False otherwise.
+    """
+    pipeline = Pipeline(chunks, [
+        ('parse', None, options.get('parse_queue_depth', DEFAULT_QUEUE_DEPTH)),
+        ('convert', functools.partial(convert_chunk, stats=stats), options.get('convert_queue_depth', DEFAULT_QUEUE_DEPTH))
+    ], consumer_name='insert')
+    with pipeline:
+        success = insert_chunks(connection, pipeline, file_path, table_name, options, stats, checkpoint, before_commit)
+    stats['pipeline'] = pipeline.stats()
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Pipeline utilization for '%s': %s.",
+            file_path, ", ".join(f"{name} {stage['utilization']:.0%}" for name, stage in stats['pipeline'].items())
+        )
+    return success
+
+def insert_chunks(connection, chunks, file_path, table_name, options, stats=None, checkpoint=None, before_commit=None):
+    """
+    Inserts an iterable of converted chunks into a MySQL table over one connection.
+
+    With COMMIT_PER_FILE every chunk is part of a single transaction which is committed
+    after the last chunk; with COMMIT_PER_CHUNK each chunk is committed as soon as it is
+    inserted, together with the file's checkpoint (if any) so that an interrupted load
+    can resume after the last committed chunk. ENGINE_EXECUTEMANY sends multi-row INSERT statements sized to fit the
+    server's max_allowed_packet. If ENGINE_LOAD_DATA is requested but LOAD DATA LOCAL
+    INFILE turns out to be disabled, the remaining chunks fall back to ENGINE_EXECUTEMANY.
+    With 'isolate_bad_rows', rows MySQL rejects for their values are bisected out of
+    their batch and written to the file's dead-letter CSV in 'dead_letter_dir', and the
+    other rows are committed as usual (ENGINE_EXECUTEMANY only). With 'write_mode'
+    WRITE_UPSERT, every INSERT batch carries an ON DUPLICATE KEY UPDATE clause, so rows
+    whose 'natural_key' matches an existing record update its 'update_columns'.
+    The connection is left open for the caller to return to the pool.
+
+    Args:
+        connection (mysql.connector.connection.MySQLConnection): An open (pooled) connection.
+        chunks (iterable): (columns, rows, end_offset) tuples from convert_chunk().
+        file_path (str): The CSV file the chunks come from, used for logging.
+        table_name (str): The name of the table to insert data into.
+        options (dict): Validated ingest options ('commit_mode', 'engine',
+                        'max_batch_rows', 'max_batch_bytes', 'isolate_bad_rows',
+                        'dead_letter_dir', 'max_rejected_rows', 'write_mode',
+                        'natural_key', 'update_columns').
+        stats (dict, optional): A dict from new_ingest_stats() to accumulate row counts
+                                and convert/insert/commit timings into.
+        checkpoint (FileCheckpoint, optional): Progress record advanced with every chunk
+                                               commit and completed with the last one.
+        before_commit (callable, optional): Called with the cursor after the last chunk,
+                                            inside the final transaction (e.g. to merge a
+                                            staging table into the target).
+
+    Returns:
+        bool: True if every chunk was inserted and committed, False otherwise.
+    """
+    if stats is None:
+        stats = new_ingest_stats()
+    commit_mode = options['commit_mode']
+    engine = options['engine']
+    cursor = connection.cursor()
+    success = False
+    total_inserted = 0
+    committed_rows = 0
+    chunk_count = 0
+    batch_inserter = None
+    dead_letter = None
+    try:
+        columns = None
+        for chunk_columns, data_to_insert, end_offset in chunks:
+            if columns is None:
+                columns = chunk_columns
+                if options.get('isolate_bad_rows', False):
+                    dead_letter = DeadLetterFile(dead_letter_path(options['dead_letter_dir'], file_path), columns)
+            record_allocations() # Converted rows are held in memory here
+
+            started = time.perf_counter()
+            inserted = None if data_to_insert else 0
+            if inserted is None and engine == ENGINE_LOAD_DATA:
+                try:
+                    inserted = load_data_local_infile(cursor, table_name, columns, data_to_insert)
+                except Error as e:
+                    if e.errno not in LOCAL_INFILE_DISABLED_ERRNOS:
+                        raise
+                    logger.warning("LOAD DATA LOCAL INFILE is not available (%s). Falling back to '%s' for '%s'.", e, ENGINE_EXECUTEMANY, file_path)
+                    engine = ENGINE_EXECUTEMANY
+            if inserted is None:
+                if batch_inserter is None:
+                    batch_inserter = create_batch_inserter(cursor, table_name, columns, options, dead_letter)
+                inserted = batch_inserter.insert(data_to_insert)
+            stats['insert_seconds'] += time.perf_counter() - started
+            total_inserted += inserted
+            chunk_count += 1
+            stats['rows'] += inserted
+            stats['chunks'] += 1
+
+            if commit_mode == COMMIT_PER_CHUNK:
+                started = time.perf_counter()
+                if checkpoint is not None:
+                    checkpoint.advance(cursor, end_offset, inserted)
+                connection.commit()
+                if dead_letter is not None:
+                    dead_letter.commit()
+                stats['commit_seconds'] += time.perf_counter() - started
+                committed_rows = total_inserted
+                logger.info("Committed chunk %s (%s records) from '%s'.", chunk_count, inserted, file_path)
+            else:
+                logger.debug("Inserted chunk %s (%s records) from '%s'.", chunk_count, inserted, file_path)
+
+        if before_commit is not None:
+            before_commit(cursor)
+        started = time.perf_counter()
+        if checkpoint is not None:
+            checkpoint.complete(cursor)
+        connection.commit() # Commit the transaction
+        if dead_letter is not None:
+            dead_letter.commit()
+        stats['commit_seconds'] += time.perf_counter() - started
+        logger.info("Successfully inserted %s records from '%s' into '%s' in %s chunk(s).", total_inserted, file_path, table_name, chunk_count)
+        if dead_letter is not None and dead_letter.rows_written:
+            logger.warning("%s records from '%s' were rejected by '%s' and written to '%s'.", dead_letter.rows_written, file_path, table_name, dead_letter.path)
+        if checkpoint is not None and checkpoint.rows_committed > total_inserted:
+            logger.info("'%s' is complete with %s records including earlier runs.", file_path, checkpoint.rows_committed)
+        logger.info(
+            "Stage times for '%s': parse %.3fs, convert %.3fs, insert %.3fs, commit %.3fs.",
+            file_path, stats['parse_seconds'], stats['convert_seconds'], stats['insert_seconds'], stats['commit_seconds']
+        )
+        if batch_inserter is not None:
+            batch_stats = batch_inserter.stats()
+            logger.info(
+                "INSERT batches for '%s': %s batches, avg %.4fs, max %.4fs, total %.3fs.",
+                file_path, batch_stats['batches'], batch_stats['avg_batch_seconds'], batch_stats['max_batch_seconds'], batch_stats['seconds']
+            )
+            if options.get('write_mode') == WRITE_UPSERT:
+                logger.info(
+                    "Upserted %s records from '%s' on %s: %s rows affected (1 per new record, 2 per changed one).",
+                    total_inserted, file_path, options['natural_key'], batch_stats['affected_rows']
+                )
+        success = True
+
     except Error as e:
-        logger.error(f"Error while connecting to MySQL: {e}")
-    return None
+        connection.rollback() # Rollback on error
+        logger.error("Error inserting data from '%s' into '%s': %s", file_path, table_name, e)
+        if e.errno in SCHEMA_CHANGED_ERRNOS:
+            invalidate_table_schema(table_name)
+        if committed_rows and checkpoint is not None:
+            logger.warning("%s records from '%s' were already committed before the failure; the next run resumes after them.", committed_rows, file_path)
+        elif committed_rows:
+            logger.warning("%s records from '%s' were already committed before the failure.", committed_rows, file_path)
+    except Exception:
+        # Parsing errors surface while iterating the chunks; undo the open transaction
+        # and let the caller report them.
+        connection.rollback()
+        raise
+    finally:
+        if dead_letter is not None:
+            dead_letter.discard() # Rows rejected in a rolled back transaction, if any
+            stats['rejected_rows'] += dead_letter.rows_written
+        if cursor:
+            cursor.close()
+            logger.debug("MySQL cursor closed.")
+    return success
+
+def create_batch_inserter(cursor, table_name, columns, options, dead_letter=None):
+    """
+    Creates a BatchInserter whose byte budget is derived from the server's max_allowed_packet.
+
+    An explicit 'max_batch_bytes' in the options lowers the budget further; it can never
+    exceed what the server accepts. With an 'insert_plan' in the options, the server
+    setting is only read for the plan's first file. Rows rejected for their values go
+    to dead_letter (a DeadLetterFile), if given. With 'write_mode' WRITE_UPSERT the
+    inserter upserts on the 'natural_key'.
+    """
+    plan = options.get('insert_plan')
+    max_allowed_packet = plan.get_max_allowed_packet(cursor) if plan is not None else get_max_allowed_packet(cursor)
+    max_batch_bytes = int(max_allowed_packet * options.get('packet_fill_ratio', DEFAULT_PACKET_FILL_RATIO))
+    if options.get('max_batch_bytes'):
+        max_batch_bytes = min(max_batch_bytes, options['max_batch_bytes'])
+    max_batch_rows = options.get('max_batch_rows', DEFAULT_MAX_BATCH_ROWS)
+    logger.debug("Batching INSERTs into '%s' at up to %s rows / %s bytes (max_allowed_packet %s).", table_name, max_batch_rows, max_batch_bytes, max_allowed_packet)
+    reject_row = dead_letter.write if dead_letter is not None else None
+    return BatchInserter(
+        cursor, table_name, columns, max_batch_bytes, max_batch_rows, reject_row, options.get('max_rejected_rows'),
+        upsert_clause(columns, options)
+    )
+
+def upsert_clause(columns, options):
+    """The ON DUPLICATE KEY UPDATE clause for loading these columns with 'write_mode' WRITE_UPSERT, else None."""
+    if options.get('write_mode', WRITE_INSERT) != WRITE_UPSERT:
+        return None
+    natural_key = options['natural_key']
+    return on_duplicate_key_update(upsert_update_columns(columns, natural_key, options.get('update_columns')), natural_key)
+
+def check_natural_key(file_path, mysql_config, table_name, header, options):
+    """
+    Checks that an upsert into a table can find the records it should update.
+
+    ON DUPLICATE KEY UPDATE only fires on a unique index, so without one on exactly the
+    'natural_key' columns every corrected row would be inserted again as a duplicate.
+    A file that lacks some of the key columns cannot match existing records either, so
+    it is refused as well.
+
+    Args:
+        file_path (str): The file about to be loaded, used for logging.
+        mysql_config (dict): A dictionary containing MySQL connection parameters.
+        table_name (str): The target table.
+        header (list): The column names of the file.
+        options (dict): Ingest options ('natural_key', 'schema_cache_ttl_seconds').
+
+    Returns:
+        bool: True if the file has the natural key columns and the table a unique index
+              on them, False otherwise.
+    """
+    natural_key = options['natural_key']
+    missing = [column for column in natural_key if column not in header]
+    if missing:
+        logger.error("'%s' lacks the natural key columns %s of '%s', so its rows cannot be upserted.", file_path, missing, table_name)
+        return False
+    unique_keys = get_unique_keys(mysql_config, table_name, options.get('schema_cache_ttl_seconds', DEFAULT_SCHEMA_CACHE_TTL_SECONDS))
+    if unique_keys is None:
+        return False
+    if find_unique_key(unique_keys, natural_key) is None:
+        logger.error(
+            "Table '%s' has no unique index on its natural key %s, so '%s' cannot be upserted. Create one (see sql.txt).",
+            table_name, natural_key, file_path
+        )
+        return False
+    return True
+
+def read_column_names(file_path):
+    """The column names of an input file: the CSV header record, or the columnar file's schema."""
+    if is_columnar_file(file_path):
+        return columnar_column_names(file_path)
+    return list(pd.read_csv(file_path, nrows=0).columns)
+
+def resolve_insert_plan(file_path, mysql_config, table_name, options):
+    """
+    Looks up the cached insert plan for the file's header, which carries explicit
+    pandas.read_csv options derived from the (cached) target table schema.
+
+    The header is read first and checked against the schema, so files whose columns
+    do not match the table are rejected before any row is sent to MySQL.
+
+    Args:
+        file_path (str): The full path to the CSV file.
+        mysql_config (dict): A dictionary containing MySQL connection parameters.
+        table_name (str): The name of the target table.
+        options (dict): Ingest options ('use_table_schema', 'schema_cache_ttl_seconds',
+                        'categorical_columns').
+
+    Returns:
+        InsertPlan or None: The plan, whose read_csv_options are empty when schema-driven
+                            parsing is disabled or the schema is unavailable, or None if
+                            the header does not match the table.
+    """
+    plan = get_insert_plan(mysql_config, table_name, read_column_names(file_path), options)
+    if plan.mismatch:
+        logger.error("CSV header of '%s' does not match table '%s': %s.", file_path, table_name, plan.mismatch)
+        return None
+    if options.get('use_table_schema', False) and plan.schema is None:
+        logger.warning("Schema of '%s' is unavailable. Letting pandas infer the column types of '%s'.", table_name, file_path)
+    return plan
+
+def run_insert(connection, chunks, file_path, table_name, options, stats, checkpoint=None, before_commit=None):
+    """Converts and inserts parsed chunks, through the staged pipeline if 'pipeline' is set."""
+    if options.get('pipeline', False):
+        return insert_chunks_pipelined(connection, chunks, file_path, table_name, options, stats, checkpoint, before_commit)
+    converted_chunks = (convert_chunk(item, stats) for item in chunks)
+    return insert_chunks(connection, converted_chunks, file_path, table_name, options, stats, checkpoint, before_commit)
+
+def load_via_staging(connection, chunks, columns, file_path, table_name, options, stats):
+    """
+    Loads a file into an unindexed staging table, then moves its rows into the target
+    with one INSERT ... SELECT in the same transaction.
+
+    The target only receives rows once the whole file has been staged, and they become
+    visible together at the commit. With 'write_mode' WRITE_UPSERT the merge updates the
+    records matching staged rows on the natural key (and 'staging_dedupe' is not needed).
+    The staging table is dropped (or truncated, with 'staging_cleanup': 'truncate')
+    afterwards, whether or not the load succeeded.
+
+    Args:
+        connection (mysql.connector.connection.MySQLConnection): An open (pooled) connection.
+        chunks (iterable): (DataFrame, end_offset) pairs from iter_chunks().
+        columns (list): The columns being loaded, see insert_columns().
+        file_path (str): The CSV file the chunks come from, used for logging.
+        table_name (str): The target table.
+        options (dict): Validated ingest options ('staging_dedupe', 'staging_dedupe_columns',
+                        'staging_cleanup' and those of insert_chunks()).
+        stats (dict): A dict from new_ingest_stats(); 'rows' ends up as the rows merged.
+
+    Returns:
+        bool: True if the file was staged, merged and committed, False otherwise.
+    """
+    staging_table = staging_table_name(table_name, columns)
+    update_clause = upsert_clause(columns, options)
+    dedupe_columns = None
+    if options.get('staging_dedupe', False) and update_clause is None:
+        dedupe_columns = options.get('staging_dedupe_columns') or columns
+
+    def merge(cursor):
+        started = time.perf_counter()
+        try:
+            merged = merge_staging_table(cursor, staging_table, table_name, columns, dedupe_columns, update_clause)
+        except Error as e:
+            if e.errno in SCHEMA_CHANGED_ERRNOS:
+                invalidate_table_schema(table_name)
+            raise
+        stats['merge_seconds'] += time.perf_counter() - started
+        if update_clause:
+            # Every staged row was applied; the affected rows tell new and changed records apart
+            logger.info(
+                "Upserted %s records from '%s' into '%s' on %s in %.3fs: %s rows affected (1 per new record, 2 per changed one).",
+                stats['rows'], staging_table, table_name, options['natural_key'], stats['merge_seconds'], merged
+            )
+            return
+        skipped = stats['rows'] - merged
+        stats['rows'] = merged
+        if dedupe_columns:
+            logger.info(
+                "Merged %s records from '%s' into '%s' in %.3fs, skipped %s duplicates.",
+                merged, staging_table, table_name, stats['merge_seconds'], skipped
+            )
+        else:
+            logger.info("Merged %s records from '%s' into '%s' in %.3fs.", merged, staging_table, table_name, stats['merge_seconds'])
+
+    cursor = connection.cursor()
+    try:
+        create_staging_table(cursor, table_name, staging_table, columns)
+    finally:
+        cursor.close()
+    try:
+        # The staging table has no unique index, so rows are staged with plain INSERTs
+        staging_options = dict(options, write_mode=WRITE_INSERT)
+        return run_insert(connection, chunks, file_path, staging_table, staging_options, stats, before_commit=merge)
+    finally:
+        cleanup_staging_table(connection, staging_table, options.get('staging_cleanup', STAGING_CLEANUP_DROP))
+
+def load_file_checkpoint(connection, file_key, file_path, table_name, options):
+    """Reads (or starts) the checkpoint of a file on the given connection."""
+    cursor = connection.cursor()
+    try:
+        return FileCheckpoint.load(
+            cursor, file_key, os.path.basename(file_path), table_name,
+            options.get('checkpoint_table', DEFAULT_CHECKPOINT_TABLE)
+        )
+    finally:
+        cursor.close()
 
-def process_csv_and_insert_into_mysql(file_path, mysql_config, table_name):
+def process_csv_and_insert_into_mysql(file_path, mysql_config, table_name, ingest_config=None, stats=None, file_key=None):
     """
-    Reads data from a CSV file using pandas and inserts it into a specified MySQL table.
+    Streams a CSV file in fixed-size chunks using pandas and inserts each chunk into a
+    specified MySQL table as it is parsed, so memory use does not grow with the file size.
+    Compressed files (.csv.gz, .csv.bz2, .csv.xz, .csv.zst) are decompressed on the fly,
+    and Parquet / Arrow IPC files are read batch by batch (these need pyarrow).
 
     Args:
         file_path (str): The full path to the CSV file.
         mysql_config (dict): A dictionary containing MySQL connection parameters.
         table_name (str): The name of the table to insert data into.
+        ingest_config (dict, optional): Ingest options ('chunk_size', 'commit_mode', 'engine',
+                                        'max_batch_rows', 'max_batch_bytes', 'packet_fill_ratio',
+                                        'use_table_schema', 'schema_cache_ttl_seconds',
+                                        'categorical_columns', 'checkpoint', 'checkpoint_table',
+                                        'pipeline', 'parse_queue_depth', 'convert_queue_depth',
+                                        'load_strategy', 'staging_dedupe', 'staging_dedupe_columns',
+                                        'staging_cleanup', 'parser', 'isolate_bad_rows',
+                                        'dead_letter_dir', 'max_rejected_rows', 'write_mode',
+                                        'natural_key', 'update_columns'),
+                                        see INGEST_CONFIG in config/settings.py.
+        stats (dict, optional): A dict from new_ingest_stats(); when given, it receives the
+                                rows inserted and per-stage timings of this file.
+        file_key (str, optional): Stable identity of the file (e.g. its content hash).
+                                  Required for checkpointing with COMMIT_PER_CHUNK: the
+                                  load resumes after the last chunk committed for this key.
 
     Returns:
         bool: True if data was successfully inserted, False otherwise.
     """
-    try:
-        # Read CSV into a pandas DataFrame
-        df = pd.read_csv(file_path)
-        logger.info(f"Successfully read CSV file: {file_path}. Rows: {len(df)}")
+    ingest_config = ingest_config or {}
+    chunk_size = ingest_config.get('chunk_size', DEFAULT_CHUNK_SIZE)
+    commit_mode = ingest_config.get('commit_mode', COMMIT_PER_FILE)
+    if commit_mode not in (COMMIT_PER_FILE, COMMIT_PER_CHUNK):
+        logger.error("Unknown commit mode '%s'. Expected '%s' or '%s'.", commit_mode, COMMIT_PER_FILE, COMMIT_PER_CHUNK)
+        return False
+    engine = ingest_config.get('engine', ENGINE_EXECUTEMANY)
+    if engine not in (ENGINE_EXECUTEMANY, ENGINE_LOAD_DATA):
+        logger.error("Unknown ingest engine '%s'. Expected '%s' or '%s'.", engine, ENGINE_EXECUTEMANY, ENGINE_LOAD_DATA)
+        return False
+    if engine == ENGINE_LOAD_DATA and not mysql_config.get('allow_local_infile', False):
+        logger.warning("Engine '%s' requires 'allow_local_infile' in MYSQL_CONFIG. Using '%s' for '%s'.", ENGINE_LOAD_DATA, ENGINE_EXECUTEMANY, file_path)
+        engine = ENGINE_EXECUTEMANY
+    load_strategy = ingest_config.get('load_strategy', LOAD_DIRECT)
+    if load_strategy not in (LOAD_DIRECT, LOAD_STAGING):
+        logger.error("Unknown load strategy '%s'. Expected '%s' or '%s'.", load_strategy, LOAD_DIRECT, LOAD_STAGING)
+        return False
+    if load_strategy == LOAD_STAGING and commit_mode == COMMIT_PER_CHUNK:
+        # The merge makes the whole file visible at once, so there is nothing to commit per chunk
+        logger.warning("Load strategy '%s' commits once per file. Ignoring commit mode '%s' for '%s'.", LOAD_STAGING, COMMIT_PER_CHUNK, file_path)
+        commit_mode = COMMIT_PER_FILE
+    write_mode = ingest_config.get('write_mode', WRITE_INSERT)
+    if write_mode not in (WRITE_INSERT, WRITE_UPSERT):
+        logger.error("Unknown write mode '%s'. Expected '%s' or '%s'.", write_mode, WRITE_INSERT, WRITE_UPSERT)
+        return False
+    if write_mode == WRITE_UPSERT:
+        if not ingest_config.get('natural_key'):
+            logger.error("Write mode '%s' needs a 'natural_key' for table '%s'.", WRITE_UPSERT, table_name)
+            return False
+        if engine == ENGINE_LOAD_DATA and load_strategy == LOAD_DIRECT:
+            # LOAD DATA can only skip or replace (delete and re-insert) duplicates
+            logger.warning("Engine '%s' cannot upsert. Using '%s' for '%s'.", ENGINE_LOAD_DATA, ENGINE_EXECUTEMANY, file_path)
+            engine = ENGINE_EXECUTEMANY
+    options = dict(ingest_config, commit_mode=commit_mode, engine=engine, load_strategy=load_strategy, write_mode=write_mode)
+    unavailable = compression_unavailable(file_path)
+    if unavailable:
+        logger.error("Cannot read '%s': %s.", file_path, unavailable)
+        return False
+    parser = ingest_config.get('parser', PARSER_PANDAS)
+    if parser not in (PARSER_PANDAS, PARSER_ARROW):
+        logger.error("Unknown parser '%s'. Expected '%s' or '%s'.", parser, PARSER_PANDAS, PARSER_ARROW)
+        return False
+    columnar = is_columnar_file(file_path)
+    if (columnar or parser == PARSER_ARROW) and arrow_unavailable():
+        if columnar:
+            logger.error("Cannot read '%s': %s.", file_path, arrow_unavailable())
+            return False
+        logger.warning("Parser '%s' is unavailable: %s. Parsing '%s' with '%s'.", PARSER_ARROW, arrow_unavailable(), file_path, PARSER_PANDAS)
+        parser = PARSER_PANDAS
+    if columnar:
+        parser = PARSER_ARROW
+    if stats is None:
+        stats = new_ingest_stats()
 
-        if df.empty:
-            logger.warning(f"CSV file '{file_path}' is empty. No data to insert.")
-            return True # Consider it successful if no data to insert
+    # Checkpoints record byte offsets, which only exist for CSV input
+    checkpointing = commit_mode == COMMIT_PER_CHUNK and options.get('checkpoint', False) and file_key is not None and not columnar
 
-        connection = get_db_connection(mysql_config)
-        if connection is None:
+    try:
+        plan = resolve_insert_plan(file_path, mysql_config, table_name, options)
+        if plan is None:
+            return False
+        if write_mode == WRITE_UPSERT and not check_natural_key(file_path, mysql_config, table_name, plan.header, options):
             return False
+        read_csv_options = plan.read_csv_options
+        options['insert_plan'] = plan
 
-        cursor = connection.cursor()
-        success = False
-        try:
-            # Prepare the INSERT statement
-            # Assuming CSV column names match database column names exactly
-            # Exclude 'id' column as it's AUTO_INCREMENT
-            columns = [col for col in df.columns if col != 'id']
-            placeholders = ', '.join(['%s'] * len(columns))
-            column_names_sql = ', '.join(columns)
-            insert_query = f"INSERT INTO {table_name} ({column_names_sql}) VALUES ({placeholders})"
-
-            # Convert DataFrame rows to a list of tuples for executemany
-            data_to_insert = [tuple(row) for row in df[columns].values]
-
-            # Execute the insert query for all rows
-            cursor.executemany(insert_query, data_to_insert)
-            connection.commit() # Commit the transaction
-            logger.info(f"Successfully inserted {cursor.rowcount} records from '{file_path}' into '{table_name}'.")
-            success = True
+        with pooled_connection(mysql_config) as connection:
+            if connection is None:
+                return False
 
-        except Error as e:
-            connection.rollback() # Rollback on error
-            logger.error(f"Error inserting data from '{file_path}' into '{table_name}': {e}")
-        finally:
-            if cursor:
-                cursor.close()
-                logger.debug("MySQL cursor closed.")
-            if connection and connection.is_connected():
-                connection.close()
-                logger.debug("MySQL connection closed.")
-        return success
+            checkpoint = None
+            if checkpointing:
+                checkpoint = load_file_checkpoint(connection, file_key, file_path, table_name, options)
+                if checkpoint.completed:
+                    logger.info("Checkpoint shows '%s' was already fully loaded (%s records). Nothing to insert.", file_path, checkpoint.rows_committed)
+                    return True
+                if checkpoint.is_resume:
+                    logger.info(
+                        "Resuming '%s' after chunk %s at byte %s (%s records already committed).",
+                        file_path, checkpoint.chunks_committed, checkpoint.byte_offset, checkpoint.rows_committed
+                    )
+
+            # Read CSV lazily, one chunk of rows at a time
+            start_offset = checkpoint.byte_offset if checkpoint is not None else None
+            if columnar:
+                chunks = iter_columnar_chunks(file_path, chunk_size, read_csv_options)
+            else:
+                chunks = iter_chunks(file_path, chunk_size, read_csv_options, start_offset, parser)
+            chunks = timed_iter(chunks, stats, 'parse_seconds')
+            first_chunk = next(chunks, None)
+            resuming = checkpoint is not None and checkpoint.is_resume
+            if (first_chunk is None or len(first_chunk[0]) == 0) and not resuming:
+                logger.warning("CSV file '%s' is empty. No data to insert.", file_path)
+                return True # Consider it successful if no data to insert
+            logger.info(
+                "Streaming CSV file: %s in chunks of %s rows (parser: %s, commit mode: %s, engine: %s, load strategy: %s, write mode: %s).",
+                file_path, chunk_size, parser, commit_mode, engine, load_strategy, write_mode
+            )
+
+            remaining_chunks = prepend(first_chunk, chunks) if first_chunk is not None else iter(())
+            if load_strategy == LOAD_STAGING:
+                return load_via_staging(connection, remaining_chunks, insert_columns(first_chunk[0]), file_path, table_name, options, stats)
+            return run_insert(connection, remaining_chunks, file_path, table_name, options, stats, checkpoint)
 
     except FileNotFoundError:
-        logger.error(f"CSV file not found: {file_path}")
+        logger.error("CSV file not found: %s", file_path)
         return False
     except pd.errors.EmptyDataError:
-        logger.warning(f"CSV file '{file_path}' is empty. No data to process.")
+        logger.warning("CSV file '%s' is empty. No data to process.", file_path)
         return True
-    except pd.errors.ParserError as e:
-        logger.error(f"Error parsing CSV file '{file_path}': {e}")
+    except csv_parse_errors() as e:
+        logger.error("Error parsing CSV file '%s': %s", file_path, e)
         return False
     except Exception as e:
-        logger.error(f"An unexpected error occurred while processing CSV '{file_path}': {e}")
+        logger.error("An unexpected error occurred while processing CSV '%s': %s", file_path, e)
         return False
 
@@ -1,39 +1,68 @@
 # data_layer/read_data.py
 
-import mysql.connector
 from mysql.connector import Error
 import logging
 
+from v3.src.data_layer.db_connection import pooled_connection
+
 # Set up logging for this module
 logger = logging.getLogger(__name__)
 
-def get_db_connection(mysql_config):
+# Rows fetched from the server per round-trip when streaming a table
+DEFAULT_FETCH_BATCH_SIZE = 10000
+
+def iter_records(mysql_config, table_name, batch_size=DEFAULT_FETCH_BATCH_SIZE):
     """
-    Establishes and returns a MySQL database connection.
+    Streams all rows of a table using an unbuffered cursor and fetchmany() batches,
+    so only batch_size rows are held in memory at a time.
+
+    If the caller stops iterating early, the connection still has unread rows on the
+    wire, so it is closed (and dropped from the pool) instead of draining the table.
 
     Args:
-        mysql_config (dict): A dictionary containing MySQL connection parameters.
+        mysql_config (dict): A dictionary containing MySQL connection parameters
+                             (e.g., 'host', 'database', 'user', 'password').
+        table_name (str): The name of the table to read data from.
+        batch_size (int): Rows fetched per round-trip.
 
-    Returns:
-        mysql.connector.connection.MySQLConnection or None: The connection object if successful, else None.
+    Yields:
+        tuple: One row of the table at a time.
     """
-    try:
-        connection = mysql.connector.connect(
-            host=mysql_config['host'],
-            database=mysql_config['database'],
-            user=mysql_config['user'],
-            password=mysql_config['password']
-        )
-        if connection.is_connected():
-            logger.info(f"Successfully connected to MySQL Server version {connection.get_server_info()}")
-            return connection
-    except Error as e:
-        logger.error(f"Error while connecting to MySQL: {e}")
-    return None
+    with pooled_connection(mysql_config) as connection:
+        if connection is None:
+            return
+
+        cursor = None
+        exhausted = False
+        row_count = 0
+        try:
+            cursor = connection.cursor(buffered=False)
+            cursor.execute(f"SELECT * FROM {table_name}")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                row_count += len(rows)
+                yield from rows
+            exhausted = True
+            logger.info("Successfully streamed %s records from table '%s'.", row_count, table_name)
+        except Error as e:
+            logger.error("Error reading data from table '%s': %s", table_name, e)
+        finally:
+            if exhausted:
+                cursor.close()
+                logger.debug("MySQL cursor closed.")
+            else:
+                # Unread rows remain on the connection; drop it rather than reading them all
+                try:
+                    connection.close()
+                except Error:
+                    pass
 
 def read_records(mysql_config, table_name):
     """
-    Connects to a MySQL database using provided configuration and reads all data from a specified table.
+    Reads all data from a specified table into a list.
+    Prefer iter_records() for large tables and count_records() when only the size is needed.
 
     Args:
         mysql_config (dict): A dictionary containing MySQL connection parameters
@@ -44,26 +73,44 @@ def read_records(mysql_config, table_name):
         list: A list of tuples, where each tuple represents a row from the table.
               Returns an empty list if no records are found or on error.
     """
-    records = []
-    connection = get_db_connection(mysql_config)
-    if connection is None:
-        return records
-
-    cursor = None
-    try:
-        cursor = connection.cursor()
-        select_query = f"SELECT * FROM {table_name}"
-        cursor.execute(select_query)
-        records = cursor.fetchall()
-        logger.info(f"Successfully read {len(records)} records from table '{table_name}'.")
-    except Error as e:
-        logger.error(f"Error reading data from table '{table_name}': {e}")
-    finally:
-        if cursor:
-            cursor.close()
-            logger.debug("MySQL cursor closed.")
-        if connection and connection.is_connected():
-            connection.close()
-            logger.debug("MySQL connection closed.")
-    return records
+    return list(iter_records(mysql_config, table_name))
+
+def count_records(mysql_config, table_name, estimate=False):
+    """
+    Counts the rows of a table without transferring them.
+
+    Args:
+        mysql_config (dict): A dictionary containing MySQL connection parameters.
+        table_name (str): The name of the table to count.
+        estimate (bool): Use the table statistics from INFORMATION_SCHEMA (instant but
+                         approximate for InnoDB) instead of an exact COUNT(*).
+
+    Returns:
+        int or None: The (estimated) number of rows, or None on error.
+    """
+    with pooled_connection(mysql_config) as connection:
+        if connection is None:
+            return None
 
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            if estimate:
+                cursor.execute(
+                    "SELECT TABLE_ROWS FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s",
+                    (mysql_config['database'], table_name)
+                )
+            else:
+                cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
+            row = cursor.fetchone()
+            if row is None or row[0] is None:
+                logger.error("Table '%s' was not found.", table_name)
+                return None
+            return int(row[0])
+        except Error as e:
+            logger.error("Error counting records in table '%s': %s", table_name, e)
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+                logger.debug("MySQL cursor closed.")
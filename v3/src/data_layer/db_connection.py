@@ -0,0 +1,272 @@
+# data_layer/db_connection.py
+
+import collections
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import Error
+
+from v3.src.utils import metrics
+
+# Set up logging for this module
+logger = logging.getLogger(__name__)
+
+POOL_ACQUIRE_WAIT = metrics.histogram(
+    'etl_db_pool_acquire_wait_seconds', 'Time spent waiting for a free pooled MySQL connection.'
+)
+POOL_ACQUIRE_TIMEOUTS = metrics.counter(
+    'etl_db_pool_acquire_timeouts_total', 'Borrows that gave up because the MySQL connection pool stayed exhausted.'
+)
+POOL_CONNECTIONS = metrics.gauge(
+    'etl_db_pool_connections', 'Connections of the shared MySQL pools by state (in_use, idle, size).', ['state']
+)
+
+# Defaults used when MYSQL_CONFIG does not set the pool options
+DEFAULT_POOL_SIZE = 5
+DEFAULT_POOL_MAX_IDLE_SECONDS = 300
+DEFAULT_POOL_ACQUIRE_TIMEOUT_SECONDS = 30
+DEFAULT_POOL_RECONNECT_ATTEMPTS = 3
+
+def get_db_connection(mysql_config):
+    """
+    Establishes and returns a new MySQL database connection.
+    Prefer pooled_connection(), which reuses connections across files and reads.
+
+    Args:
+        mysql_config (dict): A dictionary containing MySQL connection parameters.
+
+    Returns:
+        mysql.connector.connection.MySQLConnection or None: The connection object if successful, else None.
+    """
+    try:
+        connection = mysql.connector.connect(
+            host=mysql_config['host'],
+            database=mysql_config['database'],
+            user=mysql_config['user'],
+            password=mysql_config['password'],
+            allow_local_infile=mysql_config.get('allow_local_infile', False)
+        )
+        if connection.is_connected():
+            logger.info("Successfully connected to MySQL Server version %s", connection.get_server_info())
+            return connection
+    except Error as e:
+        logger.error("Error while connecting to MySQL: %s", e)
+    return None
+
+def _close_quietly(connection):
+    """Closes a connection, ignoring errors from connections that are already broken."""
+    try:
+        connection.close()
+    except Error:
+        pass
+
+class MySQLConnectionPool:
+    """
+    A small thread-safe pool of MySQL connections.
+
+    Connections are checked with a ping when borrowed (reconnecting if the server
+    dropped them), idle connections older than max_idle_seconds are evicted, and at
+    most pool_size connections are open at any time.
+    """
+    def __init__(self, mysql_config):
+        self.mysql_config = mysql_config
+        self.pool_size = mysql_config.get('pool_size', DEFAULT_POOL_SIZE)
+        self.max_idle_seconds = mysql_config.get('pool_max_idle_seconds', DEFAULT_POOL_MAX_IDLE_SECONDS)
+        self.acquire_timeout = mysql_config.get('pool_acquire_timeout_seconds', DEFAULT_POOL_ACQUIRE_TIMEOUT_SECONDS)
+        self.ping_on_borrow = mysql_config.get('pool_ping_on_borrow', True)
+        self.reconnect_attempts = mysql_config.get('pool_reconnect_attempts', DEFAULT_POOL_RECONNECT_ATTEMPTS)
+        self._idle = collections.deque() # (connection, last_used) pairs, most recently used last
+        self._in_use = 0
+        self._condition = threading.Condition()
+
+    def _evict_idle(self):
+        """Removes idle connections past max_idle_seconds. Must hold the lock; returns them for closing."""
+        expired = []
+        cutoff = time.monotonic() - self.max_idle_seconds
+        while self._idle and self._idle[0][1] < cutoff:
+            expired.append(self._idle.popleft()[0])
+        return expired
+
+    def _is_healthy(self, connection):
+        """Pings a borrowed connection, letting the connector reconnect it if needed."""
+        try:
+            connection.ping(reconnect=True, attempts=self.reconnect_attempts, delay=1)
+            return True
+        except Error as e:
+            logger.warning("Discarding unhealthy pooled MySQL connection: %s", e)
+            return False
+
+    def acquire(self):
+        """
+        Borrows a connection from the pool, opening a new one if the pool is not full.
+
+        Returns:
+            mysql.connector.connection.MySQLConnection or None: A healthy connection,
+            or None if none could be opened or the pool stayed exhausted for acquire_timeout.
+        """
+        connection = None
+        acquired = False
+        started = time.monotonic()
+        with self._condition:
+            expired = self._evict_idle()
+            deadline = time.monotonic() + self.acquire_timeout
+            while True:
+                if self._idle:
+                    connection = self._idle.pop()[0]
+                    acquired = True
+                elif self._in_use < self.pool_size:
+                    acquired = True
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining > 0:
+                        self._condition.wait(remaining)
+                        continue
+                    logger.error("Timed out after %ss waiting for a MySQL connection (pool size %s).", self.acquire_timeout, self.pool_size)
+                    POOL_ACQUIRE_TIMEOUTS.inc()
+                if acquired:
+                    self._in_use += 1
+                break
+        POOL_ACQUIRE_WAIT.observe(time.monotonic() - started)
+        for stale in expired:
+            _close_quietly(stale)
+        if not acquired:
+            return None
+
+        if connection is not None and self.ping_on_borrow and not self._is_healthy(connection):
+            _close_quietly(connection)
+            connection = None
+        if connection is None:
+            connection = get_db_connection(self.mysql_config)
+        if connection is None:
+            self._release_slot()
+        return connection
+
+    def _release_slot(self):
+        """Gives back a borrowed slot whose connection could not be opened."""
+        with self._condition:
+            self._in_use -= 1
+            self._condition.notify()
+
+    def release(self, connection):
+        """
+        Returns a borrowed connection to the pool. Any open transaction is rolled back,
+        and connections that are no longer connected are dropped instead of reused.
+
+        Args:
+            connection (mysql.connector.connection.MySQLConnection): The connection from acquire().
+        """
+        reusable = False
+        try:
+            if connection.is_connected():
+                if connection.in_transaction:
+                    connection.rollback()
+                reusable = True
+        except Error as e:
+            logger.warning("Dropping MySQL connection that failed on release: %s", e)
+        if not reusable:
+            _close_quietly(connection)
+
+        with self._condition:
+            self._in_use -= 1
+            if reusable:
+                self._idle.append((connection, time.monotonic()))
+            expired = self._evict_idle()
+            self._condition.notify()
+        for stale in expired:
+            _close_quietly(stale)
+
+    def close_all(self):
+        """Closes every idle connection. Borrowed connections are returned to the pool as usual."""
+        with self._condition:
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+        for connection in idle:
+            _close_quietly(connection)
+        logger.debug("Closed %s idle MySQL connection(s).", len(idle))
+
+    def stats(self):
+        """Returns a snapshot of the pool usage as a dict."""
+        with self._condition:
+            return {'size': self.pool_size, 'in_use': self._in_use, 'idle': len(self._idle)}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def _pool_key(mysql_config):
+    return (mysql_config['host'], mysql_config['database'], mysql_config['user'])
+
+def get_connection_pool(mysql_config):
+    """
+    Returns the shared connection pool for a MySQL configuration, creating it on first use.
+
+    Args:
+        mysql_config (dict): A dictionary containing MySQL connection and pool parameters.
+
+    Returns:
+        MySQLConnectionPool: The pool shared by every caller using the same server, database and user.
+    """
+    key = _pool_key(mysql_config)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = MySQLConnectionPool(mysql_config)
+            _pools[key] = pool
+        return pool
+
+@contextmanager
+def pooled_connection(mysql_config):
+    """
+    Borrows a connection from the shared pool for the duration of a with-block.
+
+    Args:
+        mysql_config (dict): A dictionary containing MySQL connection and pool parameters.
+
+    Yields:
+        mysql.connector.connection.MySQLConnection or None: The connection, or None if
+        no connection could be obtained.
+    """
+    pool = get_connection_pool(mysql_config)
+    connection = pool.acquire()
+    try:
+        yield connection
+    finally:
+        if connection is not None:
+            pool.release(connection)
+
+def pool_usage():
+    """
+    Sums the usage of every shared pool.
+
+    Returns:
+        dict: Maps ('in_use',), ('idle',) and ('size',) to connection counts, the form
+              expected by the 'etl_db_pool_connections' gauge.
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+    totals = {('in_use',): 0, ('idle',): 0, ('size',): 0}
+    for pool in pools:
+        pool_stats = pool.stats()
+        for state in ('in_use', 'idle', 'size'):
+            totals[(state,)] += pool_stats[state]
+    return totals
+
+POOL_CONNECTIONS.set_function(pool_usage)
+
+def close_all_pools():
+    """Closes the idle connections of every shared pool, e.g. at application shutdown."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
+
+def reset_pools_after_fork():
+    """
+    Forgets the pools inherited from a parent process without closing them, so a
+    worker process opens its own connections instead of sharing the parent's sockets.
+    """
+    with _pools_lock:
+        _pools.clear()
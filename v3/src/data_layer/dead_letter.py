@@ -0,0 +1,85 @@
+# data_layer/dead_letter.py
+
+import csv
+import logging
+import os
+import shutil
+
+# Set up logging for this module
+logger = logging.getLogger(__name__)
+
+# MySQL error codes caused by the values of a row rather than by the statement or the
+# connection: the row can be set aside and the rest of the batch retried.
+# (column cannot be null, duplicate entry, field without default, out of range,
+# data truncated, incorrect value, incorrect integer/string value, data too long,
+# foreign key violation, check constraint violation)
+ROW_DATA_ERRNOS = (1048, 1062, 1364, 1264, 1265, 1292, 1366, 1406, 1452, 3819)
+
+# Name of the extra column holding the reason a row was rejected
+ERROR_COLUMN = 'error'
+
+def dead_letter_path(dead_letter_dir, file_path):
+    """The dead-letter CSV for an input file: '<dead_letter_dir>/<file name>.rejected.csv'."""
+    return os.path.join(dead_letter_dir, f"{os.path.basename(file_path)}.rejected.csv")
+
+def describe_error(error):
+    """A one-line reason for a rejected row, e.g. '1366 (HY000): Incorrect integer value ...'."""
+    return f"{error.errno} ({error.sqlstate}): {error.msg}"
+
+class DeadLetterFile:
+    """
+    Collects rejected rows and their error reasons in a dead-letter CSV.
+
+    Rows are first written to a '.part' file next to the dead-letter file and only
+    appended to it by commit(), called when the rows around them are committed to
+    MySQL; discard() drops them when the transaction is rolled back, so a retried load
+    does not list the same rows twice.
+    """
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = list(columns)
+        self.rows_written = 0 # Rows committed to the dead-letter file
+        self._pending_path = f"{path}.part"
+        self._pending_file = None
+        self._writer = None
+        self._pending_rows = 0
+
+    def write(self, row, reason):
+        """Adds one rejected row (a tuple in the order of self.columns) with its reason."""
+        if self._writer is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._pending_file = open(self._pending_path, 'w', encoding='utf-8', newline='')
+            self._writer = csv.writer(self._pending_file)
+        self._writer.writerow(['' if value is None else value for value in row] + [reason])
+        self._pending_rows += 1
+
+    def commit(self):
+        """Appends the rows written since the last commit to the dead-letter file."""
+        if self._pending_file is None:
+            return
+        self._pending_file.close()
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, 'a', encoding='utf-8', newline='') as dead_letter_file:
+            if new_file:
+                csv.writer(dead_letter_file).writerow(self.columns + [ERROR_COLUMN])
+            with open(self._pending_path, encoding='utf-8', newline='') as pending_file:
+                shutil.copyfileobj(pending_file, dead_letter_file)
+        os.remove(self._pending_path)
+        self.rows_written += self._pending_rows
+        self._reset()
+
+    def discard(self):
+        """Drops the rows written since the last commit."""
+        if self._pending_file is None:
+            return
+        self._pending_file.close()
+        try:
+            os.remove(self._pending_path)
+        except OSError as e:
+            logger.warning("Could not remove '%s': %s", self._pending_path, e)
+        self._reset()
+
+    def _reset(self):
+        self._pending_file = None
+        self._writer = None
+        self._pending_rows = 0
@@ -0,0 +1,242 @@
+# data_layer/directory_poller.py
+"""
+Polling watcher for dropbox folders where file system events are not delivered.
+
+On NFS and SMB mounts, inotify and its counterparts only see changes made by the local
+machine, so files written by other hosts never raise a watchdog event. The
+DirectoryPoller lists the folder every SCAN_INTERVAL_SECONDS instead and compares the
+listing with a DirectoryIndex of (inode, size, mtime) per file name. Only the files
+that are new, replaced or changed since the previous listing are handed to the
+IngestQueue, the same path the watchdog CSVHandler feeds, so a tick over a folder of
+100k leftover files does no ingest work.
+
+The directory listing itself returns each name's inode, so most listings only stat the
+new and replaced files, which keeps a tick to one directory read even on mounts where
+every stat is a network round trip. Every few listings all files are stat'ed, to notice
+leftover files rewritten in place. (Files still growing after they appear are followed
+by the IngestQueue's readiness monitor, not the poller.)
+
+The index can be kept in a SQLite file. A restarted poller then only picks up the
+changes made while it was down rather than every file in the folder.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from v3.src.data_layer.csv_processor import is_input_file
+
+# Set up logging for this module
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS directory_entries (
+    directory TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    PRIMARY KEY (directory, file_name)
+);
+"""
+
+def list_input_files(directory, known=None):
+    """
+    Lists the loadable files of a folder, without descending into subfolders.
+
+    Args:
+        directory (str): The folder to list.
+        known (dict, optional): Signatures to reuse, instead of a stat, for files whose
+                                inode has not changed.
+
+    Returns:
+        dict: (inode, size, mtime_ns) by file name.
+    """
+    entries = {}
+    with os.scandir(directory) as scan:
+        for entry in scan:
+            if not is_input_file(entry.name):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                inode = entry.inode()
+                if known is not None:
+                    signature = known.get(entry.name)
+                    if signature is not None and signature[0] == inode:
+                        entries[entry.name] = signature
+                        continue
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue # Removed while listing
+            entries[entry.name] = (inode, stat.st_size, stat.st_mtime_ns)
+    return entries
+
+class DirectoryIndex:
+    """
+    Last seen (inode, size, mtime_ns) of every loadable file in a folder, optionally
+    persisted to SQLite. Only the entries that changed are written back.
+    """
+    def __init__(self, directory, path=None):
+        """
+        Args:
+            directory (str): The folder the index describes.
+            path (str, optional): SQLite file to keep the index in; None keeps it in memory.
+        """
+        self.directory = os.path.abspath(directory)
+        self.path = path
+        self.entries = {}
+        self._connection = None
+        if path:
+            index_dir = os.path.dirname(path)
+            if index_dir:
+                os.makedirs(index_dir, exist_ok=True)
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            self._connection.executescript(_SCHEMA)
+            self._connection.commit()
+            rows = self._connection.execute(
+                "SELECT file_name, inode, size, mtime_ns FROM directory_entries WHERE directory = ?",
+                (self.directory,)
+            )
+            self.entries = {file_name: (inode, size, mtime_ns) for file_name, inode, size, mtime_ns in rows}
+
+    def diff(self, listing):
+        """
+        Compares a listing from list_input_files() with the index.
+
+        Returns:
+            tuple: (created, modified, deleted) lists of file names. A file whose inode
+                   changed was replaced and counts as created.
+        """
+        created, modified = [], []
+        new_names = 0
+        entries = self.entries
+        for file_name, signature in listing.items():
+            known = entries.get(file_name)
+            if known is None:
+                created.append(file_name)
+                new_names += 1
+            elif known[0] != signature[0]:
+                created.append(file_name)
+            elif known != signature:
+                modified.append(file_name)
+        # Every indexed name is still listed unless the counts disagree
+        if len(entries) + new_names == len(listing):
+            deleted = []
+        else:
+            deleted = [file_name for file_name in entries if file_name not in listing]
+        return created, modified, deleted
+
+    def update(self, listing, changed, deleted):
+        """Records the changed file names' signatures from listing and drops the deleted ones."""
+        for file_name in changed:
+            self.entries[file_name] = listing[file_name]
+        for file_name in deleted:
+            self.entries.pop(file_name, None)
+        if self._connection is not None and (changed or deleted):
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO directory_entries (directory, file_name, inode, size, mtime_ns) VALUES (?, ?, ?, ?, ?)",
+                    ((self.directory, file_name) + listing[file_name] for file_name in changed)
+                )
+                self._connection.executemany(
+                    "DELETE FROM directory_entries WHERE directory = ? AND file_name = ?",
+                    ((self.directory, file_name) for file_name in deleted)
+                )
+
+    def forget(self, file_names):
+        """Drops entries, so the files count as new on the next listing."""
+        self.update({}, [], list(file_names))
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+class DirectoryPoller:
+    """
+    Polls a folder and submits the files that changed since the last listing to an
+    IngestQueue, as the watchdog CSVHandler does for events. Has the start(), stop()
+    and join() of a watchdog Observer, so main.py can run either one.
+
+    The first listing runs at start(): every file not in the index (all of them, with a
+    new or in-memory index) is submitted, which stands in for the initial scan.
+    """
+    def __init__(self, directory, ingest_queue, interval_seconds, index=None, full_stat_every=10):
+        """
+        Args:
+            directory (str): The folder to poll.
+            ingest_queue (IngestQueue): Receives the new and changed files.
+            interval_seconds (float): Time between the start of two listings.
+            index (DirectoryIndex, optional): State of the folder at the last listing;
+                                              defaults to an empty in-memory index.
+            full_stat_every (int): Stat every file on every Nth listing (the first one
+                                   included); 1 stats them on every listing.
+        """
+        self.directory = directory
+        self.ingest_queue = ingest_queue
+        self.interval_seconds = interval_seconds
+        self.index = index or DirectoryIndex(directory)
+        self.full_stat_every = max(1, full_stat_every)
+        self._listings = 0
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Starts the polling thread."""
+        self._thread = threading.Thread(target=self._run, name='directory-poller', daemon=True)
+        self._thread.start()
+        logger.info("Polling '%s' every %ss (%s files known).", self.directory, self.interval_seconds, len(self.index.entries))
+
+    def stop(self):
+        """Asks the polling thread to exit after the current listing."""
+        self._stopping.set()
+
+    def join(self, timeout=None):
+        """Waits for the polling thread to exit."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def poll(self):
+        """
+        Lists the folder once and submits the new and changed files.
+
+        Returns:
+            tuple: (created, modified, deleted) lists of file names.
+        """
+        started = time.perf_counter()
+        full_stat = self._listings % self.full_stat_every == 0
+        self._listings += 1
+        listing = list_input_files(self.directory, None if full_stat else self.index.entries)
+        created, modified, deleted = self.index.diff(listing)
+        # Record the listing before submitting, so a file is submitted once per change
+        self.index.update(listing, created + modified, deleted)
+        for file_name in created:
+            file_path = os.path.join(self.directory, file_name)
+            logger.info("Polling detected new CSV file: %s", file_path)
+            self.ingest_queue.submit(file_path)
+        for file_name in modified:
+            file_path = os.path.join(self.directory, file_name)
+            logger.debug("Polling detected CSV file modified: %s", file_path)
+            self.ingest_queue.submit(file_path, written=True)
+        logger.debug(
+            "Listed %s files in '%s' in %.3fs: %s new, %s modified, %s removed.",
+            len(listing), self.directory, time.perf_counter() - started, len(created), len(modified), len(deleted)
+        )
+        return created, modified, deleted
+
+    def _run(self):
+        """Polling loop: lists the folder every interval_seconds until stopped."""
+        while not self._stopping.is_set():
+            started = time.monotonic()
+            try:
+                self.poll()
+            except OSError as e:
+                # An unreachable network mount should not end the watcher
+                logger.error("Could not list '%s': %s", self.directory, e)
+            except Exception as e:
+                logger.critical("Polling '%s' failed: %s", self.directory, e, exc_info=True)
+            self._stopping.wait(max(0.0, self.interval_seconds - (time.monotonic() - started)))
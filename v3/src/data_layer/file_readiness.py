@@ -0,0 +1,292 @@
+# data_layer/file_readiness.py
+"""
+Detects when a file dropped into the dropbox has been completely written.
+
+Two signals are used. Where the event source reports the writer closing the file
+(inotify's IN_CLOSE_WRITE on Linux, surfaced by watchdog as a closed event), or a file
+is renamed into the dropbox, the file is ready as soon as its size and mtime still match
+the ones seen at that event; a writer pausing mid-file is never mistaken for a finished
+one. Files that are not seen being written (renamed in from another folder) and, where
+there are no close events (other platforms, SMB/NFS shares, the polling watcher), all
+files are ready once their size and mtime have stopped changing for a quiet period of
+at least min_quiet_seconds. That minimum is deliberately seconds long: NFS caches
+attributes and a remote writer may pause between writes, so a file that merely looks
+unchanged for a few milliseconds can still be partial. Each time the file is seen
+growing, the quiet period doubles (up to max_quiet_seconds), so a copy that has already
+been caught mid-write must then stall for several times the minimum before it is taken
+as finished. Parquet and Arrow IPC files must also end with their format's footer magic.
+"""
+
+import heapq
+import logging
+import os
+import threading
+import time
+
+from v3.src.data_layer.arrow_reader import columnar_format
+
+# Set up logging for this module
+logger = logging.getLogger(__name__)
+
+DEFAULT_INITIAL_QUIET_SECONDS = 0.01
+DEFAULT_MIN_QUIET_SECONDS = 2.0
+DEFAULT_MAX_QUIET_SECONDS = 30.0
+DEFAULT_CLOSE_WAIT_SECONDS = 30.0
+DEFAULT_TIMEOUT_SECONDS = 3600.0
+
+# Trailing bytes of a complete columnar file, by format
+FOOTER_MAGIC = {
+    'parquet': (b'PAR1',),
+    'ipc': (b'ARROW1', b'FEA1'), # Arrow IPC file / Feather v1
+}
+
+# Outcomes passed to the on_abandoned callback
+ABANDONED_GONE = 'gone'       # the file was removed or moved away while waiting
+ABANDONED_TIMEOUT = 'timeout' # the file kept changing for longer than timeout_seconds
+ABANDONED_STOPPED = 'stopped' # the monitor was stopped first
+
+def file_signature(file_path):
+    """(size, mtime in ns) of a file; raises OSError if it cannot be read."""
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+def has_complete_footer(file_path):
+    """
+    False for a Parquet or Arrow IPC file that does not (yet) end with its footer magic;
+    True for those that do and for every other file type, which have no such marker.
+    """
+    magics = FOOTER_MAGIC.get(columnar_format(file_path))
+    if not magics:
+        return True
+    length = max(len(magic) for magic in magics)
+    try:
+        with open(file_path, 'rb') as columnar_file:
+            columnar_file.seek(0, os.SEEK_END)
+            size = columnar_file.tell()
+            columnar_file.seek(max(0, size - length))
+            tail = columnar_file.read()
+    except OSError:
+        return False
+    return any(tail.endswith(magic) for magic in magics)
+
+class _WatchedFile:
+    """Readiness state of one watched file."""
+    def __init__(self, file_path, since, initial_quiet_seconds):
+        self.file_path = file_path
+        self.since = since # When the file was first reported (monotonic)
+        self.signature = None
+        self.last_change = None
+        self.quiet_seconds = initial_quiet_seconds
+        self.written = False # Seen being written, so a close will follow
+        self.closed_signature = None # Signature when the writer closed the file
+        self.due = since # Next check (monotonic)
+
+class FileReadinessMonitor:
+    """
+    Watches files until they are completely written and hands them on, from one
+    background thread, so waiting for a slow copy never holds an ingest worker.
+
+    on_ready(file_path, since) is called once a watched file is ready, and
+    on_abandoned(file_path, since, reason) once it is given up (ABANDONED_*); both run
+    on the monitor thread.
+    """
+    def __init__(self, on_ready, on_abandoned, close_events=False, initial_quiet_seconds=DEFAULT_INITIAL_QUIET_SECONDS,
+                 max_quiet_seconds=DEFAULT_MAX_QUIET_SECONDS, close_wait_seconds=DEFAULT_CLOSE_WAIT_SECONDS,
+                 timeout_seconds=DEFAULT_TIMEOUT_SECONDS, min_quiet_seconds=DEFAULT_MIN_QUIET_SECONDS):
+        """
+        Args:
+            on_ready (callable): Called with (file_path, since) for a ready file.
+            on_abandoned (callable): Called with (file_path, since, reason) for a file given up.
+            close_events (bool): The event source reports every close after writing, so
+                                 files seen being written wait for mark_closed() instead
+                                 of a quiet period.
+            initial_quiet_seconds (float): Delay before the second stat of a polled file.
+            max_quiet_seconds (float): Longest interval between two stats of a file, and
+                                       longest quiet period a growing file is held to.
+            close_wait_seconds (float): With close_events, a file unchanged this long is
+                                        ready even without a close (e.g. a missed event).
+            timeout_seconds (float): Give up on a file that is not ready after this long.
+            min_quiet_seconds (float): Shortest time a file without a close event must
+                                       stay unchanged to be ready.
+        """
+        self.on_ready = on_ready
+        self.on_abandoned = on_abandoned
+        self.close_events = close_events
+        self.initial_quiet_seconds = initial_quiet_seconds
+        self.max_quiet_seconds = max_quiet_seconds
+        self.min_quiet_seconds = min_quiet_seconds
+        self.close_wait_seconds = close_wait_seconds
+        self.timeout_seconds = timeout_seconds
+        self._watched = {}  # file path -> _WatchedFile
+        self._schedule = [] # heap of (due, sequence, file path); stale entries are skipped
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread = None
+
+    def start(self):
+        """Starts the monitor thread."""
+        self._thread = threading.Thread(target=self._run, name='file-readiness', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stops the monitor; files still being watched are abandoned (ABANDONED_STOPPED)."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        with self._condition:
+            abandoned = list(self._watched.values())
+            self._watched.clear()
+            self._schedule.clear()
+        for watched in abandoned:
+            self.on_abandoned(watched.file_path, watched.since, ABANDONED_STOPPED)
+
+    def watch(self, file_path, since=None):
+        """Starts watching a file; a file already being watched is left as it is."""
+        now = time.monotonic()
+        with self._condition:
+            if file_path in self._watched:
+                return
+            watched = _WatchedFile(file_path, since if since is not None else now, self.initial_quiet_seconds)
+            watched.due = now
+            self._watched[file_path] = watched
+            self._push(watched)
+
+    def mark_closed(self, file_path):
+        """
+        Records that the writer closed the file (or it was renamed into place) and
+        re-checks it right away. Ignored for files that are not being watched.
+        """
+        try:
+            signature = file_signature(file_path)
+        except OSError:
+            signature = None
+        with self._condition:
+            watched = self._watched.get(file_path)
+            if watched is None:
+                return
+            watched.closed_signature = signature
+            watched.due = time.monotonic()
+            self._push(watched)
+
+    def mark_written(self, file_path):
+        """Records that the file is being written (a modified event) by a watched writer."""
+        with self._condition:
+            watched = self._watched.get(file_path)
+            if watched is not None:
+                watched.written = True
+
+    def watching(self):
+        """Number of files waiting to become ready."""
+        with self._condition:
+            return len(self._watched)
+
+    def _push(self, watched):
+        # Called with the condition held
+        self._sequence += 1
+        heapq.heappush(self._schedule, (watched.due, self._sequence, watched.file_path))
+        self._condition.notify()
+
+    def _next_due(self):
+        """Waits for the next file due for a check; returns None once stopping."""
+        with self._condition:
+            while not self._stopping:
+                if not self._schedule:
+                    self._condition.wait()
+                    continue
+                due, _, file_path = self._schedule[0]
+                watched = self._watched.get(file_path)
+                if watched is None or watched.due != due:
+                    heapq.heappop(self._schedule) # Superseded by a later entry
+                    continue
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                heapq.heappop(self._schedule)
+                return watched
+            return None
+
+    def _run(self):
+        """Monitor loop: checks each watched file when it is due."""
+        while True:
+            watched = self._next_due()
+            if watched is None:
+                return
+            try:
+                outcome = self._check(watched)
+            except Exception as e:
+                logger.error("Readiness check of '%s' failed: %s", watched.file_path, e, exc_info=True)
+                outcome = ABANDONED_GONE
+            if outcome is None:
+                with self._condition:
+                    if self._watched.get(watched.file_path) is watched:
+                        self._push(watched)
+                continue
+
+            with self._condition:
+                if self._watched.get(watched.file_path) is not watched:
+                    continue
+                del self._watched[watched.file_path]
+            try:
+                if outcome == 'ready':
+                    self.on_ready(watched.file_path, watched.since)
+                else:
+                    self.on_abandoned(watched.file_path, watched.since, outcome)
+            except Exception as e:
+                logger.critical("Readiness callback failed for '%s': %s", watched.file_path, e, exc_info=True)
+
+    def _check(self, watched):
+        """
+        Stats a watched file once.
+
+        Returns:
+            str or None: 'ready', an ABANDONED_* reason, or None to check again at watched.due.
+        """
+        now = time.monotonic()
+        try:
+            signature = file_signature(watched.file_path)
+        except FileNotFoundError:
+            return ABANDONED_GONE
+
+        if watched.closed_signature is not None and signature == watched.closed_signature and has_complete_footer(watched.file_path):
+            logger.debug("'%s' is ready: closed by its writer %.3fs after it appeared.", watched.file_path, now - watched.since)
+            return 'ready'
+
+        first_check = watched.signature is None
+        changed = signature != watched.signature
+        if changed:
+            if not first_check or signature[0] == 0:
+                watched.written = True # Growing, or just opened by its writer
+            watched.signature = signature
+            watched.last_change = now
+        # A file being written whose close will be reported only needs the odd stat;
+        # any other file must stay unchanged for the quiet period
+        waiting_for_close = self.close_events and watched.written
+        if not changed:
+            required = self.close_wait_seconds if waiting_for_close else self._required_quiet(watched)
+            if now - watched.last_change >= required and has_complete_footer(watched.file_path):
+                logger.debug("'%s' is ready: unchanged for %.3fs.", watched.file_path, now - watched.last_change)
+                return 'ready'
+
+        if now - watched.since > self.timeout_seconds:
+            logger.warning("'%s' was not complete after %ss. Leaving it for a later scan.", watched.file_path, self.timeout_seconds)
+            return ABANDONED_TIMEOUT
+        if waiting_for_close:
+            # Back off: a file waiting for its close is checked less often
+            watched.quiet_seconds = min(watched.quiet_seconds * 2, self.max_quiet_seconds)
+        elif changed and not first_check:
+            # Seen growing: it must now stay unchanged for twice as long
+            watched.quiet_seconds = min(self._required_quiet(watched) * 2, self.max_quiet_seconds)
+        watched.due = now + watched.quiet_seconds
+        if not waiting_for_close:
+            # No need to look again before the quiet period can have passed
+            watched.due = min(max(watched.due, watched.last_change + self._required_quiet(watched)), now + self.max_quiet_seconds)
+        return None
+
+    def _required_quiet(self, watched):
+        """How long a file without a close event must stay unchanged to be ready."""
+        return max(watched.quiet_seconds, self.min_quiet_seconds)
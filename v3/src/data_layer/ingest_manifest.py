@@ -0,0 +1,274 @@
+# data_layer/ingest_manifest.py
+"""
+Persistent manifest of ingested files, keyed by content hash.
+
+The manifest is a small SQLite database. Lookups by content hash (the primary key) and
+by the (file name, size, mtime) fast path are both index lookups. Files being ingested
+are claimed in the database too, so worker processes sharing the manifest never load
+the same content twice. It can be inspected and compacted from the command line:
+
+    python -m v3.src.data_layer.ingest_manifest --list 20
+    python -m v3.src.data_layer.ingest_manifest --lookup <sha256>
+    python -m v3.src.data_layer.ingest_manifest --compact 90
+"""
+
+import argparse
+import datetime
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+
+# Set up logging for this module
+logger = logging.getLogger(__name__)
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingested_files (
+    content_hash TEXT PRIMARY KEY,
+    file_name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    table_name TEXT NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_ingested_files_fast_path ON ingested_files (file_name, size, mtime_ns);
+CREATE INDEX IF NOT EXISTS ix_ingested_files_ingested_at ON ingested_files (ingested_at);
+CREATE TABLE IF NOT EXISTS in_flight_files (
+    content_hash TEXT PRIMARY KEY,
+    owner_pid INTEGER NOT NULL,
+    claimed_at TEXT NOT NULL
+);
+"""
+
+# How long a claim waits for another process's claim transaction
+BUSY_TIMEOUT_SECONDS = 30
+
+# Windows process access right and exit code, for _process_exists()
+_PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+_STILL_ACTIVE = 259
+
+_COLUMNS = ('content_hash', 'file_name', 'size', 'mtime_ns', 'table_name', 'ingested_at')
+
+def compute_file_hash(file_path, block_size=HASH_BLOCK_SIZE):
+    """
+    Computes the SHA-256 of a file, reading it in blocks so memory stays flat.
+
+    Args:
+        file_path (str): The file to hash.
+        block_size (int): Bytes read per block.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as data_file:
+        for block in iter(lambda: data_file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _process_exists(pid):
+    """Whether a process with this id is running."""
+    if os.name == 'nt':
+        import ctypes # os.kill(pid, 0) would terminate the process on Windows
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(_PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return False
+        exit_code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        kernel32.CloseHandle(handle)
+        return exit_code.value == _STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True # Running as another user
+    return True
+
+class IngestManifest:
+    """
+    Records which file contents have already been ingested.
+
+    The processor claims a content hash before loading a file and records it after the
+    commit, so the same content dropped twice (or loaded by two workers at once) is only
+    ingested once. Claims are rows in the database, taken in an immediate transaction,
+    so they hold across every process that opens the manifest. Claims left behind by a
+    process that died are cleared when the manifest is opened.
+    """
+    def __init__(self, path, trust_size_mtime=True):
+        self.path = path
+        self.trust_size_mtime = trust_size_mtime
+        self._lock = threading.Lock()
+        manifest_dir = os.path.dirname(path)
+        if manifest_dir:
+            os.makedirs(manifest_dir, exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+        self._connection.commit()
+        self._clear_stale_claims()
+
+    def _clear_stale_claims(self):
+        """Removes the claims of processes that are no longer running."""
+        with self._lock:
+            claims = self._connection.execute("SELECT content_hash, owner_pid FROM in_flight_files").fetchall()
+            stale = [(content_hash,) for content_hash, owner_pid in claims if not _process_exists(owner_pid)]
+            if stale:
+                self._connection.executemany("DELETE FROM in_flight_files WHERE content_hash = ?", stale)
+                self._connection.commit()
+        if stale:
+            logger.warning("Cleared %s ingest claims left behind by stopped processes in '%s'.", len(stale), self.path)
+
+    def _row_to_dict(self, row):
+        return dict(zip(_COLUMNS, row)) if row else None
+
+    def find_by_stat(self, file_name, size, mtime_ns):
+        """Fast path: the entry recorded for this exact file name, size and mtime, if any."""
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM ingested_files WHERE file_name = ? AND size = ? AND mtime_ns = ? LIMIT 1",
+                (file_name, size, mtime_ns)
+            ).fetchone()
+        return self._row_to_dict(row)
+
+    def find_by_hash(self, content_hash):
+        """The entry recorded for this content hash, if any."""
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM ingested_files WHERE content_hash = ?",
+                (content_hash,)
+            ).fetchone()
+        return self._row_to_dict(row)
+
+    def identify(self, file_path):
+        """
+        Identifies a file and checks whether its content was already ingested.
+
+        With trust_size_mtime, a file whose name, size and mtime match a recorded entry is
+        treated as known without reading it; otherwise its content is hashed.
+
+        Args:
+            file_path (str): The file to check.
+
+        Returns:
+            tuple: (identity, known_entry). identity is a dict with 'content_hash',
+                   'file_name', 'size' and 'mtime_ns'; known_entry is the matching
+                   manifest entry, or None if the content is new.
+        """
+        stat = os.stat(file_path)
+        file_name = os.path.basename(file_path)
+        if self.trust_size_mtime:
+            known = self.find_by_stat(file_name, stat.st_size, stat.st_mtime_ns)
+            if known:
+                return known, known
+        identity = {
+            'content_hash': compute_file_hash(file_path),
+            'file_name': file_name,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns
+        }
+        return identity, self.find_by_hash(identity['content_hash'])
+
+    def claim(self, content_hash):
+        """
+        Marks a content hash as being ingested by this process.
+
+        Returns:
+            bool: False if the hash is already being ingested (by any process sharing the
+                  manifest) or has been recorded.
+        """
+        with self._lock:
+            # Takes the write lock up front, so no other process can claim in between
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                recorded = self._connection.execute(
+                    "SELECT 1 FROM ingested_files WHERE content_hash = ?", (content_hash,)
+                ).fetchone()
+                claimed = not recorded and self._connection.execute(
+                    "INSERT OR IGNORE INTO in_flight_files (content_hash, owner_pid, claimed_at) VALUES (?, ?, ?)",
+                    (content_hash, os.getpid(), datetime.datetime.now().isoformat(timespec='seconds'))
+                ).rowcount == 1
+                self._connection.commit()
+            except BaseException:
+                self._connection.rollback()
+                raise
+        return claimed
+
+    def release(self, content_hash):
+        """Ends a claim made with claim(), whether or not the ingest succeeded."""
+        with self._lock:
+            self._connection.execute("DELETE FROM in_flight_files WHERE content_hash = ?", (content_hash,))
+            self._connection.commit()
+
+    def record(self, identity, table_name):
+        """Records a successfully ingested file."""
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO ingested_files (content_hash, file_name, size, mtime_ns, table_name, ingested_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (identity['content_hash'], identity['file_name'], identity['size'], identity['mtime_ns'],
+                 table_name, datetime.datetime.now().isoformat(timespec='seconds'))
+            )
+            self._connection.commit()
+
+    def recent(self, limit=20, table_name=None):
+        """The most recently ingested entries, newest first, optionally for one table."""
+        query = f"SELECT {', '.join(_COLUMNS)} FROM ingested_files"
+        params = []
+        if table_name:
+            query += " WHERE table_name = ?"
+            params.append(table_name)
+        query += " ORDER BY ingested_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def compact(self, max_age_days=None):
+        """
+        Removes entries older than max_age_days (if given) and reclaims unused space.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        removed = 0
+        with self._lock:
+            if max_age_days is not None:
+                cutoff = (datetime.datetime.now() - datetime.timedelta(days=max_age_days)).isoformat(timespec='seconds')
+                removed = self._connection.execute("DELETE FROM ingested_files WHERE ingested_at < ?", (cutoff,)).rowcount
+                self._connection.commit()
+            self._connection.execute("VACUUM")
+        logger.info("Compacted ingest manifest '%s', removed %s entries.", self.path, removed)
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+def main():
+    from v3.src.config.settings import MANIFEST_CONFIG
+
+    parser = argparse.ArgumentParser(description="Inspect or compact the ingest manifest.")
+    parser.add_argument('--list', type=int, metavar='N', help="Show the N most recently ingested files")
+    parser.add_argument('--table', help="Only list files ingested into this table")
+    parser.add_argument('--lookup', metavar='SHA256', help="Show the entry for a content hash")
+    parser.add_argument('--compact', type=int, metavar='DAYS', help="Remove entries older than DAYS and vacuum")
+    args = parser.parse_args()
+
+    manifest = IngestManifest(MANIFEST_CONFIG['path'])
+    try:
+        if args.lookup:
+            print(manifest.find_by_hash(args.lookup) or "Not found.")
+        if args.list:
+            for entry in manifest.recent(args.list, args.table):
+                print(entry)
+        if args.compact is not None:
+            print(f"Removed {manifest.compact(args.compact)} entries.")
+    finally:
+        manifest.close()
+
+if __name__ == '__main__':
+    main()
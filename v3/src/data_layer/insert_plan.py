@@ -0,0 +1,84 @@
+# data_layer/insert_plan.py
+
+import logging
+import threading
+
+from v3.src.data_layer.batch_inserter import get_max_allowed_packet
+from v3.src.data_layer.table_schema import DEFAULT_SCHEMA_CACHE_TTL_SECONDS, build_read_csv_options, get_table_schema, validate_header
+
+# Set up logging for this module
+logger = logging.getLogger(__name__)
+
+# Plans kept per process; the cache is emptied when it grows past this many
+MAX_CACHED_PLANS = 256
+
+# (database, table, header, categorical columns) -> InsertPlan
+_plan_cache = {}
+_plan_cache_lock = threading.Lock()
+
+class InsertPlan:
+    """
+    What loading files with one header into one table needs that does not change from
+    file to file: the header check against the table schema, the read_csv options
+    derived from the schema, and the server's max_allowed_packet.
+
+    A plan belongs to the schema it was built from; when the cached schema is refreshed
+    or invalidated, the next get_insert_plan() builds a new plan.
+    """
+    def __init__(self, table_name, header, schema, read_csv_options, mismatch=None):
+        self.table_name = table_name
+        self.header = header
+        self.schema = schema
+        self.read_csv_options = read_csv_options
+        self.mismatch = mismatch
+        self.max_allowed_packet = None
+
+    def get_max_allowed_packet(self, cursor):
+        """Returns the server's max_allowed_packet, read over cursor on first use only."""
+        if self.max_allowed_packet is None:
+            self.max_allowed_packet = get_max_allowed_packet(cursor)
+        return self.max_allowed_packet
+
+def get_insert_plan(mysql_config, table_name, header, options):
+    """
+    Returns the (cached) insert plan for loading files with this header into a table.
+
+    Args:
+        mysql_config (dict): A dictionary containing MySQL connection parameters.
+        table_name (str): The name of the target table.
+        header (list): The column names of the file.
+        options (dict): Ingest options ('use_table_schema', 'schema_cache_ttl_seconds',
+                        'categorical_columns').
+
+    Returns:
+        InsertPlan: The plan. Its read_csv_options are empty when schema-driven parsing is
+                    disabled or the schema is unavailable, and its mismatch describes a
+                    header that does not fit the table (None if it does).
+    """
+    if not options.get('use_table_schema', False):
+        return InsertPlan(table_name, header, None, {})
+    schema = get_table_schema(mysql_config, table_name, options.get('schema_cache_ttl_seconds', DEFAULT_SCHEMA_CACHE_TTL_SECONDS))
+    if schema is None:
+        return InsertPlan(table_name, header, None, {})
+
+    categorical_columns = tuple(options.get('categorical_columns', ()))
+    key = (mysql_config['database'], table_name, tuple(header), categorical_columns)
+    with _plan_cache_lock:
+        plan = _plan_cache.get(key)
+    if plan is not None and plan.schema is schema:
+        return plan
+
+    mismatch = validate_header(header, schema)
+    read_csv_options = None if mismatch else build_read_csv_options(schema, header, categorical_columns)
+    plan = InsertPlan(table_name, list(header), schema, read_csv_options, mismatch)
+    with _plan_cache_lock:
+        if len(_plan_cache) >= MAX_CACHED_PLANS:
+            _plan_cache.clear()
+        _plan_cache[key] = plan
+    logger.debug("Built insert plan for '%s' (%s columns).", table_name, len(header))
+    return plan
+
+def clear_insert_plans():
+    """Drops all cached insert plans."""
+    with _plan_cache_lock:
+        _plan_cache.clear()
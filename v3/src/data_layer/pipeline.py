@@ -0,0 +1,211 @@
+# data_layer/pipeline.py
+
+import logging
+import queue
+import threading
+import time
+
+from v3.src.utils.profiling import propagate_to_thread
+
+# Set up logging for this module
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_DEPTH = 2
+
+# How often a stage blocked on a full (or empty) queue checks whether the pipeline was closed
+_POLL_SECONDS = 0.1
+
+# Sentinel marking the end of a stage's output
+_END = object()
+
+class _Failure:
+    """Carries an exception raised in a stage thread to the consumer."""
+    def __init__(self, exception):
+        self.exception = exception
+
+class PipelineStage:
+    """
+    One stage of a Pipeline, running in its own thread.
+
+    The stage pulls items from its source, applies func (if any) and puts the results
+    into a bounded queue read by the next stage. Without func, producing the next item of
+    the source is the stage's work (e.g. parsing the next chunk of a file).
+
+    Time is split into 'busy_seconds' (doing the work), 'input_wait_seconds' (waiting for
+    the previous stage) and 'output_wait_seconds' (blocked on a full queue, i.e. the next
+    stage is the bottleneck).
+    """
+    def __init__(self, name, source, func=None, queue_depth=DEFAULT_QUEUE_DEPTH, stop_event=None):
+        self.name = name
+        self.source = source
+        self.func = func
+        self.output = queue.Queue(maxsize=max(int(queue_depth), 1))
+        self._stop = stop_event or threading.Event()
+        self._thread = threading.Thread(target=propagate_to_thread(self._run), name=f"pipeline-{name}", daemon=True)
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.input_wait_seconds = 0.0
+        self.output_wait_seconds = 0.0
+
+    def start(self):
+        self._thread.start()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    def _put(self, item):
+        """Puts item into the output queue; returns False if the pipeline was closed meanwhile."""
+        while not self._stop.is_set():
+            try:
+                self.output.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        iterator = iter(self.source)
+        try:
+            while not self._stop.is_set():
+                started = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                fetched = time.perf_counter()
+                if self.func is None:
+                    self.busy_seconds += fetched - started
+                    done = fetched
+                else:
+                    self.input_wait_seconds += fetched - started
+                    item = self.func(item)
+                    done = time.perf_counter()
+                    self.busy_seconds += done - fetched
+                if not self._put(item):
+                    return
+                self.output_wait_seconds += time.perf_counter() - done
+                self.items += 1
+            self._put(_END)
+        except BaseException as e:
+            self._put(_Failure(e))
+        finally:
+            # Release what the source holds (e.g. an open file) in the thread that used it
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+
+    def __iter__(self):
+        while True:
+            try:
+                item = self.output.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                # A closed pipeline's stages exit without passing _END on, so the next
+                # stage would otherwise wait here forever
+                if self._stop.is_set():
+                    return
+                continue
+            if item is _END:
+                return
+            if isinstance(item, _Failure):
+                raise item.exception
+            yield item
+
+class Pipeline:
+    """
+    Runs a chain of stages concurrently, joined by bounded queues.
+
+    The first stage produces items from source, every further stage transforms the
+    output of the previous one, and the caller consumes the last stage by iterating over
+    the pipeline. While the caller works on one item, the stages are already preparing
+    the next ones, so the throughput approaches that of the slowest stage instead of the
+    sum of all stages. The queues bound how many items are in flight, and so the memory
+    used. An exception in a stage is re-raised in the consumer.
+
+    Use as a context manager so the stage threads are stopped if the consumer exits early.
+
+    Args:
+        source (iterable): The items fed to the first stage.
+        stages (list): (name, func, queue_depth) per stage; func is None for the first
+                       stage when producing items from source is the work itself.
+        consumer_name (str): Name reported for the caller's stage in stats().
+    """
+    def __init__(self, source, stages, consumer_name='consumer'):
+        self.consumer_name = consumer_name
+        self._stop = threading.Event()
+        self._stages = []
+        for name, func, queue_depth in stages:
+            stage = PipelineStage(name, source, func, queue_depth, self._stop)
+            self._stages.append(stage)
+            source = stage
+        self._started = None
+        self._consumer_items = 0
+        self._consumer_wait_seconds = 0.0
+        self._elapsed = None
+
+    def start(self):
+        self._started = time.perf_counter()
+        for stage in self._stages:
+            stage.start()
+        return self
+
+    def close(self, timeout=5.0):
+        """Stops the stage threads and waits for them to exit."""
+        if self._elapsed is None and self._started is not None:
+            self._elapsed = time.perf_counter() - self._started
+        self._stop.set()
+        for stage in self._stages:
+            stage.join(timeout)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def __iter__(self):
+        iterator = iter(self._stages[-1])
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self._consumer_wait_seconds += time.perf_counter() - started
+            yield item
+            self._consumer_items += 1
+
+    def stats(self):
+        """
+        Per-stage utilization, in pipeline order with the consumer last.
+
+        Returns:
+            dict: Stage name -> {'items', 'busy_seconds', 'input_wait_seconds',
+                  'output_wait_seconds', 'utilization'}, where utilization is the share
+                  of the pipeline's wall-clock time the stage spent working.
+        """
+        if self._started is None:
+            elapsed = 0.0
+        elif self._elapsed is not None:
+            elapsed = self._elapsed
+        else:
+            elapsed = time.perf_counter() - self._started
+        stats = {}
+        for stage in self._stages:
+            stats[stage.name] = {
+                'items': stage.items,
+                'busy_seconds': stage.busy_seconds,
+                'input_wait_seconds': stage.input_wait_seconds,
+                'output_wait_seconds': stage.output_wait_seconds,
+                'utilization': stage.busy_seconds / elapsed if elapsed else 0.0
+            }
+        consumer_busy = max(elapsed - self._consumer_wait_seconds, 0.0)
+        stats[self.consumer_name] = {
+            'items': self._consumer_items,
+            'busy_seconds': consumer_busy,
+            'input_wait_seconds': self._consumer_wait_seconds,
+            'output_wait_seconds': 0.0,
+            'utilization': consumer_busy / elapsed if elapsed else 0.0
+        }
+        return stats
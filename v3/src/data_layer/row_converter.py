@@ -0,0 +1,78 @@
+# data_layer/row_converter.py
+
+import numpy as np
+
+# Rows converted per block; bounds the temporary per-column lists to a few MiB
+DEFAULT_BLOCK_ROWS = 65536
+
+def column_to_list(series):
+    """
+    Converts one DataFrame column to a list of connector-native Python values.
+
+    Typed columns are converted straight from their own array: integers and booleans
+    become Python int/bool, floats become Python float with NaN mapped to None, and
+    object, string, categorical, datetime and nullable extension columns have their missing
+    values mapped to None. No numpy scalars (e.g. numpy.int64) reach the connector.
+
+    Args:
+        series (pandas.Series): The column to convert.
+
+    Returns:
+        list: One Python value per row.
+    """
+    if not isinstance(series.dtype, np.dtype):
+        if series.dtype.kind in 'iub' and not series.hasnans:
+            # Nullable integer/bool column without missing values: convert its plain array
+            return series.to_numpy(dtype=series.dtype.numpy_dtype).tolist()
+        # Extension dtypes (Int64, string, category, ...) carry their own missing-value mask
+        return series.to_numpy(dtype=object, na_value=None).tolist()
+
+    kind = series.dtype.kind
+    if kind in 'iub':
+        # Plain numpy integer/bool columns cannot hold missing values
+        return series.to_numpy().tolist()
+
+    if kind == 'f':
+        array = series.to_numpy()
+        values = array.tolist()
+        missing = np.isnan(array)
+        if missing.any():
+            for index in np.flatnonzero(missing).tolist():
+                values[index] = None
+        return values
+
+    if kind == 'M':
+        # datetime64 -> datetime.datetime (pandas Timestamps are not connector-native)
+        values = np.asarray(series.dt.to_pydatetime(), dtype=object).tolist()
+    else:
+        # Object columns and anything else (e.g. timedeltas)
+        values = series.to_numpy(dtype=object).tolist()
+    missing = series.isna().to_numpy()
+    if missing.any():
+        for index in np.flatnonzero(missing).tolist():
+            values[index] = None
+    return values
+
+def dataframe_to_rows(df, columns, block_rows=DEFAULT_BLOCK_ROWS):
+    """
+    Converts the given DataFrame columns to a list of row tuples, column by column.
+
+    Each column is converted on its own typed array, so the mixed-dtype frame is never
+    coerced into a single object matrix. Conversion runs in blocks of block_rows rows,
+    so the temporary per-column lists stay small regardless of the chunk size.
+    Used by every ingest engine.
+
+    Args:
+        df (pandas.DataFrame): The parsed chunk.
+        columns (list): The columns to include, in insert order.
+        block_rows (int): Rows converted per block.
+
+    Returns:
+        list: One tuple of Python values per row.
+    """
+    series_list = [df[column] for column in columns]
+    rows = []
+    for start in range(0, len(df), block_rows):
+        column_values = [column_to_list(series.iloc[start:start + block_rows]) for series in series_list]
+        rows.extend(zip(*column_values))
+    return rows
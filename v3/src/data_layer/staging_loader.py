@@ -0,0 +1,107 @@
+# data_layer/staging_loader.py
+
+import hashlib
+import logging
+
+from mysql.connector import Error
+
+# Set up logging for this module
+logger = logging.getLogger(__name__)
+
+# What happens to the staging table after a file was merged
+STAGING_CLEANUP_DROP = 'drop'
+STAGING_CLEANUP_TRUNCATE = 'truncate'
+
+# Longest table name MySQL accepts
+MAX_IDENTIFIER_LENGTH = 64
+
+def staging_table_name(table_name, columns):
+    """
+    The name of the staging table for loading these columns into a target table.
+
+    The name carries a digest of the column set, so a staging table kept on a pooled
+    connection (STAGING_CLEANUP_TRUNCATE) is only reused by files with the same columns.
+    """
+    digest = hashlib.sha1(','.join([table_name] + sorted(columns)).encode('utf-8')).hexdigest()[:10]
+    suffix = f"_staging_{digest}"
+    return table_name[:MAX_IDENTIFIER_LENGTH - len(suffix)] + suffix
+
+def create_staging_table(cursor, table_name, staging_table, columns):
+    """
+    Creates an empty, unindexed staging table with the target's types for the given columns.
+
+    The table is TEMPORARY: it is private to the connection, so concurrent workers each
+    get their own, and creating or dropping it does not commit the open transaction.
+    CREATE ... SELECT copies the column types but none of the keys or indexes. An
+    existing table of the same name (see staging_table_name()) has the same columns.
+
+    Args:
+        cursor: A cursor on the loading connection.
+        table_name (str): The target table.
+        staging_table (str): The name of the staging table.
+        columns (list): The columns that will be loaded.
+    """
+    column_list = ', '.join(columns)
+    cursor.execute(
+        f"CREATE TEMPORARY TABLE IF NOT EXISTS {staging_table} AS SELECT {column_list} FROM {table_name} LIMIT 0"
+    )
+
+def merge_staging_table(cursor, staging_table, table_name, columns, dedupe_columns=None, update_clause=None):
+    """
+    Moves the staged rows into the target table with one set-based INSERT ... SELECT.
+
+    Args:
+        cursor: A cursor on the loading connection, inside the load's transaction.
+        staging_table (str): The staging table holding the file's rows.
+        table_name (str): The target table.
+        columns (list): The columns to copy.
+        dedupe_columns (list, optional): When given, rows that repeat within the file or
+                                         already exist in the target with the same values
+                                         in these columns are skipped. The target should
+                                         have an index on them, otherwise every staged row
+                                         scans the target.
+        update_clause (str, optional): An ON DUPLICATE KEY UPDATE clause from
+                                       on_duplicate_key_update(), so staged rows colliding
+                                       with a record on a unique index update it instead;
+                                       used instead of dedupe_columns.
+
+    Returns:
+        int: The number of rows inserted into the target, or with update_clause the
+             affected rows (1 per new record, 2 per changed record, 0 per unchanged one).
+    """
+    column_list = ', '.join(columns)
+    if update_clause:
+        cursor.execute(f"INSERT INTO {table_name} ({column_list}) SELECT {column_list} FROM {staging_table}{update_clause}")
+        return cursor.rowcount
+    if not dedupe_columns:
+        cursor.execute(f"INSERT INTO {table_name} ({column_list}) SELECT {column_list} FROM {staging_table}")
+        return cursor.rowcount
+
+    # <=> also matches NULLs, so rows with empty values are deduplicated too
+    match = ' AND '.join(f"t.{column} <=> s.{column}" for column in dedupe_columns)
+    cursor.execute(
+        f"INSERT INTO {table_name} ({column_list}) "
+        f"SELECT DISTINCT {', '.join(f's.{column}' for column in columns)} FROM {staging_table} s "
+        f"WHERE NOT EXISTS (SELECT 1 FROM {table_name} t WHERE {match})"
+    )
+    return cursor.rowcount
+
+def cleanup_staging_table(connection, staging_table, mode=STAGING_CLEANUP_DROP):
+    """
+    Drops or empties the staging table once the load has been committed or rolled back.
+
+    STAGING_CLEANUP_TRUNCATE keeps the (temporary) table for the next file loaded over the
+    same pooled connection. Errors are only logged, the staged rows are not needed any more.
+    """
+    cursor = None
+    try:
+        cursor = connection.cursor()
+        if mode == STAGING_CLEANUP_TRUNCATE:
+            cursor.execute(f"TRUNCATE TABLE {staging_table}")
+        else:
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {staging_table}")
+    except Error as e:
+        logger.warning("Could not clean up staging table '%s': %s", staging_table, e)
+    finally:
+        if cursor:
+            cursor.close()
@@ -0,0 +1,235 @@
+# data_layer/table_schema.py
+
+import logging
+import threading
+import time
+
+from mysql.connector import Error
+
+from v3.src.data_layer.db_connection import pooled_connection
+
+# Set up logging for this module
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCHEMA_CACHE_TTL_SECONDS = 600
+
+# MySQL data types mapped to the dtype pandas should parse them as
+INTEGER_TYPES = {'tinyint', 'smallint', 'mediumint', 'int', 'integer', 'bigint'}
+FLOAT_TYPES = {'float', 'double', 'real', 'decimal', 'numeric'}
+STRING_TYPES = {'char', 'varchar', 'tinytext', 'text', 'mediumtext', 'longtext', 'enum', 'set'}
+DATETIME_TYPES = {'date', 'datetime', 'timestamp'}
+
+# (database, table) -> (fetched_at, columns)
+_schema_cache = {}
+# (database, table) -> (fetched_at, {index name: columns})
+_unique_key_cache = {}
+_schema_cache_lock = threading.Lock()
+
+def _query_table_metadata(mysql_config, table_name, query, description):
+    """Runs an INFORMATION_SCHEMA query about a table; returns its rows, or None on error."""
+    with pooled_connection(mysql_config) as connection:
+        if connection is None:
+            return None
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            cursor.execute(query, (mysql_config['database'], table_name))
+            return cursor.fetchall()
+        except Error as e:
+            logger.error("Error reading the %s of table '%s': %s", description, table_name, e)
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+
+def _fetch_table_schema(mysql_config, table_name):
+    """Reads the column definitions of a table from INFORMATION_SCHEMA."""
+    query = (
+        "SELECT COLUMN_NAME, DATA_TYPE, IS_NULLABLE, COLUMN_DEFAULT, EXTRA "
+        "FROM INFORMATION_SCHEMA.COLUMNS "
+        "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s "
+        "ORDER BY ORDINAL_POSITION"
+    )
+    rows = _query_table_metadata(mysql_config, table_name, query, 'schema')
+    if rows is None:
+        return None
+
+    columns = []
+    for name, data_type, is_nullable, default, extra in rows:
+        extra = (extra or '').lower()
+        columns.append({
+            'name': name,
+            'data_type': data_type.lower(),
+            'nullable': is_nullable == 'YES',
+            'has_default': default is not None,
+            'auto_increment': 'auto_increment' in extra,
+            'generated': 'generated' in extra
+        })
+    return columns
+
+def _fetch_unique_keys(mysql_config, table_name):
+    """Reads the unique indexes (the primary key included) of a table from INFORMATION_SCHEMA."""
+    query = (
+        "SELECT INDEX_NAME, COLUMN_NAME "
+        "FROM INFORMATION_SCHEMA.STATISTICS "
+        "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND NON_UNIQUE = 0 "
+        "ORDER BY INDEX_NAME, SEQ_IN_INDEX"
+    )
+    rows = _query_table_metadata(mysql_config, table_name, query, 'unique indexes')
+    if rows is None:
+        return None
+    unique_keys = {}
+    for index_name, column_name in rows:
+        unique_keys.setdefault(index_name, []).append(column_name)
+    return unique_keys
+
+def get_table_schema(mysql_config, table_name, ttl_seconds=DEFAULT_SCHEMA_CACHE_TTL_SECONDS):
+    """
+    Returns the column definitions of a table, cached for ttl_seconds.
+
+    Args:
+        mysql_config (dict): A dictionary containing MySQL connection parameters.
+        table_name (str): The table to describe.
+        ttl_seconds (float): How long a cached schema stays valid.
+
+    Returns:
+        list or None: One dict per column ('name', 'data_type', 'nullable', 'has_default',
+                      'auto_increment', 'generated') in table order, or None if the table
+                      does not exist or could not be read.
+    """
+    key = (mysql_config['database'], table_name)
+    with _schema_cache_lock:
+        cached = _schema_cache.get(key)
+    if cached is not None and time.monotonic() - cached[0] < ttl_seconds:
+        return cached[1]
+
+    columns = _fetch_table_schema(mysql_config, table_name)
+    if not columns:
+        logger.error("Table '%s' was not found in database '%s'.", table_name, mysql_config['database'])
+        return None
+    with _schema_cache_lock:
+        _schema_cache[key] = (time.monotonic(), columns)
+    logger.debug("Cached schema of '%s' (%s columns).", table_name, len(columns))
+    return columns
+
+def get_unique_keys(mysql_config, table_name, ttl_seconds=DEFAULT_SCHEMA_CACHE_TTL_SECONDS):
+    """
+    Returns the unique indexes of a table, cached for ttl_seconds like its schema.
+
+    Args:
+        mysql_config (dict): A dictionary containing MySQL connection parameters.
+        table_name (str): The table to describe.
+        ttl_seconds (float): How long cached indexes stay valid.
+
+    Returns:
+        dict or None: The columns of each unique index (the primary key included) by
+                      index name, or None if they could not be read.
+    """
+    key = (mysql_config['database'], table_name)
+    with _schema_cache_lock:
+        cached = _unique_key_cache.get(key)
+    if cached is not None and time.monotonic() - cached[0] < ttl_seconds:
+        return cached[1]
+
+    unique_keys = _fetch_unique_keys(mysql_config, table_name)
+    if unique_keys is None:
+        return None
+    with _schema_cache_lock:
+        _unique_key_cache[key] = (time.monotonic(), unique_keys)
+    return unique_keys
+
+def find_unique_key(unique_keys, columns):
+    """The name of the unique index on exactly these columns (in any order), or None."""
+    wanted = set(columns)
+    for index_name, index_columns in unique_keys.items():
+        if set(index_columns) == wanted:
+            return index_name
+    return None
+
+def invalidate_table_schema(table_name=None):
+    """
+    Drops cached schemas and unique indexes so the next lookup reads INFORMATION_SCHEMA again.
+
+    Args:
+        table_name (str, optional): The table to forget; all tables if omitted.
+    """
+    with _schema_cache_lock:
+        for cache in (_schema_cache, _unique_key_cache):
+            for key in list(cache):
+                if table_name is None or key[1] == table_name:
+                    del cache[key]
+
+def insertable_columns(schema):
+    """Names of the columns a CSV may supply: everything except AUTO_INCREMENT and generated columns."""
+    return [column['name'] for column in schema if not column['auto_increment'] and not column['generated']]
+
+def validate_header(header, schema):
+    """
+    Checks a CSV header against the table schema.
+
+    Columns the table fills itself (such as the AUTO_INCREMENT 'id') may be present and
+    are ignored. Every other header column must exist in the table, and every NOT NULL
+    column without a default must be present.
+
+    Args:
+        header (list): The CSV column names.
+        schema (list): The table schema from get_table_schema().
+
+    Returns:
+        str or None: A description of the mismatch, or None if the header is valid.
+    """
+    table_columns = {column['name'] for column in schema}
+    unknown = [name for name in header if name not in table_columns]
+    missing = [
+        column['name'] for column in schema
+        if not column['nullable'] and not column['has_default']
+        and not column['auto_increment'] and not column['generated']
+        and column['name'] not in header
+    ]
+    problems = []
+    if unknown:
+        problems.append(f"unknown columns {unknown}")
+    if missing:
+        problems.append(f"missing required columns {missing}")
+    return '; '.join(problems) or None
+
+def build_read_csv_options(schema, header, categorical_columns=()):
+    """
+    Builds explicit pandas.read_csv options for the insertable columns of a CSV header.
+
+    Args:
+        schema (list): The table schema from get_table_schema().
+        header (list): The CSV column names.
+        categorical_columns (iterable): Low-cardinality columns to parse as 'category'.
+
+    Integer columns get no explicit dtype: with the nullable dtype backend pandas parses
+    them as Int64, with blanks as missing values, and a chunk holding a malformed value
+    (e.g. 'abc') keeps that column as strings. Either way the chunk still loads, and
+    MySQL rejects just the offending rows (1048 / 1366), which are then dead-lettered
+    instead of the whole file failing in read_csv.
+
+    Returns:
+        dict: 'usecols', 'dtype', 'parse_dates' and 'dtype_backend' keyword arguments
+              for pandas.read_csv.
+    """
+    by_name = {column['name']: column for column in schema}
+    insertable = set(insertable_columns(schema))
+    categorical_columns = set(categorical_columns)
+    usecols = [name for name in header if name in insertable]
+
+    dtype = {}
+    parse_dates = []
+    for name in usecols:
+        column = by_name[name]
+        data_type = column['data_type']
+        if name in categorical_columns:
+            dtype[name] = 'category'
+        elif data_type in INTEGER_TYPES:
+            continue # Inferred, see above
+        elif data_type in FLOAT_TYPES:
+            dtype[name] = 'float64'
+        elif data_type in STRING_TYPES:
+            dtype[name] = str
+        elif data_type in DATETIME_TYPES:
+            parse_dates.append(name)
+    return {'usecols': usecols, 'dtype': dtype, 'parse_dates': parse_dates, 'dtype_backend': 'numpy_nullable'}
@@ -1,30 +1,219 @@
 # utils/logger.py
 
+import atexit
+import json
 import logging
+import logging.handlers
+import multiprocessing
 import os
+import queue
 
-def setup_logging(log_file_path, log_level_str='INFO'):
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Background writer of the queued records, and the process that started it
+_listener = None
+_listener_pid = None
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as one JSON object per line, for log shippers."""
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+class _SharedFormatter(logging.Formatter):
+    """Formats a record once for all the handlers that share this formatter."""
+    def __init__(self, formatter):
+        super().__init__()
+        self.formatter = formatter
+
+    def format(self, record):
+        cached = record.__dict__.get('_formatted')
+        if cached is not None and cached[0] is self:
+            return cached[1]
+        text = self.formatter.format(record)
+        record._formatted = (self, text)
+        return text
+
+class _RecordQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queues records for the writer thread. The message and any traceback are rendered
+    here, since the arguments may change and frames go away once the call returns, but
+    the rest of the formatting (and all I/O) happens on the writer thread.
+    """
+    def prepare(self, record):
+        # The root logger's only handler, so the record can be changed in place
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class _DeferredFlush:
+    """Handler mixin: emit() leaves the stream unflushed until the writer calls flush_now()."""
+    def flush(self):
+        pass
+
+    def flush_now(self):
+        super().flush()
+
+    def close(self):
+        self.flush_now()
+        super().close()
+
+class _DeferredFlushFileHandler(_DeferredFlush, logging.FileHandler):
+    pass
+
+class _DeferredFlushRotatingFileHandler(_DeferredFlush, logging.handlers.RotatingFileHandler):
+    pass
+
+class _DeferredFlushStreamHandler(_DeferredFlush, logging.StreamHandler):
+    pass
+
+class _QueueWriter(logging.handlers.QueueListener):
+    """Writes the queued records, flushing the handlers whenever the queue runs empty."""
+    def handle(self, record):
+        super().handle(record)
+        if self.queue.empty():
+            for handler in self.handlers:
+                handler.flush_now()
+
+class _ForwardedRecordHandler(logging.Handler):
+    """Passes records from worker processes to the logger they were logged on in this process."""
+    def emit(self, record):
+        logging.getLogger(record.name).handle(record)
+
+def build_log_handlers(log_file_path, log_format='text', max_bytes=0, backup_count=0, deferred_flush=False):
+    """
+    Creates the log file and console handlers.
+
+    Args:
+        log_file_path (str): The full path to the log file.
+        log_format (str): 'text', or 'json' for one JSON object per line.
+        max_bytes (int): Rotate the log file once it reaches this size; 0 never rotates.
+        backup_count (int): Rotated log files to keep.
+        deferred_flush (bool): Only flush on flush_now(), for the queue writer.
+
+    Returns:
+        list: The handlers, sharing one formatter.
+    """
+    # Ensure the log directory exists
+    log_dir = os.path.dirname(log_file_path)
+    if log_dir and not os.path.exists(log_dir):
+        os.makedirs(log_dir, exist_ok=True)
+
+    if max_bytes:
+        rotating_class = _DeferredFlushRotatingFileHandler if deferred_flush else logging.handlers.RotatingFileHandler
+        file_handler = rotating_class(log_file_path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+    else:
+        file_class = _DeferredFlushFileHandler if deferred_flush else logging.FileHandler
+        file_handler = file_class(log_file_path, encoding='utf-8')
+    stream_class = _DeferredFlushStreamHandler if deferred_flush else logging.StreamHandler
+    formatter = _SharedFormatter(JsonFormatter() if log_format == 'json' else logging.Formatter(LOG_FORMAT))
+    handlers = [file_handler, stream_class()] # Also log to console
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+def setup_logging(log_file_path, log_level_str='INFO', log_format='text', max_bytes=0, backup_count=0, use_queue=True):
     """
     Configures the logging for the application.
 
+    With use_queue, the root logger only puts records on a queue and a background thread
+    writes them to the log file and the console, so the ingest threads never wait on
+    either. The writer flushes once it has caught up rather than after every record.
+    Records still queued at exit are written before the process ends.
+
     Args:
         log_file_path (str): The full path to the log file.
         log_level_str (str): The desired logging level (e.g., 'DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL').
+        log_format (str): 'text', or 'json' for one JSON object per line.
+        max_bytes (int): Rotate the log file once it reaches this size; 0 never rotates.
+        backup_count (int): Rotated log files to keep.
+        use_queue (bool): Write the records from a background thread.
     """
+    global _listener, _listener_pid
     numeric_level = getattr(logging, log_level_str.upper(), logging.INFO)
+    root_logger = logging.getLogger()
 
-    # Ensure the log directory exists
-    log_dir = os.path.dirname(log_file_path)
-    if log_dir and not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-
-    logging.basicConfig(
-        level=numeric_level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file_path),
-            logging.StreamHandler() # Also log to console
-        ]
-    )
+    if _listener is not None:
+        if _listener_pid == os.getpid():
+            return root_logger # Already configured, as logging.basicConfig() would leave it
+        # A forked worker process inherits the queue handler but not the writer thread
+        for handler in [h for h in root_logger.handlers if isinstance(h, _RecordQueueHandler)]:
+            root_logger.removeHandler(handler)
+        _listener = None
+    if root_logger.handlers:
+        return root_logger # Logging was configured elsewhere; leave it alone
+
+    handlers = build_log_handlers(log_file_path, log_format, max_bytes, backup_count, deferred_flush=use_queue)
+    root_logger.setLevel(numeric_level)
+    if not use_queue:
+        for handler in handlers:
+            root_logger.addHandler(handler)
+        return root_logger
+
+    record_queue = queue.SimpleQueue()
+    _listener = _QueueWriter(record_queue, *handlers)
+    _listener_pid = os.getpid()
+    _listener.start()
+    root_logger.addHandler(_RecordQueueHandler(record_queue))
+    atexit.register(shutdown_logging)
     # Return the root logger instance
-    return logging.getLogger()
\ No newline at end of file
+    return root_logger
+
+def shutdown_logging():
+    """Writes the records still queued and stops the background writer thread."""
+    global _listener
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        for handler in [h for h in logging.getLogger().handlers if isinstance(h, _RecordQueueHandler)]:
+            logging.getLogger().removeHandler(handler)
+        _listener = None
+
+def start_worker_log_forwarding():
+    """
+    Lets worker processes log through this process, so only one process writes (and
+    rotates) the log file. Each worker passes the returned queue to setup_worker_logging().
+
+    Returns:
+        tuple: (record queue, forwarder). Stop the forwarder with stop() once the workers
+               have exited, so their last records are written.
+    """
+    record_queue = multiprocessing.Queue()
+    forwarder = logging.handlers.QueueListener(record_queue, _ForwardedRecordHandler())
+    forwarder.start()
+    return record_queue, forwarder
+
+def setup_worker_logging(record_queue, log_level_str='INFO'):
+    """
+    Configures the logging of a worker process to put every record on record_queue,
+    from start_worker_log_forwarding() in the main process.
+
+    Args:
+        record_queue (multiprocessing.Queue): Carries the records to the main process.
+        log_level_str (str): The desired logging level.
+    """
+    global _listener
+    root_logger = logging.getLogger()
+    # A forked worker inherits the main process's handlers but not its writer thread
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    _listener = None
+    root_logger.setLevel(getattr(logging, log_level_str.upper(), logging.INFO))
+    root_logger.addHandler(_RecordQueueHandler(record_queue))
+    return root_logger
@@ -0,0 +1,339 @@
+# utils/metrics.py
+"""
+In-process metrics exported in the Prometheus text format.
+
+Counters, gauges and histograms are registered once at import time of the module that
+updates them and exported by a MetricsExporter, either over a small local HTTP endpoint
+(GET /metrics) or as a file for node_exporter's textfile collector, see METRICS_CONFIG.
+Worker processes hand the counts they recorded to the exporting process with
+REGISTRY.drain_values() and REGISTRY.merge_values().
+"""
+
+import bisect
+import logging
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Set up logging for this module
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Histogram buckets in seconds, from a few milliseconds (one INSERT batch) to minutes (a large file)
+DEFAULT_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+def _escape_label_value(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape_label_value(value)}"' for name, value in pairs) + '}'
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class _Metric:
+    """Base class holding one value per combination of label values."""
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric '{self.name}' expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self):
+        """Returns (suffix, label values, extra label, value) tuples to render."""
+        with self._lock:
+            return [('', key, None, value) for key, value in self._values.items()]
+
+    def drain(self):
+        """Returns the values recorded so far and starts again from none."""
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, key, extra, value in self._samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, key, extra)} {_format_value(value)}")
+        return '\n'.join(lines)
+
+class Counter(_Metric):
+    """A value that only goes up, e.g. files processed or rows inserted."""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only be incremented.")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def merge(self, values):
+        """Adds values drained from the same counter in another process."""
+        with self._lock:
+            for key, amount in values.items():
+                self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(_Metric):
+    """
+    A value that goes up and down, e.g. the queue depth.
+
+    Instead of being set, a gauge can read its values when rendered from set_function(),
+    which returns a number (no labels) or a dict mapping label value tuples to numbers.
+    """
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._function = None
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function):
+        self._function = function
+
+    def _samples(self):
+        if self._function is None:
+            return super()._samples()
+        try:
+            values = self._function()
+        except Exception as e:
+            logger.warning("Could not read gauge '%s': %s", self.name, e)
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [('', tuple(str(value) for value in key), None, value) for key, value in values.items()]
+
+class Histogram(_Metric):
+    """Counts observations (e.g. durations) into cumulative buckets, with their sum and count."""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_DURATION_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0}
+            series['counts'][bisect.bisect_left(self.buckets, value)] += 1
+            series['sum'] += value
+
+    def merge(self, values):
+        """Adds observations drained from the same histogram in another process."""
+        with self._lock:
+            for key, other in values.items():
+                series = self._values.get(key)
+                if series is None:
+                    series = self._values[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0}
+                series['counts'] = [count + other_count for count, other_count in zip(series['counts'], other['counts'])]
+                series['sum'] += other['sum']
+
+    def _samples(self):
+        samples = []
+        with self._lock:
+            for key, series in self._values.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float('inf'),), series['counts']):
+                    cumulative += count
+                    samples.append(('_bucket', key, ('le', _format_value(bound)), cumulative))
+                samples.append(('_sum', key, None, series['sum']))
+                samples.append(('_count', key, None, cumulative))
+        return samples
+
+class MetricsRegistry:
+    """The set of metrics rendered together by an exporter."""
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric_class, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, *args, **kwargs)
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f"Metric '{name}' is already registered as a {metric.kind}.")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_DURATION_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def drain_values(self):
+        """
+        Takes the values of every counter and histogram, leaving them empty. A worker
+        process returns them for the exporting process to merge_values(). Gauges describe
+        the state of one process and are left alone.
+        """
+        with self._lock:
+            metrics = [metric for metric in self._metrics.values() if hasattr(metric, 'merge')]
+        return {metric.name: metric.drain() for metric in metrics}
+
+    def merge_values(self, values):
+        """Adds the values from drain_values() in another process to the metrics of the same name."""
+        with self._lock:
+            metrics = dict(self._metrics)
+        for name, metric_values in values.items():
+            metric = metrics.get(name)
+            if metric is not None and metric_values:
+                metric.merge(metric_values)
+
+    def render(self):
+        """Returns every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+# The registry used by the application's modules
+REGISTRY = MetricsRegistry()
+
+def counter(name, documentation, labelnames=()):
+    """Returns the application counter called name, registering it on first use."""
+    return REGISTRY.counter(name, documentation, labelnames)
+
+def gauge(name, documentation, labelnames=()):
+    """Returns the application gauge called name, registering it on first use."""
+    return REGISTRY.gauge(name, documentation, labelnames)
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_DURATION_BUCKETS):
+    """Returns the application histogram called name, registering it on first use."""
+    return REGISTRY.histogram(name, documentation, labelnames, buckets)
+
+def write_textfile(path, registry=REGISTRY):
+    """
+    Writes the metrics to path for node_exporter's textfile collector. The file is written
+    next to its destination and renamed over it, so the collector never sees a partial file.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.metrics-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as metrics_file:
+            metrics_file.write(registry.render())
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes are frequent; keep them out of the application log
+        pass
+
+class MetricsExporter:
+    """
+    Serves the registry on http://<http_host>:<http_port>/metrics and/or rewrites a
+    textfile every textfile_interval_seconds, each from a daemon thread.
+    """
+    def __init__(self, http_host='127.0.0.1', http_port=None, textfile_path=None,
+                 textfile_interval_seconds=15, registry=REGISTRY):
+        self.http_host = http_host
+        self.http_port = http_port
+        self.textfile_path = textfile_path
+        self.textfile_interval_seconds = textfile_interval_seconds
+        self.registry = registry
+        self._server = None
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        if self.http_port is not None:
+            handler = type('MetricsRequestHandler', (_MetricsRequestHandler,), {'registry': self.registry})
+            try:
+                self._server = ThreadingHTTPServer((self.http_host, self.http_port), handler)
+            except OSError as e:
+                logger.error("Could not serve metrics on %s:%s: %s", self.http_host, self.http_port, e)
+            else:
+                self._server.daemon_threads = True
+                self._start_thread('metrics-http', self._server.serve_forever)
+                logger.info("Serving metrics on http://%s:%s/metrics", self.http_host, self._server.server_port)
+        if self.textfile_path:
+            self._start_thread('metrics-textfile', self._write_textfile_periodically)
+            logger.info("Writing metrics to '%s' every %ss.", self.textfile_path, self.textfile_interval_seconds)
+        return self
+
+    def _start_thread(self, name, target):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _write_textfile(self):
+        try:
+            write_textfile(self.textfile_path, self.registry)
+        except OSError as e:
+            logger.warning("Could not write metrics to '%s': %s", self.textfile_path, e)
+
+    def _write_textfile_periodically(self):
+        while not self._stop.wait(self.textfile_interval_seconds):
+            self._write_textfile()
+
+    def stop(self):
+        """Stops serving and writes the textfile one last time."""
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+        if self.textfile_path:
+            self._write_textfile()
+
+def start_metrics_exporter(metrics_config):
+    """
+    Starts a MetricsExporter as configured in METRICS_CONFIG.
+
+    Returns:
+        MetricsExporter or None: The running exporter, or None if metrics are disabled.
+    """
+    if not metrics_config.get('enabled', False):
+        return None
+    return MetricsExporter(
+        http_host=metrics_config.get('http_host', '127.0.0.1'),
+        http_port=metrics_config.get('http_port'),
+        textfile_path=metrics_config.get('textfile_path'),
+        textfile_interval_seconds=metrics_config.get('textfile_interval_seconds', 15)
+    ).start()
@@ -0,0 +1,196 @@
+# utils/profiling.py
+"""
+Opt-in, sampled profiling of the ingest hot path.
+
+A call wrapped with profile_calls() is profiled with cProfile and tracemalloc when
+profiling is enabled and the call is sampled. Each profiled call writes two files to
+the output directory:
+
+    <timestamp>-<label>.prof  cProfile stats, e.g. for `python -m pstats` or snakeviz
+    <timestamp>-<label>.txt   top functions by cumulative time and top allocation sites
+
+Threads started through propagate_to_thread() (such as the pipeline stages) are
+profiled as part of the call that started them.
+"""
+
+import cProfile
+import datetime
+import functools
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import tracemalloc
+
+# Set up logging for this module
+logger = logging.getLogger(__name__)
+
+# Only one call is profiled at a time: tracemalloc is process-wide
+_session_lock = threading.Lock()
+_local = threading.local()
+
+class ProfileSession:
+    """The profilers and allocation snapshot of one profiled call."""
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.peak_snapshot = None
+        self.peak_traced = 0
+        self._thread_profilers = []
+        self._lock = threading.Lock()
+
+    def add_thread_profiler(self, profiler):
+        with self._lock:
+            self._thread_profilers.append(profiler)
+
+    def stats(self, stream):
+        stats = pstats.Stats(self.profiler, stream=stream)
+        with self._lock:
+            for profiler in self._thread_profilers:
+                stats.add(profiler)
+        return stats
+
+    def record_allocations(self):
+        """Keeps an allocation snapshot whenever the traced memory reaches a new high."""
+        if not tracemalloc.is_tracing():
+            return
+        current, _ = tracemalloc.get_traced_memory()
+        with self._lock:
+            if current <= self.peak_traced:
+                return
+            self.peak_traced = current
+        snapshot = tracemalloc.take_snapshot()
+        with self._lock:
+            self.peak_snapshot = snapshot
+
+def record_allocations():
+    """
+    Marks a point of high memory use in the profiled call, if this thread is being
+    profiled, so the report shows the allocation sites live at that point. Cheap when
+    profiling is off.
+    """
+    session = getattr(_local, 'session', None)
+    if session is not None:
+        session.record_allocations()
+
+def propagate_to_thread(target):
+    """
+    Wraps a thread target so it is profiled as part of the calling thread's profiled
+    call, if any; cProfile otherwise only sees the thread that enabled it.
+    """
+    session = getattr(_local, 'session', None)
+    if session is None:
+        return target
+
+    @functools.wraps(target)
+    def run(*args, **kwargs):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is active in this interpreter; run unprofiled
+            return target(*args, **kwargs)
+        _local.session = session
+        try:
+            return target(*args, **kwargs)
+        finally:
+            profiler.disable()
+            _local.session = None
+            session.add_thread_profiler(profiler)
+    return run
+
+def _safe_label(label):
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', label)[:100]
+
+def _write_report(session, label, function_name, elapsed, peak_memory, config):
+    output_dir = config.get('output_dir', 'profiles')
+    os.makedirs(output_dir, exist_ok=True)
+    base_path = os.path.join(output_dir, f"{datetime.datetime.now():%Y%m%d-%H%M%S-%f}-{_safe_label(label)}")
+
+    report = io.StringIO()
+    report.write(f"Profile of {function_name}('{label}')\n")
+    report.write(f"Elapsed: {elapsed:.3f}s, peak traced memory: {peak_memory / (1024 * 1024):.1f} MiB\n\n")
+    stats = session.stats(report)
+    stats.dump_stats(f"{base_path}.prof")
+    report.write(f"Top {config.get('top_functions', 30)} functions by cumulative time:\n")
+    stats.sort_stats('cumulative').print_stats(config.get('top_functions', 30))
+
+    if session.peak_snapshot is not None:
+        snapshot = session.peak_snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        ))
+        top_allocations = config.get('top_allocations', 25)
+        report.write(f"\nTop {top_allocations} allocation sites at the highest traced memory "
+                     f"({session.peak_traced / (1024 * 1024):.1f} MiB):\n")
+        for statistic in snapshot.statistics('lineno')[:top_allocations]:
+            report.write(f"{statistic}\n")
+
+    with open(f"{base_path}.txt", 'w') as report_file:
+        report_file.write(report.getvalue())
+    return base_path
+
+def profile_calls(config):
+    """
+    Decorator profiling a sampled share of the calls of a function.
+
+    Args:
+        config (dict): PROFILING_CONFIG, read at call time: 'enabled', 'sample_rate'
+                       (share of calls profiled, 0-1), 'output_dir', 'top_functions',
+                       'top_allocations' and 'tracemalloc_frames'.
+
+    The report label is the base name of the first argument (the file path for
+    process_single_csv_file). Calls made while another call is being profiled run
+    unprofiled.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not config.get('enabled', False) or random.random() >= config.get('sample_rate', 1.0):
+                return func(*args, **kwargs)
+            if not _session_lock.acquire(blocking=False):
+                return func(*args, **kwargs)
+            try:
+                label = os.path.basename(str(args[0])) if args else func.__name__
+                return _run_profiled(func, args, kwargs, label, config)
+            finally:
+                _session_lock.release()
+        return wrapper
+    return decorator
+
+def _run_profiled(func, args, kwargs, label, config):
+    session = ProfileSession()
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(config.get('tracemalloc_frames', 1))
+    tracemalloc.reset_peak()
+    try:
+        session.profiler.enable()
+    except ValueError:
+        # Another profiler is active in this interpreter; run unprofiled
+        if started_tracing:
+            tracemalloc.stop()
+        return func(*args, **kwargs)
+
+    _local.session = session
+    started = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        session.profiler.disable()
+        elapsed = time.perf_counter() - started
+        _local.session = None
+        session.record_allocations()
+        _, peak_memory = tracemalloc.get_traced_memory()
+        try:
+            base_path = _write_report(session, label, func.__name__, elapsed, peak_memory, config)
+            logger.info("Profiled '%s' in %.3fs, report: %s.txt", label, elapsed, base_path)
+        except OSError as e:
+            logger.warning("Could not write the profile of '%s': %s", label, e)
+        finally:
+            if started_tracing:
+                tracemalloc.stop()